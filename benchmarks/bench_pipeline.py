@@ -0,0 +1,139 @@
+"""
+Scaling benchmarks for the scout_tracking pipeline.
+
+Generates synthetic Scoutbook data at several sizes, times clean_csv, each loader and
+report generation, and saves the timings as JSON under benchmarks/results/. When a
+baseline results file is given (or an earlier results file exists), any stage that is
+slower than the baseline by more than the threshold fails the run.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--sizes small medium] [--baseline FILE] [--threshold 1.25]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import shutil
+import tempfile
+import contextlib
+from scout_tracking.synthetic import generate_dataset
+from scout_tracking.clean_advancement import clean_csv
+from scout_tracking.load_patrol_data import load_patrol_data
+from scout_tracking.load_requirements import load_requirements
+from scout_tracking.pipeline import load_troop_advancements
+from scout_tracking.report import generate_patrol_report_csv
+from scout_tracking.instrument import Instrumentation
+
+# Dataset sizes: number of scouts on the roster and rows in the Scoutbook backup
+BENCHMARK_SIZES = {
+    'small': {'scouts': 50, 'rows': 10000},
+    'medium': {'scouts': 1000, 'rows': 200000},
+    'large': {'scouts': 10000, 'rows': 1000000},
+    'council': {'scouts': 50000, 'rows': 5000000},
+}
+
+# Stages faster than this are too noisy to compare against the baseline
+MIN_COMPARABLE_SECONDS = 0.05
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+def run_size(size, work_dir, repeat=1):
+    # Time each stage on one dataset size, keeping the best of `repeat` runs
+    paths = generate_dataset(os.path.join(work_dir, size, 'input'), **BENCHMARK_SIZES[size])
+    output_dir = os.path.join(work_dir, size, 'reports')
+    cleaned_file = os.path.join(work_dir, size, 'advancement.csv')
+
+    best = {}
+    for _ in range(repeat):
+        instrumentation = Instrumentation()
+        with instrumentation.stage('clean_csv') as stage:
+            stage['rows'] = clean_csv(paths['advancement_backup'], cleaned_file)['raw_rows_read']
+        with instrumentation.stage('load_patrol_data') as stage:
+            patrol_data = load_patrol_data(paths['patrols'])
+            stage['rows'] = len(patrol_data)
+        with instrumentation.stage('load_requirements') as stage:
+            requirements = load_requirements(paths['requirements'])
+            stage['rows'] = len(requirements)
+        patrol_structure, completion_matrix, _, _, _ = load_troop_advancements(
+            cleaned_file, patrol_data, requirements, instrumentation=instrumentation)
+        with instrumentation.stage('load_advancements_raw') as stage:
+            _, _, _, _, load_stats = load_troop_advancements(paths['advancement_backup'], patrol_data, requirements, raw=True)
+            stage['rows'] = load_stats['raw_rows_read']
+        # Reports are only rewritten when they change, so start each repeat from an empty
+        # directory to time writing every report rather than finding them all unchanged
+        shutil.rmtree(output_dir, ignore_errors=True)
+        with instrumentation.stage('generate_patrol_report_csv') as stage:
+            report_files = generate_patrol_report_csv(patrol_structure, requirements, output_dir, completion_matrix=completion_matrix)
+            stage['rows'] = len(report_files) * len(requirements)
+
+        for stage in instrumentation.stages:
+            if stage['name'] not in best or stage['seconds'] < best[stage['name']]['seconds']:
+                best[stage['name']] = {'seconds': stage['seconds'], 'rows': stage['rows']}
+    return best
+
+def latest_results_file():
+    if not os.path.isdir(RESULTS_DIR):
+        return None
+    files = sorted(name for name in os.listdir(RESULTS_DIR) if name.endswith('.json'))
+    return os.path.join(RESULTS_DIR, files[-1]) if files else None
+
+def find_regressions(results, baseline, threshold):
+    """
+    Compare stage timings against a baseline.
+
+    :return: List of (size, stage, baseline seconds, seconds) for stages slower than baseline * threshold
+    """
+    regressions = []
+    for size, stages in results['sizes'].items():
+        for stage, timing in stages.items():
+            previous = baseline.get('sizes', {}).get(size, {}).get(stage)
+            if previous is None or previous['seconds'] < MIN_COMPARABLE_SECONDS:
+                continue
+            if timing['seconds'] > previous['seconds'] * threshold:
+                regressions.append((size, stage, previous['seconds'], timing['seconds']))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scout_tracking pipeline on synthetic data.")
+    parser.add_argument('--sizes', nargs='+', choices=list(BENCHMARK_SIZES), default=['small', 'medium'], help="Dataset sizes to run")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per size; the fastest time of each stage is kept")
+    parser.add_argument('--baseline', default=None, help="Results file to compare against (default: the latest in benchmarks/results)")
+    parser.add_argument('--threshold', type=float, default=1.25, help="Fail when a stage takes longer than baseline * threshold")
+    parser.add_argument('--no-save', action='store_true', help="Do not save the results")
+    args = parser.parse_args()
+
+    baseline_file = args.baseline or latest_results_file()
+    results = {'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': sys.version.split()[0], 'sizes': {}}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in args.sizes:
+            print(f"Running '{size}' benchmark: {BENCHMARK_SIZES[size]}", file=sys.stderr)
+            # The pipeline's progress messages would swamp the results
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                results['sizes'][size] = run_size(size, work_dir, repeat=args.repeat)
+
+    for size, stages in results['sizes'].items():
+        print(f"\n{size}")
+        for stage, timing in stages.items():
+            rate = f"{timing['rows'] / timing['seconds']:,.0f} rows/sec" if timing['rows'] and timing['seconds'] > 0 else ''
+            print(f"  {stage:<30} {timing['seconds']:>9.3f}s  {rate}")
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        results_file = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+        with open(results_file, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"\nResults saved to: {results_file}")
+
+    if baseline_file:
+        with open(baseline_file, 'r') as file:
+            baseline = json.load(file)
+        regressions = find_regressions(results, baseline, args.threshold)
+        print(f"Compared against: {baseline_file}")
+        for size, stage, previous, current in regressions:
+            print(f"REGRESSION {size} {stage}: {previous:.3f}s -> {current:.3f}s")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,3 @@
+from scout_tracking.cli import main
+
+main()
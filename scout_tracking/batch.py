@@ -0,0 +1,103 @@
+import os
+import sys
+import csv
+import argparse
+import contextlib
+from scout_tracking.load_requirements import load_requirements
+from scout_tracking.reconcile import load_requirement_aliases
+
+# The pipeline (and NumPy with it) and the process pool are imported where a batch runs, so --help
+# and argument errors return without loading them
+
+# Requirements catalog shared by every troop handled in a worker process
+_shared_requirements = None
+
+def load_manifest(manifest_file):
+    """
+    Read a batch manifest TSV with one troop per row.
+
+    Required columns are Troop, Patrol File, Advancement File and Output Dir. An optional
+    Requirements File column overrides the shared requirements catalog for that troop.
+    Relative paths are resolved against the manifest's directory.
+
+    :param manifest_file: Path to the manifest TSV file
+    :return: List of dictionaries, one per troop
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_file))
+    troops = []
+    with open(manifest_file, mode='r', newline='') as file:
+        reader = csv.DictReader(file, delimiter='\t')
+        for row in reader:
+            if not row.get('Troop'):
+                continue
+            troop = {'troop': row['Troop'].strip()}
+            for column, key in [('Patrol File', 'patrol_file'), ('Advancement File', 'advancement_file'),
+                                ('Output Dir', 'output_dir'), ('Requirements File', 'requirements_file')]:
+                value = (row.get(column) or '').strip()
+                troop[key] = os.path.join(base_dir, value) if value else None
+            troops.append(troop)
+    return troops
+
+def _init_worker(requirements):
+    global _shared_requirements
+    _shared_requirements = requirements
+
+def _run_manifest_troop(troop, raw):
+    # Run one troop, logging its console output to its output directory and capturing any failure
+    from scout_tracking.pipeline import run_troop
+
+    try:
+        os.makedirs(troop['output_dir'], exist_ok=True)
+        with open(os.path.join(troop['output_dir'], 'run_log.txt'), 'w') as log_file, contextlib.redirect_stdout(log_file):
+            if troop['requirements_file']:
+                requirements = load_requirements(troop['requirements_file'])
+            else:
+                requirements = _shared_requirements
+            report_files = run_troop(troop['patrol_file'], requirements, troop['advancement_file'], troop['output_dir'], raw=raw)
+        return troop['troop'], True, f"{len(report_files)} patrol reports written"
+    except Exception as error:
+        return troop['troop'], False, f"{type(error).__name__}: {error}"
+
+def run_batch(troops, requirements, jobs=None, raw=False):
+    """
+    Generate reports for many troops with a pool of worker processes.
+
+    The requirements catalog is parsed once and handed to each worker when it starts, and each
+    worker handles many troops, so interpreter and import startup is paid once per worker.
+
+    :param troops: List of troops from load_manifest
+    :param requirements: RequirementCatalog from load_requirements shared by all troops
+    :param jobs: Number of worker processes (defaults to None, which means one per CPU)
+    :param raw: Treat the advancement files as raw Scoutbook backups
+    :return: List of (troop, succeeded, message) tuples in manifest order
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(requirements,)) as executor:
+        futures = [executor.submit(_run_manifest_troop, troop, raw) for troop in troops]
+        return [future.result() for future in futures]
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate patrol reports for every troop in a manifest.")
+    parser.add_argument('manifest_tsv', help="Path to the manifest TSV file (Troop, Patrol File, Advancement File, Output Dir)")
+    parser.add_argument('requirements_tsv', help="Path to the requirements TSV file shared by all troops")
+    parser.add_argument('--jobs', type=int, default=None, help="Number of troops to process concurrently (default: one per CPU)")
+    parser.add_argument('--raw', action='store_true', help="Treat the advancement files as raw Scoutbook backups")
+    parser.add_argument('--requirement-aliases', default=None, help="Alias table mapping other spellings to the shared requirements")
+    args = parser.parse_args()
+
+    troops = load_manifest(args.manifest_tsv)
+    requirements = load_requirements(args.requirements_tsv)
+    if args.requirement_aliases:
+        load_requirement_aliases(args.requirement_aliases, requirements)
+    results = run_batch(troops, requirements, jobs=args.jobs, raw=args.raw)
+
+    failures = 0
+    for troop, succeeded, message in results:
+        print(f"{troop}\t{'ok' if succeeded else 'FAILED'}\t{message}")
+        failures += not succeeded
+    print(f"\n{len(results) - failures} of {len(results)} troops succeeded.")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
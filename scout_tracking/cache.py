@@ -0,0 +1,80 @@
+import os
+import pickle
+import hashlib
+from scout_tracking.utility import write_atomic
+
+# Number of parsed inputs kept in the cache before the least recently used are evicted
+CACHE_MAX_ENTRIES = 32
+
+# Part of every cache key. Bump it whenever the type or shape of a cached result changes (such as the
+# tuple returned by load_troop_advancements, or the attributes of RequirementCatalog or CompletionMatrix),
+# so entries written by an older version are never handed back
+CACHE_VERSION = 1
+
+def file_digest(filename, block_size=1 << 20):
+    # SHA-256 of the file contents, read in blocks
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ParseCache:
+    """
+    On-disk cache of parsed input files.
+
+    Each entry is the pickled result of a loader called on a file, keyed by CACHE_VERSION, the loader
+    name, the file's content hash and mtime, and the other arguments to the loader. Reading an entry
+    marks it as recently used, and the least recently used entries beyond max_entries are removed.
+    """
+
+    def __init__(self, cache_dir, max_entries=CACHE_MAX_ENTRIES):
+        """
+        :param cache_dir: Directory to store cache entries in (created if missing)
+        :param max_entries: Maximum number of entries to keep
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def entry_path(self, loader, filename, args=(), kwargs=None):
+        key = hashlib.sha256()
+        key.update(f"{CACHE_VERSION}\0".encode())
+        key.update(f"{loader.__module__}.{loader.__qualname__}\0".encode())
+        key.update(f"{file_digest(filename)}\0{os.stat(filename).st_mtime_ns}\0".encode())
+        key.update(pickle.dumps((args, kwargs or {}), protocol=pickle.HIGHEST_PROTOCOL))
+        return os.path.join(self.cache_dir, f"{key.hexdigest()}.pickle")
+
+    def load(self, loader, filename, *args, **kwargs):
+        """
+        Return loader(filename, *args, **kwargs), from the cache when the inputs are unchanged.
+
+        :param loader: Function that parses filename, e.g. load_patrol_data
+        :param filename: Path of the input file the loader parses
+        """
+        entry_path = self.entry_path(loader, filename, args, kwargs)
+        try:
+            with open(entry_path, 'rb') as file:
+                result = pickle.load(file)
+            os.utime(entry_path)  # Mark the entry as recently used
+            return result
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+
+        result = loader(filename, *args, **kwargs)
+
+        write_atomic(entry_path, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        self.evict()
+        return result
+
+    def evict(self):
+        # Remove the least recently used entries beyond max_entries
+        entries = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith('.pickle')]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda path: os.stat(path).st_mtime_ns, reverse=True)
+        for path in entries[self.max_entries:]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
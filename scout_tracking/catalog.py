@@ -0,0 +1,120 @@
+from collections.abc import Mapping
+
+# ID returned by RequirementCatalog.id_of for requirements that are not in the catalog
+UNKNOWN_REQUIREMENT = -1
+
+class RequirementCatalog(Mapping):
+    """
+    Requirements catalog with dense integer IDs.
+
+    Behaves like the requirement -> alt text dictionary that load_requirements used to
+    return, keyed by lowercase requirement name in catalog order. Each requirement is
+    also given an integer ID (its position in the catalog), and id_of remembers every
+    spelling it has looked up, so each distinct string in an advancement file is
+    lowercased and hashed once rather than once per row. Aliases map other spellings
+    to a requirement's ID without adding them to the catalog. The rank hierarchy of the
+    requirements is indexed once, on first use, and kept until requirements are added.
+    """
+
+    def __init__(self, items=()):
+        """
+        :param items: Iterable of (requirement, alt text) pairs, in catalog order
+        """
+        self.names = []
+        self.alt_texts = []
+        self.ids = {}
+        self.aliases = {}
+        self._lookups = {}
+        self._hierarchy = None
+        for requirement, alt_text in items:
+            self.add(requirement, alt_text)
+
+    def add(self, requirement, alt_text):
+        """
+        Add a requirement, or replace the alt text of one already in the catalog.
+
+        :return: The requirement's ID
+        """
+        name = requirement.lower()
+        requirement_id = self.ids.get(name)
+        if requirement_id is None:
+            requirement_id = len(self.names)
+            self.ids[name] = requirement_id
+            self.names.append(name)
+            self.alt_texts.append(alt_text)
+            self._lookups.clear()  # Spellings cached as unknown may now be known
+            self._hierarchy = None
+        else:
+            self.alt_texts[requirement_id] = alt_text
+        return requirement_id
+
+    def add_alias(self, alias, requirement):
+        """
+        Make another spelling resolve to a requirement already in the catalog.
+
+        :param alias: Spelling to accept, in any letter case
+        :param requirement: Requirement the alias stands for
+        :return: The requirement's ID
+        :raises KeyError: If the requirement is not in the catalog
+        """
+        requirement_id = self.ids[requirement.lower()]
+        self.aliases[alias.lower()] = requirement_id
+        self._lookups.clear()
+        return requirement_id
+
+    @property
+    def hierarchy(self):
+        """
+        RequirementHierarchy over the catalog, whose rows are requirement IDs.
+        """
+        if self._hierarchy is None:
+            from scout_tracking.hierarchy import RequirementHierarchy  # Needs NumPy, which loading a catalog does not
+            self._hierarchy = RequirementHierarchy(self.names)
+        return self._hierarchy
+
+    def id_of(self, requirement):
+        """
+        ID of a requirement or alias in any letter case, or UNKNOWN_REQUIREMENT if it is not in the catalog.
+        """
+        requirement_id = self._lookups.get(requirement)
+        if requirement_id is None:
+            name = requirement.lower()
+            requirement_id = self.ids.get(name)
+            if requirement_id is None:
+                requirement_id = self.aliases.get(name, UNKNOWN_REQUIREMENT)
+            self._lookups[requirement] = requirement_id
+        return requirement_id
+
+    def __getitem__(self, requirement):
+        return self.alt_texts[self.ids[requirement]]
+
+    def __contains__(self, requirement):
+        return requirement in self.ids
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getstate__(self):
+        # Spellings looked up are rebuilt on demand, so they are not pickled into caches or worker processes
+        state = self.__dict__.copy()
+        state['_lookups'] = {}
+        return state
+
+    def __repr__(self):
+        return f"RequirementCatalog({len(self.names)} requirements)"
+
+def as_catalog(requirements):
+    """
+    Return requirements as a RequirementCatalog, building one if needed.
+
+    :param requirements: RequirementCatalog, dictionary of requirements and their alt text, or
+        iterable of requirement names (which are used as their own alt text)
+    """
+    if isinstance(requirements, RequirementCatalog):
+        return requirements
+    if isinstance(requirements, Mapping):
+        return RequirementCatalog(requirements.items())
+    return RequirementCatalog((requirement, requirement) for requirement in requirements)
@@ -0,0 +1,203 @@
+import os
+import pickle
+import hashlib
+import numpy as np
+from scout_tracking.initialize import build_roster_index
+from scout_tracking.load_advancements import chunk_advancement_rows, fold_advancement_chunks, read_advancement_chunks, ADVANCEMENT_CHUNK_SIZE
+from scout_tracking.clean_advancement import chunk_raw_advancement_rows, read_raw_advancement_chunks
+from scout_tracking.dates import NO_DATE
+from scout_tracking.catalog import as_catalog
+from scout_tracking.input_files import open_input_binary, input_compression, detect_encoding, FALLBACK_ERRORS
+from scout_tracking.utility import write_atomic
+
+# Encodings whose lines can be split on newline bytes, as resuming from a byte offset needs
+CHECKPOINT_ENCODINGS = {'utf-8', 'utf-8-sig'}
+
+class _OffsetLines:
+    # Iterate over the decoded lines of a binary file, tracking the byte offset reached and adding
+    # every line to a digest of the bytes before it. A final line without a newline may still be
+    # being written, so it is kept in pending instead, and neither counted nor yielded.
+    def __init__(self, file, offset, digest):
+        self.file = file
+        self.offset = offset
+        self.digest = digest
+        self.pending = None
+
+    def __iter__(self):
+        for line in self.file:
+            if not line.endswith(b'\n'):
+                self.pending = line.decode('utf-8', FALLBACK_ERRORS)
+                return
+            self.offset += len(line)
+            self.digest.update(line)
+            yield line.decode('utf-8', FALLBACK_ERRORS)
+
+def _hash_prefix(file, offset, digest, block_size=1 << 20):
+    # Add the first offset bytes of a binary file to digest, returning False if the file ends first
+    remaining = offset
+    while remaining:
+        block = file.read(min(block_size, remaining))
+        if not block:
+            return False
+        digest.update(block)
+        remaining -= len(block)
+    return True
+
+def _inputs_fingerprint(patrol_structure, requirements, raw, reconcile):
+    # Fingerprint of everything besides the advancement file that the saved state depends on
+    roster = sorted((patrol, scout) for patrol, scouts in patrol_structure.items() for scout in scouts)
+    aliases = sorted(as_catalog(requirements).aliases.items())
+    return hashlib.sha256(pickle.dumps((roster, list(requirements), aliases, raw, reconcile))).hexdigest()
+
+def read_checkpoint(checkpoint_file, advancement_file, fingerprint):
+    """
+    Read a checkpoint, returning None if it cannot be resumed for this advancement file.
+
+    A checkpoint is only reused when the roster, requirements and file format match. Whether the
+    advancement file still starts with the bytes processed last time is checked against the saved
+    prefix digest as the file is read.
+    """
+    try:
+        with open(checkpoint_file, 'rb') as file:
+            checkpoint = pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+    if checkpoint.get('fingerprint') != fingerprint or 'completed_on' not in checkpoint or 'prefix_digest' not in checkpoint:
+        return None
+    # Offsets in a compressed file are into its decompressed bytes, so only a plain file's size can be compared
+    if input_compression(advancement_file) is None and os.path.getsize(advancement_file) < checkpoint['offset']:
+        return None
+    return checkpoint
+
+def write_checkpoint(checkpoint_file, checkpoint):
+    write_atomic(checkpoint_file, pickle.dumps(checkpoint, protocol=pickle.HIGHEST_PROTOCOL))
+
+def load_advancements_checkpointed(advancement_file, checkpoint_file, patrol_structure, requirements,
+                                   roster_index=None, completion_matrix=None, raw=False,
+                                   chunk_size=ADVANCEMENT_CHUNK_SIZE, stats=None, scout_matcher=None):
+    """
+    Load an advancement file, resuming from a saved checkpoint when the file has only grown since.
+
+    The checkpoint holds the byte offset processed so far, a digest of every byte before it and the
+    accumulated per-scout state, including completion dates. If the file no longer starts with the processed bytes, or the roster
+    or requirements have changed, the whole file is loaded again. The processed bytes are hashed again on
+    every resume (but not parsed), so a row changed anywhere before the offset is noticed.
+
+    A final line without a newline is loaded, but the offset is not moved past it and it is not saved
+    in the checkpoint, so a row that was still being written is read again in full next time.
+
+    A compressed file (such as a gzip file that new members are appended to) is checkpointed by its
+    decompressed bytes: the rows before the offset are decompressed again but not parsed. A file that is
+    not UTF-8 is loaded whole every time, as its lines cannot be found from a byte offset.
+
+    :param advancement_file: Path to the cleaned advancement CSV, or the raw Scoutbook backup if raw is set
+    :param checkpoint_file: Path of the checkpoint to resume from and update
+    :param patrol_structure: Dictionary of patrols and their scouts (advancements are added to it)
+    :param requirements: Requirements to accept as completions
+    :param roster_index: Index from build_roster_index (defaults to None, which means it is built here)
+    :param completion_matrix: Optional CompletionMatrix to mark completions in
+    :param raw: Clean the raw Scoutbook backup while loading it
+    :param chunk_size: Maximum number of rows per chunk
+    :param stats: Optional dictionary to add row counts for the rows read in this call to
+    :param scout_matcher: Optional ScoutNameMatcher for loading unmatched scouts under roster names
+    :return: The patrol structure, a Counter of unmatched scout names and a list of unmatched requirements
+    """
+    with open_input_binary(advancement_file) as file:
+        encoding = detect_encoding(file.peek(4))
+    if encoding not in CHECKPOINT_ENCODINGS:
+        print(f"'{advancement_file}' is {encoding}, which cannot be checkpointed. Loading the whole file.")
+        if raw:
+            chunks = read_raw_advancement_chunks(advancement_file, chunk_size=chunk_size, stats=stats)
+        else:
+            chunks = read_advancement_chunks(advancement_file, chunk_size=chunk_size)
+        return fold_advancement_chunks(chunks, patrol_structure, requirements, roster_index=roster_index, completion_matrix=completion_matrix,
+                                       stats=stats, scout_matcher=scout_matcher)
+
+    if roster_index is None:
+        roster_index = build_roster_index(patrol_structure)
+    fingerprint = _inputs_fingerprint(patrol_structure, requirements, raw, scout_matcher is not None)
+    checkpoint = read_checkpoint(checkpoint_file, advancement_file, fingerprint)
+    if checkpoint is not None and completion_matrix is not None and checkpoint['completed_on'] is None:
+        checkpoint = None  # Saved without a matrix, so the completion dates were not kept
+
+    file = open_input_binary(advancement_file)
+    try:
+        digest = hashlib.sha256()
+        if checkpoint is not None and not (_hash_prefix(file, checkpoint['offset'], digest) and digest.hexdigest() == checkpoint['prefix_digest']):
+            # The processed bytes changed, so start again from the top of the file
+            checkpoint = None
+            file.close()
+            file = open_input_binary(advancement_file)
+            digest = hashlib.sha256()
+        if checkpoint is None:
+            print(f"No usable checkpoint for '{advancement_file}'. Loading the whole file.")
+            header_bytes = file.readline()
+            digest.update(header_bytes)
+            header_line = header_bytes.decode(encoding, FALLBACK_ERRORS)
+        else:
+            # Restore the saved state, then read only the rows added after the saved offset
+            for scout_name, advancements in checkpoint['advancements'].items():
+                _, scout_record = roster_index[scout_name]
+                scout_record['advancements'].extend(advancements)
+                if scout_name in checkpoint['aliases']:
+                    scout_record['aliases'] = dict(checkpoint['aliases'][scout_name])
+                if completion_matrix is not None:
+                    for advancement in advancements:
+                        day = checkpoint['completed_on'].get((scout_name, advancement), NO_DATE)
+                        completion_matrix.mark(scout_name, advancement, day)
+            header_line = checkpoint['header']
+
+        # The header is kept in the checkpoint so the rows after the offset can be parsed on their own
+        lines = _OffsetLines(file, checkpoint['offset'] if checkpoint is not None else len(header_bytes), digest)
+        patrol_structure, additional_scouts, additional_requirements = _fold_lines(
+            _prepend(header_line, lines), patrol_structure, requirements, raw, roster_index, completion_matrix, chunk_size, stats, scout_matcher)
+    finally:
+        file.close()
+
+    if checkpoint is not None:
+        additional_scouts.update(checkpoint['additional_scouts'])
+        additional_requirements = list(set(additional_requirements) | checkpoint['additional_requirements'])
+
+    write_checkpoint(checkpoint_file, {
+        'fingerprint': fingerprint,
+        'offset': lines.offset,
+        'prefix_digest': digest.hexdigest(),
+        'header': header_line,
+        'advancements': {scout_name: list(record['advancements'])
+                         for scout_name, (_, record) in roster_index.items() if record['advancements']},
+        'aliases': {scout_name: dict(record['aliases']) for scout_name, (_, record) in roster_index.items() if record.get('aliases')},
+        'additional_scouts': additional_scouts,
+        'additional_requirements': set(additional_requirements),
+        'completed_on': _completion_dates(completion_matrix),
+    })
+
+    # Load an unfinished final line for this run only, after the checkpoint has been saved without it
+    if lines.pending is not None:
+        _, pending_scouts, pending_requirements = _fold_lines(
+            [header_line, lines.pending], patrol_structure, requirements, raw, roster_index, completion_matrix, chunk_size, stats, scout_matcher)
+        additional_scouts.update(pending_scouts)
+        additional_requirements = list(set(additional_requirements) | set(pending_requirements))
+
+    return patrol_structure, additional_scouts, additional_requirements
+
+def _fold_lines(lines, patrol_structure, requirements, raw, roster_index, completion_matrix, chunk_size, stats, scout_matcher):
+    # Parse lines of the advancement file (starting with its header) and fold them into the patrol structure
+    if raw:
+        chunks = chunk_raw_advancement_rows(lines, chunk_size=chunk_size, stats=stats)
+    else:
+        chunks = chunk_advancement_rows(lines, chunk_size=chunk_size)
+    return fold_advancement_chunks(chunks, patrol_structure, requirements, roster_index=roster_index, completion_matrix=completion_matrix,
+                                   stats=stats, scout_matcher=scout_matcher)
+
+def _prepend(first_line, lines):
+    yield first_line
+    yield from lines
+
+def _completion_dates(completion_matrix):
+    # (scout, requirement) -> day ordinal for every dated completion in the matrix
+    if completion_matrix is None:
+        return None
+    requirement_ids, scout_ids = np.nonzero(completion_matrix.completed_on)
+    return {(completion_matrix.scouts[scout_id], completion_matrix.requirements[requirement_id]): int(completion_matrix.completed_on[requirement_id, scout_id])
+            for requirement_id, scout_id in zip(requirement_ids, scout_ids)}
@@ -1,51 +1,324 @@
-import pandas as pd
 import argparse
+import csv
+import heapq
+import importlib.util
+import os
+import tempfile
+import time
+from functools import lru_cache
+from scout_tracking.dates import NO_DATE, parse_date, format_date
+from scout_tracking.instrument import Instrumentation
+from scout_tracking.metrics import write_run_metrics, file_sizes
+from scout_tracking.input_files import open_input
 
-def clean_csv(input_file, output_file):
-    # Load the CSV file
-    df = pd.read_csv(input_file)
+# Advancement values and advancement type prefixes that are not Scouts BSA advancement work
+ADVANCEMENT_REMOVE_VALUES = [
+    'Bobcat', 'Tiger', 'Wolf', 'Bear', 'Webelos',
+    'Arrow of Light', 'Venturing', 'Discovery',
+    'Pathfinder', 'Summit', 'Lion'
+]
+ADVANCEMENT_TYPE_REMOVE_PREFIXES = [
+    'Venturing', 'Discovery', 'Pathfinder',
+    'Summit', 'Merit', 'Award', 'Webelos',
+    'Arrow of Light', 'Adventure', 'Tiger',
+    'Lion', 'Bobcat', 'Wolf', 'Bear', 'Webelos',
+    'Academics'
+]
 
+# Columns of the backup file that the cleaner needs, read as categoricals since names,
+# advancement types, advancements and dates repeat heavily across rows
+RAW_COLUMNS = ['First Name', 'Last Name', 'Advancement Type', 'Advancement', 'Date Completed']
+RAW_COLUMN_DTYPES = {column: 'category' for column in RAW_COLUMNS}
+
+# Maximum number of sorted chunk files merged at once by the chunked cleaner
+MERGE_FAN_IN = 64
+
+# Column holding each row's completion date as a day ordinal, used to sort by date rather than by date text
+DAY_COLUMN = 'Day'
+CLEANED_COLUMNS = ['Name', 'Advancement Info', 'Date Completed']
+
+# Line ending of the cleaned file, matching pandas' to_csv so every engine writes the same bytes
+CLEANED_LINE_TERMINATOR = '\n'
+
+# Engines clean_csv can read the backup with: pandas, the standard library csv module, or whichever suits the file
+ENGINE_AUTO = 'auto'
+ENGINE_PANDAS = 'pandas'
+ENGINE_CSV = 'csv'
+CLEAN_ENGINES = [ENGINE_AUTO, ENGINE_PANDAS, ENGINE_CSV]
+
+# Smallest backup ENGINE_AUTO cleans with pandas; below this, importing pandas takes longer than it saves
+PANDAS_MIN_BYTES = 32 << 20
+
+def pandas_available():
+    # Checked without importing pandas, which takes longer than cleaning a small file
+    return importlib.util.find_spec('pandas') is not None
+
+def _count(stats, key, value):
+    if stats is not None:
+        stats[key] = stats.get(key, 0) + value
+
+def clean_frame(df, stats=None):
+    """
+    Apply the advancement filters to a frame of backup rows and build the simplified columns.
+
+    :param df: DataFrame with at least the RAW_COLUMNS columns
+    :param stats: Optional dictionary to add the raw_rows_read, rows_filtered and rows_missing_date counts to
+    :return: DataFrame with Name, Advancement Info, Date Completed and Day (the date as a day ordinal)
+        columns, without rows missing a date
+    """
+    import pandas as pd
+
+    rows_read = len(df)
     # Filter out unwanted advancement values
-    advancement_remove_values = [
-        'Bobcat', 'Tiger', 'Wolf', 'Bear', 'Webelos',
-        'Arrow of Light', 'Venturing', 'Discovery',
-        'Pathfinder', 'Summit', 'Lion'
-    ]
-    advancement_type_remove_prefixes = [
-        'Venturing', 'Discovery', 'Pathfinder',
-        'Summit', 'Merit', 'Award', 'Webelos',
-        'Arrow of Light', 'Adventure', 'Tiger',
-        'Lion', 'Bobcat', 'Wolf', 'Bear', 'Webelos',
-        'Academics'
-    ]
-    df = df[~df['Advancement'].isin(advancement_remove_values)]
-    df = df[~df['Advancement Type'].str.startswith(tuple(advancement_type_remove_prefixes))]
+    df = df[~df['Advancement'].isin(ADVANCEMENT_REMOVE_VALUES)]
+    advancement_types = df['Advancement Type'].astype('category')
+    categories = advancement_types.cat.categories
+    # Test the prefixes once per distinct advancement type rather than once per row
+    removed_types = categories[categories.str.startswith(tuple(ADVANCEMENT_TYPE_REMOVE_PREFIXES))]
+    df = df[~advancement_types.isin(removed_types)]
+    _count(stats, 'raw_rows_read', rows_read)
+    _count(stats, 'rows_filtered', rows_read - len(df))
 
-    # Create simplified columns
-    df['Name'] = df['First Name'].str.strip() + ' ' + df['Last Name'].str.strip()
-    df['Advancement Info'] = df['Advancement Type'].str.strip() + ' ' + df['Advancement'].str.strip()
-    df['Date Completed'] = pd.to_datetime(df['Date Completed'], errors='coerce').dt.strftime('%-m/%-d/%Y')
+    # Parse each distinct date once and map the formatted dates and day ordinals back onto the rows.
+    # Dates go through the same parser as the csv engine and --raw, so every path accepts the same dates
+    dates = df['Date Completed'].astype('category')
+    date_categories = dates.cat.categories
+    cleaned_dates = [_cleaned_date(date_text) for date_text in date_categories]
+    formatted_dates = [formatted for formatted, _ in cleaned_dates]
+    day_ordinals = [day for _, day in cleaned_dates]
 
-    # Select only the desired columns
-    result = df[['Name', 'Advancement Info', 'Date Completed']]
+    # Create simplified columns
+    result = pd.DataFrame({
+        'Name': df['First Name'].astype(object).fillna('').str.strip() + ' ' + df['Last Name'].astype(object).fillna('').str.strip(),
+        'Advancement Info': df['Advancement Type'].astype(object).str.strip() + ' ' + df['Advancement'].astype(object).str.strip(),
+        'Date Completed': dates.map(dict(zip(date_categories, formatted_dates))),
+        DAY_COLUMN: dates.map(dict(zip(date_categories, day_ordinals))),
+    })
 
     # Drop rows with missing dates
-    result = result.dropna(subset=['Date Completed'])
+    cleaned = result.dropna(subset=['Date Completed'])
+    _count(stats, 'rows_missing_date', len(result) - len(cleaned))
+    return cleaned.astype({DAY_COLUMN: 'int32'})
+
+def clean_csv(input_file, output_file, chunksize=None, engine=ENGINE_AUTO):
+    """
+    Clean a Scoutbook backup file into a sorted Name, Advancement Info, Date Completed CSV.
+
+    :param input_file: Path to the advancement data backup file downloaded from Scoutbook, plain or
+        compressed (gzip, bz2, xz or zstd)
+    :param output_file: Path to save the cleaned CSV file
+    :param chunksize: Number of rows to read at a time (defaults to None, which means the whole
+        file is cleaned in memory). Each chunk is cleaned and sorted on its own and the sorted
+        chunks are merged, so memory use is bounded by the chunk size.
+    :param engine: ENGINE_PANDAS, ENGINE_CSV (the standard library csv module, which needs no pandas
+        and starts faster) or ENGINE_AUTO (defaults to ENGINE_AUTO, which means pandas for files of at
+        least PANDAS_MIN_BYTES if it is installed, and the csv module otherwise). Every engine writes the same file.
+    :return: Dictionary of row counts: raw_rows_read, rows_filtered, rows_missing_date and rows_written
+    """
+    if engine == ENGINE_AUTO:
+        engine = ENGINE_PANDAS if os.path.getsize(input_file) >= PANDAS_MIN_BYTES and pandas_available() else ENGINE_CSV
+    stats = {'raw_rows_read': 0, 'rows_filtered': 0, 'rows_missing_date': 0}
+    if chunksize:
+        clean_csv_chunked(input_file, output_file, chunksize, stats=stats, engine=engine)
+    elif engine == ENGINE_CSV:
+        # Sort by name and date; the sort is stable, so rows for the same day keep their file order
+        with open_input(input_file) as file:
+            rows = sorted(clean_raw_rows(file, stats=stats), key=_name_and_day)
+        with open(output_file, 'w', newline='') as file:
+            writer = csv.writer(file, lineterminator=CLEANED_LINE_TERMINATOR)
+            writer.writerow(CLEANED_COLUMNS)
+            writer.writerows(row[:3] for row in rows)
+    else:
+        import pandas as pd
+
+        # Load the CSV file, keeping only the columns we need
+        with open_input(input_file) as file:
+            df = pd.read_csv(file, usecols=RAW_COLUMNS, dtype=RAW_COLUMN_DTYPES)
+        result = clean_frame(df, stats=stats)
 
-    # Sort by name and date
-    result = result.sort_values(by=['Name', 'Date Completed'])
+        # Sort by name and date
+        result = result.sort_values(by=['Name', DAY_COLUMN], kind='mergesort')
 
-    # Save to CSV
-    result.to_csv(output_file, index=False)
+        # Save to CSV
+        result.to_csv(output_file, index=False, columns=CLEANED_COLUMNS)
 
+    stats['rows_written'] = stats['raw_rows_read'] - stats['rows_filtered'] - stats['rows_missing_date']
     print(f"Cleaning complete! The cleaned file is saved as '{output_file}'.")
+    return stats
+
+def _name_and_day(row):
+    return row[0], row[3]
+
+def _write_sorted_runs(input_file, chunksize, temp_dir, stats, engine):
+    # Clean and sort each chunk, spilling it to its own run file with the day ordinal as a sort key
+    run_files = []
+    if engine == ENGINE_CSV:
+        with open_input(input_file) as file:
+            rows = clean_raw_rows(file, stats=stats)
+            while True:
+                run = sorted((row for _, row in zip(range(chunksize), rows)), key=_name_and_day)
+                if not run:
+                    break
+                run_file = os.path.join(temp_dir, f"run_{len(run_files)}.csv")
+                with open(run_file, 'w', newline='') as run_output:
+                    csv.writer(run_output).writerows(run)
+                run_files.append(run_file)
+    else:
+        import pandas as pd
+
+        with open_input(input_file) as file:
+            for chunk in pd.read_csv(file, usecols=RAW_COLUMNS, dtype=RAW_COLUMN_DTYPES, chunksize=chunksize):
+                result = clean_frame(chunk, stats=stats).sort_values(by=['Name', DAY_COLUMN], kind='mergesort')
+                run_file = os.path.join(temp_dir, f"run_{len(run_files)}.csv")
+                result.to_csv(run_file, index=False, header=False)
+                run_files.append(run_file)
+    return run_files
+
+def clean_csv_chunked(input_file, output_file, chunksize, stats=None, engine=ENGINE_PANDAS):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        run_files = _write_sorted_runs(input_file, chunksize, temp_dir, stats, engine)
+
+        # Merge the runs a limited number at a time until few enough remain for the final merge
+        while len(run_files) > MERGE_FAN_IN:
+            merged_files = []
+            for start in range(0, len(run_files), MERGE_FAN_IN):
+                merged_file = os.path.join(temp_dir, f"merge_{len(run_files)}_{start}.csv")
+                with open(merged_file, 'w', newline='') as file:
+                    csv.writer(file).writerows(merge_sorted_runs(run_files[start:start + MERGE_FAN_IN]))
+                merged_files.append(merged_file)
+            run_files = merged_files
+
+        with open(output_file, 'w', newline='') as file:
+            writer = csv.writer(file, lineterminator=CLEANED_LINE_TERMINATOR)
+            writer.writerow(CLEANED_COLUMNS)
+            writer.writerows(row[:3] for row in merge_sorted_runs(run_files))
+
+def merge_sorted_runs(run_files):
+    # Stable k-way merge of run files sorted by name and day ordinal; ties keep run order
+    files = [open(run_file, 'r', newline='') for run_file in run_files]
+    try:
+        readers = [csv.reader(file) for file in files]
+        yield from heapq.merge(*readers, key=lambda row: (row[0], int(row[3])))
+    finally:
+        for file in files:
+            file.close()
+
+def normalize_date(date_text):
+    """
+    Normalize a Scoutbook date to the m/d/YYYY form written by clean_csv.
+
+    :param date_text: Date string from the backup file
+    :return: The normalized date, or None if the date is missing or cannot be parsed
+    """
+    return _cleaned_date(date_text)[0]
+
+@lru_cache(maxsize=65536)
+def _cleaned_date(date_text):
+    # (m/d/YYYY date, day ordinal) for a backup date, or (None, NO_DATE); memoized as dates repeat heavily
+    parsed = parse_date(date_text)
+    if parsed is None:
+        return None, NO_DATE
+    return format_date(parsed.toordinal()), parsed.toordinal()
+
+def read_raw_advancement_chunks(input_file, chunk_size=10000, stats=None):
+    """
+    Stream a raw Scoutbook backup as cleaned (Name, Advancement Info, Date Completed) rows.
+
+    Applies the same filters as clean_csv row by row, without writing an intermediate file.
+    Rows come out in file order rather than sorted by name and date.
+
+    :param input_file: Path to the advancement backup file downloaded from Scoutbook, plain or compressed
+    :param chunk_size: Maximum number of rows per chunk
+    """
+    with open_input(input_file) as file:
+        yield from chunk_raw_advancement_rows(file, chunk_size=chunk_size, stats=stats)
+
+def chunk_raw_advancement_rows(lines, chunk_size=10000, stats=None):
+    """
+    Clean lines of a raw Scoutbook backup into lists of at most chunk_size rows.
+
+    :param lines: Iterable of CSV lines, starting with the header line
+    :param chunk_size: Maximum number of rows per chunk
+    :param stats: Optional dictionary to add the raw_rows_read, rows_filtered and rows_missing_date counts to
+    """
+    chunk = []
+    for name, advancement_info, date_completed, _ in clean_raw_rows(lines, stats=stats):
+        chunk.append([name, advancement_info, date_completed])
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def clean_raw_rows(lines, stats=None):
+    """
+    Clean lines of a raw Scoutbook backup with the standard library csv module.
+
+    Applies the same filters as clean_frame. Columns are found by name in the header line and
+    read by position, and each distinct date is parsed once.
+
+    :param lines: Iterable of CSV lines, starting with the header line
+    :param stats: Optional dictionary to add the raw_rows_read, rows_filtered and rows_missing_date counts to
+    :return: Generator of (Name, Advancement Info, Date Completed, day ordinal) tuples, in file order
+    :raises ValueError: If the header line is missing one of the RAW_COLUMNS columns
+    """
+    advancement_type_prefixes = tuple(ADVANCEMENT_TYPE_REMOVE_PREFIXES)
+    advancement_remove_values = set(ADVANCEMENT_REMOVE_VALUES)
+
+    reader = csv.reader(lines)
+    header = next(reader, None) or []
+    missing = [column for column in RAW_COLUMNS if column not in header]
+    if missing:
+        raise ValueError(f"Advancement backup is missing the {', '.join(missing)} column(s)")
+    first_name, last_name, advancement_type_column, advancement_column, date_column = (header.index(column) for column in RAW_COLUMNS)
+    width = len(header)
+
+    rows_read = rows_filtered = rows_missing_date = 0
+    for row in reader:
+        if not row:
+            continue  # Blank line
+        if len(row) < width:
+            row += [''] * (width - len(row))
+        rows_read += 1
+        advancement = row[advancement_column]
+        advancement_type = row[advancement_type_column]
+        if advancement in advancement_remove_values or advancement_type.startswith(advancement_type_prefixes):
+            rows_filtered += 1
+            continue
+
+        # Drop rows with missing dates
+        date_completed, day = _cleaned_date(row[date_column])
+        if date_completed is None:
+            rows_missing_date += 1
+            continue
+
+        yield (row[first_name].strip() + ' ' + row[last_name].strip(),
+               advancement_type.strip() + ' ' + advancement.strip(),
+               date_completed, day)
+
+    _count(stats, 'raw_rows_read', rows_read)
+    _count(stats, 'rows_filtered', rows_filtered)
+    _count(stats, 'rows_missing_date', rows_missing_date)
 
 def main():
     parser = argparse.ArgumentParser(description="Clean and simplify a BSA advancement CSV file.")
     parser.add_argument('input_file', help="Path to the input CSV file")
     parser.add_argument('output_file', help="Path to save the cleaned CSV file")
+    parser.add_argument('--chunksize', type=int, default=None, help="Clean the file this many rows at a time to bound memory use")
+    parser.add_argument('--engine', choices=CLEAN_ENGINES, default=ENGINE_AUTO, help="Read the file with pandas or the standard library csv module (default: pandas for files of 32 MiB or more, if installed)")
+    parser.add_argument('--metrics-dir', default=None, help="Directory to write run metrics (JSON and Prometheus textfile) to")
     args = parser.parse_args()
-    clean_csv(args.input_file, args.output_file)
+
+    started_at = time.time()
+    instrumentation = Instrumentation()
+    with instrumentation.stage('clean_csv') as stage:
+        stats = clean_csv(args.input_file, args.output_file, chunksize=args.chunksize, engine=args.engine)
+        stage['rows'] = stats['raw_rows_read']
+
+    if args.metrics_dir:
+        write_run_metrics(args.metrics_dir, 'clean_advancement', started_at,
+                          inputs=file_sizes({'advancement_backup': args.input_file}), counts=stats,
+                          stages=instrumentation.stages, outputs=file_sizes({'output_bytes': args.output_file}))
 
 if __name__ == '__main__':
     main()
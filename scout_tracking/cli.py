@@ -0,0 +1,38 @@
+import sys
+import argparse
+import importlib
+
+# Subcommands of the scout-tracking command: the module whose main() runs each one, and its help.
+# A module is only imported when its subcommand runs, so each command loads no more than it needs.
+COMMANDS = {
+    'clean': ('scout_tracking.clean_advancement', "Clean a Scoutbook backup into a sorted advancement CSV"),
+    'report': ('scout_tracking.main', "Generate patrol reports for one troop"),
+    'batch': ('scout_tracking.batch', "Generate patrol reports for every troop in a manifest"),
+    'store': ('scout_tracking.sqlite_store', "Generate patrol reports from a SQLite store"),
+    'serve': ('scout_tracking.server', "Serve patrol and scout reports over HTTP"),
+    'synthetic': ('scout_tracking.synthetic', "Generate a synthetic Scoutbook backup, roster and requirements"),
+}
+
+PROGRAM = 'scout-tracking'
+
+def main(argv=None):
+    """
+    Run a scout-tracking subcommand, passing the remaining arguments to it.
+
+    :param argv: Command-line arguments (defaults to None, which means sys.argv[1:])
+    """
+    command_lines = '\n'.join(f"  {name:<12}{help_text}" for name, (_, help_text) in COMMANDS.items())
+    parser = argparse.ArgumentParser(prog=PROGRAM, description="Scout advancement tracking tools.",
+                                     epilog=f"commands:\n{command_lines}\n\nRun '{PROGRAM} <command> --help' for the options of a command.",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=list(COMMANDS), metavar='command', help="Command to run (see below)")
+    parser.add_argument('arguments', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    module_name, _ = COMMANDS[args.command]
+    # The subcommand parses sys.argv itself, and names itself after it in usage messages
+    sys.argv = [f"{PROGRAM} {args.command}"] + args.arguments
+    return importlib.import_module(module_name).main()
+
+if __name__ == '__main__':
+    main()
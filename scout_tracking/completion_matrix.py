@@ -0,0 +1,153 @@
+import copy
+import numpy as np
+from scout_tracking.dates import NO_DATE, date_ordinal
+from scout_tracking.catalog import RequirementCatalog
+
+class CompletionMatrix:
+    """
+    Dense requirement x scout completion matrix.
+
+    Scouts and requirements are interned to integer IDs once, and completions are
+    held in a NumPy boolean array with one row per requirement and one column per
+    scout, so a patrol report is a column slice of the matrix. A parallel int32 array
+    holds the day ordinal each requirement was first completed on (NO_DATE if unknown),
+    so snapshots as of earlier dates are masks over the same arrays.
+    """
+
+    def __init__(self, scouts, requirements):
+        """
+        :param scouts: Iterable of scout names (lowercase, as in the patrol structure)
+        :param requirements: RequirementCatalog from load_requirements, whose IDs become the row
+            indices, or any iterable of requirement names
+        """
+        self.scouts = []
+        self.scout_ids = {}
+        for scout in scouts:
+            if scout not in self.scout_ids:
+                self.scout_ids[scout] = len(self.scouts)
+                self.scouts.append(scout)
+
+        if isinstance(requirements, RequirementCatalog):
+            # Reuse the catalog's IDs, so requirement IDs index the matrix rows directly
+            self.requirements = list(requirements.names)
+            self.requirement_ids = dict(requirements.ids)
+        else:
+            self.requirements = []
+            self.requirement_ids = {}
+            for requirement in requirements:
+                requirement = requirement.lower()
+                if requirement not in self.requirement_ids:
+                    self.requirement_ids[requirement] = len(self.requirements)
+                    self.requirements.append(requirement)
+
+        self.completed = np.zeros((len(self.requirements), len(self.scouts)), dtype=bool)
+        self.completed_on = np.full((len(self.requirements), len(self.scouts)), NO_DATE, dtype=np.int32)
+
+    @classmethod
+    def from_patrol_structure(cls, patrol_structure, requirements, patrol_names=None):
+        """
+        Build a matrix from the advancements already loaded into a patrol structure.
+
+        :param patrol_structure: Dictionary of patrols and their scouts with completed requirements
+        :param requirements: Requirements to index
+        :param patrol_names: Patrols to include (defaults to None, which means all patrols)
+        """
+        if patrol_names is None:
+            patrol_names = list(patrol_structure.keys())
+        patrols = [patrol_structure[name] for name in patrol_names if name in patrol_structure]
+
+        matrix = cls((scout for patrol in patrols for scout in patrol), requirements)
+        for patrol in patrols:
+            for scout_name, scout_data in patrol.items():
+                for advancement in scout_data['advancements']:
+                    matrix.mark(scout_name, advancement.lower())
+        return matrix
+
+    def mark(self, scout_name, requirement, day=NO_DATE):
+        """
+        Record a completion. Unknown scouts or requirements are ignored.
+
+        When a requirement is recorded more than once, the earliest date is kept.
+
+        :param scout_name: Lowercase scout name
+        :param requirement: Lowercase requirement name
+        :param day: Day ordinal of the completion date (defaults to NO_DATE)
+        """
+        scout_id = self.scout_ids.get(scout_name)
+        requirement_id = self.requirement_ids.get(requirement)
+        if scout_id is not None and requirement_id is not None:
+            self.mark_ids(requirement_id, scout_id, day)
+
+    def mark_ids(self, requirement_id, scout_id, day=NO_DATE):
+        # Record a completion by row and column index, keeping the earliest date
+        self.completed[requirement_id, scout_id] = True
+        recorded = self.completed_on[requirement_id, scout_id]
+        if day != NO_DATE and (recorded == NO_DATE or day < recorded):
+            self.completed_on[requirement_id, scout_id] = day
+
+    def mark_many(self, requirement_ids, scout_ids, days):
+        """
+        Record many completions at once by row and column index, keeping the earliest date of each.
+
+        :param requirement_ids: Array of row indices
+        :param scout_ids: Array of column indices
+        :param days: Array of day ordinals, NO_DATE where the date is unknown
+        """
+        self.completed[requirement_ids, scout_ids] = True
+        dated = days != NO_DATE
+        cells = np.ravel_multi_index((requirement_ids[dated], scout_ids[dated]), self.completed_on.shape)
+        days = days[dated]
+
+        # Earliest date per cell: sort by cell then date and keep the first of each cell
+        order = np.lexsort((days, cells))
+        cells, first = np.unique(cells[order], return_index=True)
+        earliest = days[order][first]
+        recorded = self.completed_on.flat[cells]
+        self.completed_on.flat[cells] = np.where((recorded == NO_DATE) | (earliest < recorded), earliest, recorded)
+
+    def between(self, start=None, end=None):
+        """
+        Snapshot of the completions dated within a date range.
+
+        Completions with no recorded date are left out, since they cannot be placed in time.
+        The snapshot shares the scout and requirement IDs of this matrix.
+
+        :param start: First date to include, as a datetime.date, date string or day ordinal (defaults to None, no lower bound)
+        :param end: Last date to include, as a datetime.date, date string or day ordinal (defaults to None, no upper bound)
+        :return: CompletionMatrix holding only the completions in the range
+        """
+        in_range = self.completed_on != NO_DATE
+        if start is not None:
+            in_range &= self.completed_on >= _day(start)
+        if end is not None:
+            in_range &= self.completed_on <= _day(end)
+
+        snapshot = copy.copy(self)
+        snapshot.completed = self.completed & in_range
+        snapshot.completed_on = np.where(snapshot.completed, self.completed_on, NO_DATE).astype(np.int32)
+        return snapshot
+
+    def as_of(self, end):
+        # Snapshot of the completions recorded on or before a date
+        return self.between(end=end)
+
+    def scout_columns(self, scout_names):
+        # Column indices for the given scouts, in the order given
+        return np.fromiter((self.scout_ids[name] for name in scout_names), dtype=np.intp, count=len(scout_names))
+
+    def requirement_rows(self, requirements):
+        # Row indices for the given requirements, in the order given
+        return np.fromiter((self.requirement_ids[name.lower()] for name in requirements), dtype=np.intp, count=len(requirements))
+
+    def catalog_rows(self, catalog):
+        # Row index for each catalog ID, or -1 for catalog requirements the matrix does not hold
+        return np.fromiter((self.requirement_ids.get(name, -1) for name in catalog.names), dtype=np.intp, count=len(catalog))
+
+def _day(value):
+    # Day ordinal of a date, date string or ordinal, refusing dates that cannot be parsed
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    ordinal = date_ordinal(value)
+    if ordinal == NO_DATE:
+        raise ValueError(f"Cannot parse date '{value}'")
+    return ordinal
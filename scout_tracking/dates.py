@@ -0,0 +1,86 @@
+import re
+import importlib.util
+from datetime import date, datetime
+from functools import lru_cache
+
+# Day ordinal stored for completions with no known date (real ordinals start at 1 for 1/1/0001)
+NO_DATE = 0
+
+# Date formats accepted in advancement files, tried in order; Scoutbook's own come first
+DATE_FORMATS = [
+    '%m/%d/%Y', '%Y-%m-%d', '%m/%d/%y', '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S', '%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M', '%m/%d/%Y %I:%M %p', '%m/%d/%Y %I:%M:%S %p',
+    '%Y/%m/%d', '%m-%d-%Y', '%m.%d.%Y', '%Y%m%d',
+    '%B %d, %Y', '%b %d, %Y', '%B %d %Y', '%b %d %Y', '%d %B %Y', '%d %b %Y', '%d %b %y', '%d-%b-%Y', '%d-%b-%y',
+    '%A, %B %d, %Y', '%a, %b %d, %Y',
+]
+
+# Date filled in for the parts a free-form date leaves out, so "July 2024" is always 7/1/2024
+FREE_FORM_DEFAULT = datetime(2000, 1, 1)
+
+# Free-form dates must give a four-digit year, so stray text such as "1a" is not read as a date
+_FOUR_DIGIT_YEAR = re.compile(r"(?<!\d)\d{4}(?!\d)")
+
+def dateutil_available():
+    # Checked without importing dateutil, which comes with pandas but is not needed for DATE_FORMATS
+    return importlib.util.find_spec('dateutil') is not None
+
+# Ordinal of the NumPy datetime64 epoch, for converting datetime64 days to ordinals
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+@lru_cache(maxsize=65536)
+def parse_date(date_text):
+    """
+    Parse a Scoutbook date.
+
+    DATE_FORMATS are tried first. Any other date is parsed free-form with dateutil when it is
+    installed, as pandas does, so every cleaning path accepts the dates pd.to_datetime did.
+    Results are memoized, since an export repeats the same few hundred dates many times.
+
+    :param date_text: Date string from an advancement file
+    :return: datetime.date, or None if the date is missing or cannot be parsed
+    """
+    stripped = date_text.strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(stripped, date_format).date()
+        except ValueError:
+            continue
+    if _FOUR_DIGIT_YEAR.search(stripped) and dateutil_available():
+        from dateutil import parser
+
+        try:
+            return parser.parse(stripped, default=FREE_FORM_DEFAULT).date()
+        except (ValueError, OverflowError):
+            return None
+    return None
+
+def date_ordinal(value):
+    """
+    Day ordinal of a date string or datetime.date, or NO_DATE if it cannot be parsed.
+    """
+    if isinstance(value, str):
+        value = parse_date(value)
+    return value.toordinal() if value is not None else NO_DATE
+
+def date_ordinals(date_texts):
+    """
+    Day ordinals for a sequence of date strings, parsing each distinct string once.
+
+    :param date_texts: Sequence of date strings
+    :return: NumPy int32 array of day ordinals, with NO_DATE for dates that cannot be parsed
+    """
+    import numpy as np  # Imported here so that only parsing dates, as the csv cleaning engine does, never loads NumPy
+
+    return np.fromiter(map(_text_ordinal, date_texts), dtype=np.int32, count=len(date_texts))
+
+@lru_cache(maxsize=65536)
+def _text_ordinal(date_text):
+    # Memoized date_ordinal for strings; a hit costs a dictionary lookup
+    parsed = parse_date(date_text)
+    return parsed.toordinal() if parsed is not None else NO_DATE
+
+def format_date(ordinal):
+    # The m/d/YYYY form written by clean_csv
+    day = date.fromordinal(int(ordinal))
+    return f"{day.month}/{day.day}/{day.year}"
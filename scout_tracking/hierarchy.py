@@ -0,0 +1,109 @@
+import re
+import numpy as np
+
+# Requirement names are '<rank> rank requirement <number><sub-requirement>', and the rank itself is 'rank <rank>'
+RANK_REQUIREMENT_MARKER = ' rank requirement '
+RANK_PREFIX = 'rank '
+
+# Requirement number and sub-requirement, e.g. '2b' -> ('2', 'b') and '10' -> ('10', '')
+REQUIREMENT_NUMBER = re.compile(r'(\d+)(.*)')
+
+def requirement_path(requirement):
+    """
+    Position of a requirement in the rank hierarchy.
+
+    :param requirement: Lowercase requirement name
+    :return: (rank,) for a rank itself, (rank, number, sub-requirement) for a rank requirement
+        (the sub-requirement is '' when there is none), or None for anything else
+    """
+    if RANK_REQUIREMENT_MARKER in requirement:
+        rank, requirement_number = requirement.split(RANK_REQUIREMENT_MARKER, 1)
+        match = REQUIREMENT_NUMBER.fullmatch(requirement_number.strip())
+        if match is None:
+            return rank, requirement_number.strip(), ''
+        return rank, match.group(1), match.group(2).strip()
+    if requirement.startswith(RANK_PREFIX):
+        return (requirement[len(RANK_PREFIX):],)
+    return None
+
+class RequirementHierarchy:
+    """
+    Rank index over a requirements catalog.
+
+    Built once from the requirement names: each requirement's rank is parsed from its name, and
+    rank membership is kept as a (ranks x requirements) matrix, so rollups for every scout are one
+    matrix product over a completion array rather than string scans per scout.
+    """
+
+    def __init__(self, requirement_names):
+        """
+        :param requirement_names: Lowercase requirement names, in catalog (matrix row) order
+        """
+        self.requirement_names = list(requirement_names)
+        self.ranks = []
+        self.rank_ids = np.full(len(self.requirement_names), -1, dtype=np.intp)
+        rank_index = {}
+        award_rows = {}
+
+        for row, requirement in enumerate(self.requirement_names):
+            path = requirement_path(requirement)
+            if path is None:
+                continue
+            rank = path[0]
+            if rank not in rank_index:
+                rank_index[rank] = len(self.ranks)
+                self.ranks.append(rank)
+            self.rank_ids[row] = rank_index[rank]
+            if len(path) == 1:
+                award_rows.setdefault(rank, row)
+        self.award_rows = np.array([award_rows.get(rank, -1) for rank in self.ranks], dtype=np.intp)
+
+        # Rows that make up each rank: its requirements and its award, which is the last step to the rank
+        self.rank_members = np.zeros((len(self.ranks), len(self.requirement_names)), dtype=np.int32)
+        ranked = np.nonzero(self.rank_ids >= 0)[0]
+        self.rank_members[self.rank_ids[ranked], ranked] = 1
+        self.rank_sizes = self.rank_members.sum(axis=1)
+
+    def rank_rollups(self, completed):
+        """
+        Per-rank progress for every scout in a completion array.
+
+        The rank award counts as one of the rank's requirements, so a scout who has done every
+        requirement still has one left until the award is recorded. A rank is complete once its award
+        is recorded (or, if the catalog does not list the award, once all of its requirements are).
+
+        :param completed: Boolean array with one row per requirement (in the hierarchy's order) and one column per scout
+        :return: Dictionary of arrays: 'done' and 'remaining' (ranks x scouts requirement counts, with a completed
+            rank counting all of its requirements as done), 'percent' (ranks x scouts, 0 to 100, rounded down),
+            'rank_complete' (ranks x scouts) and 'next_rank' (per scout: the first rank not yet complete, or -1
+            if every rank is)
+        """
+        scout_count = completed.shape[1]
+        done = self.rank_members @ completed.astype(np.int32)
+        award_done = np.zeros((len(self.ranks), scout_count), dtype=bool)
+        listed = self.award_rows >= 0
+        award_done[listed] = completed[self.award_rows[listed]]
+        sizes = self.rank_sizes[:, None]
+        rank_complete = award_done | (done >= sizes)
+        done = np.where(rank_complete, sizes, done)
+        # Every rank has at least one row (its award or a requirement), so sizes are never zero
+        percent = (done * 100) // sizes
+        if len(self.ranks):
+            next_rank = np.where(rank_complete.all(axis=0), -1, np.argmin(rank_complete, axis=0))
+        else:
+            next_rank = np.full(scout_count, -1)
+        return {
+            'done': done,
+            'remaining': sizes - done,
+            'percent': percent,
+            'rank_complete': rank_complete,
+            'next_rank': next_rank,
+        }
+
+    def rank_labels(self, requirements):
+        """
+        Display name of each rank: the alt text of 'rank <rank>' in the catalog, or the rank name in title case.
+
+        :param requirements: RequirementCatalog or dictionary of requirements and their alt text
+        """
+        return [requirements.get(RANK_PREFIX + rank, rank.title()) for rank in self.ranks]
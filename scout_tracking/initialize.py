@@ -13,3 +13,24 @@ def initialize_patrol_structure(patrol_data):
 
     return patrol_structure
 
+def build_roster_index(patrol_structure):
+    """
+    Build a flat scout -> (patrol name, scout record) index over a patrol structure.
+
+    The scout records in the index are the same dictionaries held in the patrol
+    structure, so updates made through the index show up in the structure.
+
+    :param patrol_structure: Dictionary of patrols and their scouts
+    :return: Dictionary mapping each scout name to a (patrol_name, scout_record) tuple
+    :raises ValueError: If a scout appears in more than one patrol
+    """
+    roster_index = {}
+    for patrol_name, scouts in patrol_structure.items():
+        for scout, record in scouts.items():
+            if scout in roster_index:
+                raise ValueError(
+                    f"Scout '{scout}' appears in both the '{roster_index[scout][0]}' "
+                    f"and '{patrol_name}' patrols."
+                )
+            roster_index[scout] = (patrol_name, record)
+    return roster_index
@@ -0,0 +1,141 @@
+import io
+import os
+import bz2
+import gzip
+import lzma
+import codecs
+import importlib.util
+
+# Compression formats open_input can read through
+COMPRESSION_GZIP = 'gzip'
+COMPRESSION_BZ2 = 'bz2'
+COMPRESSION_XZ = 'xz'
+COMPRESSION_ZSTD = 'zstd'
+
+# Leading bytes of each format, checked before the file name so a renamed archive is still read
+COMPRESSION_MAGIC = [
+    (b'\x1f\x8b', COMPRESSION_GZIP),
+    (b'BZh', COMPRESSION_BZ2),
+    (b'\xfd7zXZ\x00', COMPRESSION_XZ),
+    (b'\x28\xb5\x2f\xfd', COMPRESSION_ZSTD),
+]
+COMPRESSION_EXTENSIONS = {
+    '.gz': COMPRESSION_GZIP,
+    '.bz2': COMPRESSION_BZ2,
+    '.xz': COMPRESSION_XZ,
+    '.zst': COMPRESSION_ZSTD,
+    '.zstd': COMPRESSION_ZSTD,
+}
+
+# Byte order marks and the encodings they select; UTF-32 comes first as its little-endian mark starts with UTF-16's
+ENCODING_BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+DEFAULT_ENCODING = 'utf-8'
+
+# Encoding of files without a byte order mark that are not valid UTF-8, as Excel saves CSV files on Windows
+FALLBACK_ENCODING = 'cp1252'
+
+# Error handler for UTF-8 files that decodes any byte that is not UTF-8 as FALLBACK_ENCODING, for
+# a file whose first bytes are UTF-8 but which has a stray Windows-1252 character further on
+FALLBACK_ERRORS = 'scout_tracking_fallback'
+
+def _decode_fallback(error):
+    if not isinstance(error, UnicodeDecodeError):
+        raise error
+    return error.object[error.start:error.end].decode(FALLBACK_ENCODING, errors='replace'), error.end
+
+codecs.register_error(FALLBACK_ERRORS, _decode_fallback)
+
+def zstandard_available():
+    # Checked without importing zstandard, which is only needed for .zst files
+    return importlib.util.find_spec('zstandard') is not None
+
+def input_compression(path):
+    """
+    Compression format of an input file, from its leading bytes or else its extension.
+
+    :param path: Path to the file
+    :return: One of the COMPRESSION_* formats, or None for a plain file
+    """
+    with open(path, 'rb') as file:
+        head = file.read(6)
+    for magic, compression in COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return compression
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+def detect_encoding(head, default=DEFAULT_ENCODING):
+    """
+    Encoding of a text file from its first bytes.
+
+    A byte order mark decides the encoding (and is removed when reading). Without one, UTF-16
+    is recognised by the zero byte of an ASCII first character, as in a CSV header. Anything
+    else is read as the default encoding if the bytes given are valid UTF-8, and as
+    FALLBACK_ENCODING if they are not.
+
+    :param head: The first bytes of the file; at least four (fewer if the file is shorter), and
+        the more are given the more reliably a Windows-1252 file is told from UTF-8
+    :param default: Encoding of UTF-8 files without a byte order mark
+    """
+    for bom, encoding in ENCODING_BOMS:
+        if head.startswith(bom):
+            return encoding
+    if len(head) >= 2 and head[0] == 0 and head[1] != 0:
+        return 'utf-16-be'
+    if len(head) >= 2 and head[0] != 0 and head[1] == 0:
+        return 'utf-16-le'
+    try:
+        # Not final, as the sample may end part way through a character
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+    return default
+
+def open_input_binary(path):
+    """
+    Open an input file for reading bytes, decompressing it as it is read.
+
+    gzip, bz2 and xz files are read with the standard library, and zstd files with the zstandard
+    package. Plain files are opened as usual. The returned stream supports peek, so the encoding
+    can be detected without consuming any bytes.
+
+    :param path: Path to the file
+    :return: Buffered binary file object
+    :raises ValueError: If the file is zstd-compressed and zstandard is not installed
+    """
+    compression = input_compression(path)
+    if compression == COMPRESSION_GZIP:
+        return gzip.open(path, 'rb')
+    if compression == COMPRESSION_BZ2:
+        return bz2.open(path, 'rb')
+    if compression == COMPRESSION_XZ:
+        return lzma.open(path, 'rb')
+    if compression == COMPRESSION_ZSTD:
+        if not zstandard_available():
+            raise ValueError(f"'{path}' is zstd-compressed; install the zstandard package to read it")
+        import zstandard
+        # Read every frame, as pzstd and concatenated archives write several
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True, read_across_frames=True)
+        return io.BufferedReader(reader)
+    return open(path, 'rb')
+
+def open_input(path, encoding=None, newline=''):
+    """
+    Open an input file for reading text, whether it is plain or compressed.
+
+    :param path: Path to the file
+    :param encoding: Encoding of the file (defaults to None, which means it is detected by
+        detect_encoding from the bytes the stream has buffered)
+    :param newline: As for open; defaults to '', which is what the csv module expects
+    :return: Text file object
+    """
+    file = open_input_binary(path)
+    if encoding is None:
+        encoding = detect_encoding(file.peek(4))
+    errors = FALLBACK_ERRORS if encoding == DEFAULT_ENCODING else 'strict'
+    return io.TextIOWrapper(file, encoding=encoding, errors=errors, newline=newline)
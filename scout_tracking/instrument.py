@@ -0,0 +1,77 @@
+import os
+import time
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+
+class Instrumentation:
+    """
+    Per-stage timing, throughput and memory measurements for a pipeline run.
+
+    Each stage records its wall time and, when the caller sets it, the number of rows
+    processed. With track_memory, the peak memory allocated during the stage is recorded
+    with tracemalloc; with profile_dir, each stage is run under cProfile and its stats
+    are written to <profile_dir>/<stage>.pstats. Stages nested inside another stage are
+    timed, but are not profiled or memory tracked on their own.
+    """
+
+    def __init__(self, track_memory=False, profile_dir=None):
+        """
+        :param track_memory: Record peak memory per stage with tracemalloc (slows the run down)
+        :param profile_dir: Directory to write per-stage cProfile stats to (defaults to None, which means no profiling)
+        """
+        self.track_memory = track_memory
+        self.profile_dir = profile_dir
+        self.stages = []
+        self._depth = 0
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Measure a pipeline stage. Yields the stage's record, a dictionary whose 'rows' the caller may set.
+
+        :param name: Name of the stage, e.g. 'load_advancements'
+        """
+        stage = {'name': name, 'rows': None, 'seconds': None, 'peak_bytes': None}
+        outermost = self._depth == 0
+        self._depth += 1
+
+        profiler = None
+        if outermost and self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        if outermost and self.profile_dir:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage['seconds'] = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(os.path.join(self.profile_dir, f"{name}.pstats"))
+            if outermost and self.track_memory:
+                stage['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            self._depth -= 1
+            self.stages.append(stage)
+
+    def summary_lines(self):
+        # One formatted line per stage, in the order the stages finished
+        lines = [f"{'Stage':<30} {'Seconds':>9} {'Rows':>10} {'Rows/sec':>12} {'Peak MB':>9}"]
+        for stage in self.stages:
+            rows = stage['rows']
+            rate = rows / stage['seconds'] if rows is not None and stage['seconds'] > 0 else None
+            peak = stage['peak_bytes'] / (1 << 20) if stage['peak_bytes'] is not None else None
+            lines.append(f"{stage['name']:<30} {stage['seconds']:>9.3f} "
+                         f"{rows if rows is not None else '-':>10} "
+                         f"{f'{rate:,.0f}' if rate is not None else '-':>12} "
+                         f"{f'{peak:.1f}' if peak is not None else '-':>9}")
+        return lines
+
+    def close(self):
+        if self.track_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
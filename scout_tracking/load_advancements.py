@@ -1,39 +1,158 @@
 # load_advancements.py
 
 import csv
+import numpy as np
+from collections import Counter
+from scout_tracking.initialize import build_roster_index
+from scout_tracking.dates import date_ordinals
+from scout_tracking.catalog import as_catalog, UNKNOWN_REQUIREMENT
+from scout_tracking.input_files import open_input
 
-def load_advancements(advancement_file, patrol_structure, requirements):
-    additional_scouts = [] 
-    additional_requirements = set()
+# Number of advancement rows read from the file per chunk
+ADVANCEMENT_CHUNK_SIZE = 10000
+
+def read_advancement_chunks(advancement_file, chunk_size=ADVANCEMENT_CHUNK_SIZE):
+    """
+    Stream an advancement CSV as lists of at most chunk_size rows.
+
+    :param advancement_file: Path to the cleaned advancement CSV (Name, Advancement Info, Date Completed),
+        plain or compressed
+    :param chunk_size: Maximum number of rows per chunk
+    """
+    with open_input(advancement_file) as file:
+        yield from chunk_advancement_rows(file, chunk_size=chunk_size)
+
+def chunk_advancement_rows(lines, chunk_size=ADVANCEMENT_CHUNK_SIZE):
+    """
+    Parse lines of a cleaned advancement CSV into lists of at most chunk_size rows.
+
+    :param lines: Iterable of CSV lines, starting with the header line
+    :param chunk_size: Maximum number of rows per chunk
+    """
+    reader = csv.reader(lines)
+    next(reader, None)  # Skip the header row
+
+    chunk = []
+    for row in reader:
+        if len(row) != 3:
+            continue  # Skip rows that don't have 3 columns (Name, Advancement Info, Date Completed)
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def fold_advancement_chunks(chunks, patrol_structure, requirements, roster_index=None, completion_matrix=None, stats=None,
+                            scout_matcher=None):
+    """
+    Fold chunks of (scout name, advancement, date completed) rows into the patrol structure.
 
-    with open(advancement_file, mode='r') as file:
-        reader = csv.reader(file)
-        next(reader)  # Skip the header row
+    Each requirement is added to a scout's 'advancements' list once, however many rows record it,
+    and only unique unmatched requirements and per-name row counts for unmatched scouts are kept,
+    so memory does not grow with the number of rows.
 
-        for row in reader:
-            if len(row) != 3:
-                continue  # Skip rows that don't have 3 columns (Name, Advancement Info, Date Completed)
+    :param chunks: Iterable of row lists, e.g. from read_advancement_chunks
+    :param patrol_structure: Dictionary of patrols and their scouts
+    :param requirements: RequirementCatalog (or dictionary) of requirements to accept as completions
+    :param roster_index: Index from build_roster_index (defaults to None, which means it is built here)
+    :param completion_matrix: Optional CompletionMatrix to mark completions and their dates in
+    :param stats: Optional dictionary to add the rows_read, rows_matched, rows_unmatched_scout,
+        rows_unknown_requirement and rows_reconciled_scout counts to
+    :param scout_matcher: Optional ScoutNameMatcher used to load the rows of scouts who are not on the
+        roster under a confidently matched roster name, whose record counts them under 'aliases'
+        (defaults to None, which means they are reported as additional scouts)
+    :return: The patrol structure, a Counter of unmatched scout names and a list of unmatched requirements
+    """
+    additional_scouts = Counter()
+    additional_requirements = set()
+
+    # Index the roster once so each row costs a single lookup instead of a scan over every patrol
+    if roster_index is None:
+        roster_index = build_roster_index(patrol_structure)
 
-            scout_name, advancement, _ = row  # We don't need the Date Completed for now
+    # Look requirements up by catalog ID and scouts through a cache of the spellings seen, so each
+    # distinct string is lowercased and hashed once rather than once per row
+    catalog = as_catalog(requirements)
+    requirement_names = catalog.names
+    matrix_rows = completion_matrix.catalog_rows(catalog).tolist() if completion_matrix is not None else None
+    scout_lookups = {}
+    # (scout record, requirement ID) pairs already listed by this call, as rows repeat completions
+    listed = set()
 
+    rows_read = rows_matched = rows_unknown_requirement = rows_reconciled = 0
+    for chunk in chunks:
+        rows_read += len(chunk)
+        marked_rows, marked_scouts, marked_row_numbers = [], [], []
+        for row_number, (scout_name, advancement, _) in enumerate(chunk):
             # Check if the scout exists in the patrol structure
-            scout_name = scout_name.lower()
-            found_scout = False
-            for patrol, scouts in patrol_structure.items():
-                if scout_name in scouts:
-                    found_scout = True
-                    # Add the advancement to the scout's list in the patrol structure
-                    if advancement.lower() in requirements:
-                        scouts[scout_name]['advancements'].append(advancement.lower())
-                    else:
-                        additional_requirements.add(advancement)
-                    break
-
-            if not found_scout:
-                additional_scouts.append(scout_name)
-
-    # Debugging: Print the patrol structure after loading advancements
-#    print(f"Patrol structure after loading advancements: {patrol_structure}")
+            scout = scout_lookups.get(scout_name)
+            if scout is None:
+                scout = scout_lookups[scout_name] = _lookup_scout(scout_name, roster_index, completion_matrix, scout_matcher)
+            name, entry, scout_id, reconciled = scout
+            if entry is None:
+                additional_scouts[name] += 1
+                continue
+            if reconciled:
+                # Keep the spellings loaded under each roster name, so the matches can be reported
+                aliases = entry[1].setdefault('aliases', {})
+                aliases[name] = aliases.get(name, 0) + 1
+                rows_reconciled += 1
+
+            # Add the advancement to the scout's list in the patrol structure
+            requirement_id = catalog.id_of(advancement)
+            if requirement_id != UNKNOWN_REQUIREMENT:
+                pair = (id(entry[1]), requirement_id)
+                if pair not in listed:
+                    listed.add(pair)
+                    _list_advancement(entry[1]['advancements'], requirement_names[requirement_id], completion_matrix,
+                                      matrix_rows[requirement_id] if matrix_rows is not None else -1, scout_id)
+                if scout_id >= 0 and matrix_rows[requirement_id] >= 0:
+                    marked_rows.append(matrix_rows[requirement_id])
+                    marked_scouts.append(scout_id)
+                    marked_row_numbers.append(row_number)
+                rows_matched += 1
+            else:
+                additional_requirements.add(advancement)
+                rows_unknown_requirement += 1
+
+        # Mark the chunk's completions together, parsing each distinct date once
+        if marked_rows:
+            days = date_ordinals([chunk[row_number][2] for row_number in marked_row_numbers])
+            completion_matrix.mark_many(np.array(marked_rows, dtype=np.intp), np.array(marked_scouts, dtype=np.intp), days)
+
+    if stats is not None:
+        stats['rows_read'] = stats.get('rows_read', 0) + rows_read
+        stats['rows_matched'] = stats.get('rows_matched', 0) + rows_matched
+        stats['rows_unmatched_scout'] = stats.get('rows_unmatched_scout', 0) + rows_read - rows_matched - rows_unknown_requirement
+        stats['rows_unknown_requirement'] = stats.get('rows_unknown_requirement', 0) + rows_unknown_requirement
+        stats['rows_reconciled_scout'] = stats.get('rows_reconciled_scout', 0) + rows_reconciled
 
     return patrol_structure, additional_scouts, list(additional_requirements)
 
+def _list_advancement(advancements, requirement, completion_matrix, matrix_row, scout_id):
+    # Add a requirement to a scout's advancements unless an earlier load listed it already, which
+    # the completion matrix answers directly; without one, the scout's list is searched
+    if scout_id >= 0 and matrix_row >= 0:
+        if not completion_matrix.completed[matrix_row, scout_id]:
+            advancements.append(requirement)
+    elif requirement not in advancements:
+        advancements.append(requirement)
+
+def _lookup_scout(scout_name, roster_index, completion_matrix, scout_matcher):
+    # (lowercase name, roster entry or None, matrix column or -1, whether the name was reconciled) for a spelling
+    name = scout_name.lower()
+    roster_name = name
+    entry = roster_index.get(name)
+    if entry is None and scout_matcher is not None:
+        roster_name = scout_matcher.resolve(name)
+        entry = roster_index.get(roster_name) if roster_name is not None else None
+    scout_id = completion_matrix.scout_ids.get(roster_name, -1) if completion_matrix is not None and entry is not None else -1
+    return name, entry, scout_id, entry is not None and roster_name != name
+
+def load_advancements(advancement_file, patrol_structure, requirements, roster_index=None, completion_matrix=None,
+                      chunk_size=ADVANCEMENT_CHUNK_SIZE, stats=None, scout_matcher=None):
+    chunks = read_advancement_chunks(advancement_file, chunk_size=chunk_size)
+    return fold_advancement_chunks(chunks, patrol_structure, requirements,
+                                   roster_index=roster_index, completion_matrix=completion_matrix, stats=stats,
+                                   scout_matcher=scout_matcher)
@@ -1,13 +1,19 @@
 import csv
+from scout_tracking.input_files import open_input
 
 def load_patrol_data(filename):
     patrol_data = {}
-    with open(filename, mode='r') as file:
+    with open_input(filename) as file:
         reader = csv.reader(file, delimiter='\t')
         next(reader)  # Skip header row
         for row in reader:
             if len(row) == 2:
                 scout_name, patrol_name = row
-                patrol_data[scout_name.lower()] = patrol_name.lower()
+                scout_name = scout_name.lower()
+                patrol_name = patrol_name.lower()
+                # A scout can only belong to one patrol; the last listing wins
+                if scout_name in patrol_data and patrol_data[scout_name] != patrol_name:
+                    print(f"Warning: Scout '{scout_name}' is listed in both the '{patrol_data[scout_name]}' "
+                          f"and '{patrol_name}' patrols. Using '{patrol_name}'.")
+                patrol_data[scout_name] = patrol_name
     return patrol_data
-
@@ -1,13 +1,14 @@
 import csv
+from scout_tracking.catalog import RequirementCatalog
+from scout_tracking.input_files import open_input
 
 def load_requirements(filename):
-    requirements = {}
-    with open(filename, mode='r') as file:
+    requirements = RequirementCatalog()
+    with open_input(filename) as file:
         reader = csv.reader(file, delimiter='\t')
         next(reader)  # Skip header row
         for row in reader:
             if len(row) == 2:
                 requirement, alt_text = row
-                requirements[requirement.lower()] = alt_text.strip()
+                requirements.add(requirement, alt_text.strip())
     return requirements
-
@@ -0,0 +1,194 @@
+import os
+import sys
+import argparse
+import csv
+import time
+from scout_tracking.trace import TRACE_LEVELS
+from scout_tracking.dates import parse_date
+from scout_tracking.reconcile import MATCH_MODES, MATCH_OFF
+
+# The loaders and report writers (and NumPy with them) are imported in main once the arguments are
+# parsed, and the modules only some options need in those options' branches, so --help and argument
+# errors return without loading them
+
+def date_argument(value):
+    # argparse type for dates in any format accepted in advancement files
+    parsed = parse_date(value)
+    if parsed is None:
+        raise argparse.ArgumentTypeError(f"cannot parse date '{value}'")
+    return parsed
+
+def main():
+    # Step 1: Parse command-line arguments
+    parser = argparse.ArgumentParser(description='Generate patrol reports.')
+    
+    parser.add_argument('patrol_tsv', type=str, help='Path to the patrol structure TSV file')
+    parser.add_argument('requirements_tsv', type=str, help='Path to the requirements TSV file')
+    parser.add_argument('advancement_csv', type=str, help='Path to the advancement CSV file')
+    parser.add_argument('output_dir', type=str, help='Directory to save the generated reports')
+    parser.add_argument('patrol_names', nargs='*', help='Specific patrol names to generate reports for (default: all patrols)')
+    parser.add_argument('--raw', action='store_true', help='Treat advancement_csv as a raw Scoutbook backup and clean it while loading')
+    parser.add_argument('--checkpoint', type=str, default=None, help='Checkpoint file for loading only the rows appended to advancement_csv since the last run')
+    parser.add_argument('--match-scouts', choices=MATCH_MODES, default=MATCH_OFF, help='Suggest roster matches for scouts not on the roster (suggest), or also load their rows under confident matches (apply)')
+    parser.add_argument('--match-requirements', action='store_true', help='Write likely catalog matches for unknown requirements to output_dir/requirement_aliases.tsv')
+    parser.add_argument('--requirement-aliases', type=str, default=None, help='Alias table (e.g. a requirement_aliases.tsv from an earlier run) mapping other spellings to catalog requirements')
+    parser.add_argument('--cache-dir', type=str, default=None, help='Directory for caching parsed inputs between runs')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of patrol reports to write concurrently')
+    parser.add_argument('--trace', choices=list(TRACE_LEVELS), default='off', help='Level of the structured debug log written to output_dir/debug_log.jsonl')
+    parser.add_argument('--track-memory', action='store_true', help='Record the peak memory of each stage with tracemalloc (slower)')
+    parser.add_argument('--profile', type=str, default=None, metavar='DIR', help='Write cProfile stats for each stage to DIR/<stage>.pstats')
+    parser.add_argument('--metrics-dir', type=str, default=None, help='Directory to write run metrics (JSON and Prometheus textfile) to')
+    parser.add_argument('--sqlite', type=str, default=None, help='SQLite database to save the loaded patrol structure to')
+    parser.add_argument('--troop', type=str, default='', help='Troop name to save the patrol structure under in the SQLite database')
+    parser.add_argument('--as-of', type=date_argument, action='append', default=None, metavar='DATE', help='Report only completions recorded on or before DATE; repeat for one snapshot per date, each written to output_dir/as_of_<YYYY-MM-DD>')
+    parser.add_argument('--since', type=date_argument, default=None, metavar='DATE', help='Report only completions recorded on or after DATE')
+    parser.add_argument('--rollups', action='store_true', help="Add rows to the patrol reports with each scout's percent complete and remaining requirements per rank, and their next rank")
+    parser.add_argument('--velocity', action='store_true', help='Also write monthly velocity and rank progress reports for the whole troop')
+    parser.add_argument('--velocity-months', type=int, default=None, help='Number of months covered by the velocity reports (default: 12)')
+    parser.add_argument('--watch', action='store_true', help='Keep running, regenerating the affected patrol reports whenever an input file changes')
+    parser.add_argument('--watch-interval', type=float, default=None, metavar='SECONDS', help='Seconds between checks of the input files in watch mode (default: 1)')
+    parser.add_argument('--debounce', type=float, default=None, metavar='SECONDS', help='Seconds a changed input file must stay unchanged before it is reloaded in watch mode (default: 2)')
+    
+    args = parser.parse_args()
+
+    # Watch mode keeps the loaded troop in memory and only supports the options that shape the patrol reports
+    if args.watch:
+        unsupported = [option for option, value in [('--cache-dir', args.cache_dir), ('--sqlite', args.sqlite), ('--as-of', args.as_of),
+                                                    ('--since', args.since), ('--velocity', args.velocity), ('--match-requirements', args.match_requirements),
+                                                    ('--metrics-dir', args.metrics_dir), ('--profile', args.profile)] if value]
+        if unsupported:
+            parser.error(f"--watch cannot be combined with {', '.join(unsupported)}")
+        from scout_tracking.watch import TroopState, watch, WATCH_INTERVAL, WATCH_DEBOUNCE
+        state = TroopState(args.patrol_tsv, args.requirements_tsv, args.advancement_csv, args.output_dir, patrol_names=args.patrol_names or None,
+                           raw=args.raw, checkpoint_file=args.checkpoint, requirement_aliases=args.requirement_aliases, jobs=args.jobs,
+                           trace_level=TRACE_LEVELS[args.trace], match_scouts=args.match_scouts, rollups=args.rollups)
+        watch(state, interval=WATCH_INTERVAL if args.watch_interval is None else args.watch_interval,
+              debounce=WATCH_DEBOUNCE if args.debounce is None else args.debounce)
+        return
+    started_at = time.time()
+
+    from scout_tracking.load_patrol_data import load_patrol_data
+    from scout_tracking.load_requirements import load_requirements
+    from scout_tracking.pipeline import load_troop_advancements
+    from scout_tracking.instrument import Instrumentation
+    from scout_tracking.metrics import write_run_metrics, file_sizes
+    from scout_tracking.report import generate_patrol_report_csv, generate_additional_report
+
+    # Time each stage, and optionally track its memory and profile it
+    instrumentation = Instrumentation(track_memory=args.track_memory, profile_dir=args.profile)
+
+    # Reuse parsed inputs from earlier runs when the files have not changed
+    if args.cache_dir:
+        from scout_tracking.cache import ParseCache
+        load = ParseCache(args.cache_dir).load
+    else:
+        def load(loader, filename, *loader_args, **loader_kwargs):
+            return loader(filename, *loader_args, **loader_kwargs)
+
+    # Step 2: Load the patrol data from TSV
+    with instrumentation.stage('load_patrol_data') as stage:
+        patrol_data = load(load_patrol_data, args.patrol_tsv)
+        stage['rows'] = len(patrol_data)
+    print(f"patrol data loaded\n")
+
+    # Step 3: Load requirements from TSV
+    with instrumentation.stage('load_requirements') as stage:
+        requirements = load(load_requirements, args.requirements_tsv)  # Load requirements from TSV
+        stage['rows'] = len(requirements)
+    print(f"requirements loaded\n")
+
+    # Accept the spellings in the alias table as their catalog requirements
+    if args.requirement_aliases:
+        from scout_tracking.reconcile import load_requirement_aliases
+        with instrumentation.stage('load_requirement_aliases') as stage:
+            stage['rows'] = load_requirement_aliases(args.requirement_aliases, requirements)
+        print(f"{stage['rows']} requirement aliases loaded\n")
+
+    # Step 4 and 5: Initialize the multi-dimentional data structure and load advancement data to it
+    if args.cache_dir:
+        # A cache hit skips both steps, so they are timed together
+        with instrumentation.stage('load_advancements_cached') as stage:
+            patrol_structure, completion_matrix, additional_scouts, additional_requirements, load_stats = load(
+                load_troop_advancements, args.advancement_csv, patrol_data, requirements, raw=args.raw, checkpoint_file=args.checkpoint, match_scouts=args.match_scouts)
+            stage['rows'] = load_stats.get('rows_read', 0)
+    else:
+        patrol_structure, completion_matrix, additional_scouts, additional_requirements, load_stats = load_troop_advancements(
+            args.advancement_csv, patrol_data, requirements, raw=args.raw, checkpoint_file=args.checkpoint, instrumentation=instrumentation, match_scouts=args.match_scouts)
+    print(f"advancement data loaded\n")
+
+    # Save the loaded data to the SQLite store, if requested
+    if args.sqlite:
+        from scout_tracking.sqlite_store import open_store, save_patrol_structure
+        with instrumentation.stage('save_patrol_structure') as stage:
+            conn = open_store(args.sqlite)
+            save_patrol_structure(conn, patrol_structure, requirements, troop=args.troop)
+            conn.close()
+        print(f"patrol structure saved to '{args.sqlite}'\n")
+
+    # Step 6: Generate reports for the specified patrols or all patrols, once per requested snapshot date
+    if not args.patrol_names:
+        args.patrol_names = list(patrol_structure.keys())
+    snapshots = [(args.output_dir, completion_matrix, None)]
+    if args.as_of or args.since:
+        snapshot_dates = args.as_of or [None]
+        snapshots = []
+        for as_of in snapshot_dates:
+            snapshot_dir = args.output_dir if len(snapshot_dates) == 1 else os.path.join(args.output_dir, f"as_of_{as_of.isoformat()}")
+            snapshots.append((snapshot_dir, completion_matrix.between(args.since, as_of), as_of))
+    with instrumentation.stage('generate_patrol_report_csv') as stage:
+        report_files = []
+        report_stats = {}
+        for snapshot_dir, snapshot_matrix, _ in snapshots:
+            report_files += generate_patrol_report_csv(patrol_structure, requirements, snapshot_dir, patrol_names=args.patrol_names, completion_matrix=snapshot_matrix, jobs=args.jobs, trace_level=TRACE_LEVELS[args.trace], rollups=args.rollups, stats=report_stats)
+        stage['rows'] = len(report_files) * len(requirements)
+
+    # Write the velocity reports for each snapshot, if requested
+    velocity_files = []
+    if args.velocity:
+        from scout_tracking.velocity import generate_velocity_reports, VELOCITY_MONTHS
+        months = VELOCITY_MONTHS if args.velocity_months is None else args.velocity_months
+        with instrumentation.stage('generate_velocity_reports') as stage:
+            for snapshot_dir, snapshot_matrix, as_of in snapshots:
+                velocity_files += generate_velocity_reports(patrol_structure, requirements, snapshot_matrix, snapshot_dir, as_of=as_of, months=months)
+            stage['rows'] = len(completion_matrix.scouts) * len(snapshots)
+
+    # Step 7: Generate the additional report for scouts and requirements that are not in the patrols
+    with instrumentation.stage('generate_additional_report') as stage:
+        generate_additional_report(additional_scouts, additional_requirements, args.output_dir)
+        stage['rows'] = len(additional_scouts) + len(additional_requirements)
+
+    # Match the unknown requirements against the catalog, writing an alias table for later runs, if requested
+    if args.match_requirements:
+        from scout_tracking.reconcile import suggest_requirement_matches, write_requirement_aliases
+        with instrumentation.stage('match_requirements') as stage:
+            write_requirement_aliases(args.output_dir, suggest_requirement_matches(additional_requirements, requirements))
+            stage['rows'] = len(additional_requirements)
+
+    # Suggest (or report the applied) roster matches for scouts not on the roster, if requested
+    if args.match_scouts != MATCH_OFF:
+        from scout_tracking.reconcile import reconcile_scouts
+        with instrumentation.stage('reconcile_scouts') as stage:
+            reconcile_scouts(patrol_structure, additional_scouts, args.output_dir)
+            stage['rows'] = len(additional_scouts)
+
+    # Step 8: Print the per-stage timings
+    instrumentation.close()
+    print()
+    print('\n'.join(instrumentation.summary_lines()))
+
+    # Step 9: Write the run metrics for monitoring, if requested
+    if args.metrics_dir:
+        output_files = report_files + velocity_files + [os.path.join(args.output_dir, 'additional_report.txt')]
+        counts = dict(load_stats)
+        counts['additional_scouts'] = len(additional_scouts)
+        counts['additional_requirements'] = len(additional_requirements)
+        write_run_metrics(args.metrics_dir, 'main', started_at,
+                          inputs=file_sizes({'patrol': args.patrol_tsv, 'requirements': args.requirements_tsv, 'advancement': args.advancement_csv}),
+                          counts=counts, stages=instrumentation.stages,
+                          outputs={'reports_written': report_stats.get('reports_written', 0),
+                                   'reports_unchanged': report_stats.get('reports_unchanged', 0),
+                                   'velocity_reports_written': len(velocity_files),
+                                   'output_bytes': sum(file_sizes(dict(enumerate(output_files))).values())})
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import os
+import json
+import time
+from scout_tracking.utility import write_atomic
+
+# Prefix of every metric name in the Prometheus textfile
+METRIC_PREFIX = 'scout_tracking'
+
+def file_sizes(paths):
+    """
+    Sizes in bytes of the given files, skipping any that do not exist.
+
+    :param paths: Dictionary of names to file paths
+    :return: Dictionary of names to sizes
+    """
+    return {name: os.path.getsize(path) for name, path in paths.items() if path and os.path.exists(path)}
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def prometheus_text(job, metrics):
+    # Render a run manifest in the Prometheus textfile-collector format
+    lines = []
+
+    def add(name, help_text, samples):
+        lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+        for labels, value in samples:
+            label_text = ','.join(f'{key}="{_label(label)}"' for key, label in [('job', job)] + labels)
+            lines.append(f"{METRIC_PREFIX}_{name}{{{label_text}}} {value}")
+
+    add('last_run_timestamp_seconds', 'Unix time the run finished.', [([], metrics['finished_at'])])
+    add('run_seconds', 'Wall time of the whole run.', [([], metrics['seconds'])])
+    add('input_bytes', 'Size of each input file.', [([('input', name)], size) for name, size in metrics['inputs'].items()])
+    add('rows', 'Row counts by kind.', [([('kind', kind)], count) for kind, count in metrics['counts'].items()])
+    add('stage_seconds', 'Wall time of each pipeline stage.', [([('stage', stage['name'])], stage['seconds']) for stage in metrics['stages']])
+    add('stage_rows', 'Rows processed by each pipeline stage.',
+        [([('stage', stage['name'])], stage['rows']) for stage in metrics['stages'] if stage.get('rows') is not None])
+    add('outputs', 'Output counts by kind.', [([('kind', kind)], count) for kind, count in metrics['outputs'].items()])
+    return '\n'.join(lines) + '\n'
+
+def write_run_metrics(metrics_dir, job, started_at, inputs=None, counts=None, stages=(), outputs=None):
+    """
+    Write a JSON run manifest and a Prometheus textfile for one run.
+
+    Files are written as <metrics_dir>/<job>_metrics.json and <metrics_dir>/<job>.prom, replacing
+    the previous run's files, so a scheduler or node_exporter's textfile collector can pick them up.
+
+    :param metrics_dir: Directory to write the metrics files to
+    :param job: Name of the job, e.g. 'main' or 'clean_advancement'
+    :param started_at: time.time() when the run started
+    :param inputs: Dictionary of input names to sizes in bytes
+    :param counts: Dictionary of row counts, e.g. rows_read or rows_matched
+    :param stages: Stage records from Instrumentation
+    :param outputs: Dictionary of output counts, e.g. reports_written or output_bytes
+    :return: Paths of the JSON manifest and the Prometheus textfile
+    """
+    finished_at = time.time()
+    metrics = {
+        'job': job,
+        'started_at': started_at,
+        'finished_at': finished_at,
+        'seconds': finished_at - started_at,
+        'inputs': inputs or {},
+        'counts': counts or {},
+        'stages': [{'name': stage['name'], 'seconds': stage['seconds'], 'rows': stage.get('rows'),
+                    'peak_bytes': stage.get('peak_bytes')} for stage in stages],
+        'outputs': outputs or {},
+    }
+
+    os.makedirs(metrics_dir, exist_ok=True)
+    json_path = os.path.join(metrics_dir, f"{job}_metrics.json")
+    prom_path = os.path.join(metrics_dir, f"{job}.prom")
+    write_atomic(json_path, json.dumps(metrics, indent=2) + '\n')
+    write_atomic(prom_path, prometheus_text(job, metrics))
+    return json_path, prom_path
@@ -0,0 +1,85 @@
+from scout_tracking.load_patrol_data import load_patrol_data
+from scout_tracking.initialize import initialize_patrol_structure, build_roster_index
+from scout_tracking.completion_matrix import CompletionMatrix
+from scout_tracking.load_advancements import load_advancements, fold_advancement_chunks
+from scout_tracking.clean_advancement import read_raw_advancement_chunks
+from scout_tracking.checkpoint import load_advancements_checkpointed
+from scout_tracking.trace import TRACE_OFF
+from scout_tracking.instrument import Instrumentation
+from scout_tracking.report import generate_patrol_report_csv, generate_additional_report
+from scout_tracking.reconcile import ScoutNameMatcher, reconcile_scouts, MATCH_OFF, MATCH_APPLY
+
+def load_troop_advancements(advancement_file, patrol_data, requirements, raw=False, checkpoint_file=None, instrumentation=None,
+                            match_scouts=MATCH_OFF):
+    """
+    Build the patrol structure for a roster and load an advancement file into it.
+
+    :param advancement_file: Path to the cleaned advancement CSV, or the raw Scoutbook backup if raw is set
+    :param patrol_data: Dictionary of scouts and their patrols from load_patrol_data
+    :param requirements: RequirementCatalog from load_requirements
+    :param raw: Clean the raw Scoutbook backup while loading it
+    :param checkpoint_file: Checkpoint to resume from and update, so only rows appended since the last run are read
+    :param instrumentation: Optional Instrumentation to record the initialize_patrol_structure and load_advancements stages in
+    :param match_scouts: With MATCH_APPLY, rows for scouts who are not on the roster are loaded under a confidently
+        matched roster name, and the names used are counted under 'aliases' in the scout's record
+    :return: The patrol structure, its completion matrix, the unmatched scouts, the unmatched requirements and
+        a dictionary of row counts from loading
+    """
+    if instrumentation is None:
+        instrumentation = Instrumentation()
+    load_stats = {}
+
+    with instrumentation.stage('initialize_patrol_structure') as stage:
+        patrol_structure = initialize_patrol_structure(patrol_data)
+        roster_index = build_roster_index(patrol_structure)
+        completion_matrix = CompletionMatrix(roster_index.keys(), requirements)
+        scout_matcher = ScoutNameMatcher(roster_index) if match_scouts == MATCH_APPLY else None
+        stage['rows'] = len(roster_index)
+
+    with instrumentation.stage('load_advancements') as stage:
+        if checkpoint_file:
+            patrol_structure, additional_scouts, additional_requirements = load_advancements_checkpointed(
+                advancement_file, checkpoint_file, patrol_structure, requirements,
+                roster_index=roster_index, completion_matrix=completion_matrix, raw=raw, stats=load_stats,
+                scout_matcher=scout_matcher)
+        elif raw:
+            # Clean the raw Scoutbook backup and load it in a single streaming pass
+            chunks = read_raw_advancement_chunks(advancement_file, stats=load_stats)
+            patrol_structure, additional_scouts, additional_requirements = fold_advancement_chunks(
+                chunks, patrol_structure, requirements, roster_index=roster_index, completion_matrix=completion_matrix,
+                stats=load_stats, scout_matcher=scout_matcher)
+        else:
+            patrol_structure, additional_scouts, additional_requirements = load_advancements(
+                advancement_file, patrol_structure, requirements, roster_index=roster_index, completion_matrix=completion_matrix,
+                stats=load_stats, scout_matcher=scout_matcher)
+        stage['rows'] = load_stats.get('rows_read', 0)
+
+    return patrol_structure, completion_matrix, additional_scouts, additional_requirements, load_stats
+
+def run_troop(patrol_file, requirements, advancement_file, output_dir, patrol_names=None, raw=False, checkpoint_file=None, jobs=1,
+              trace_level=TRACE_OFF, match_scouts=MATCH_OFF):
+    """
+    Generate the patrol reports and the additional report for one troop.
+
+    :param patrol_file: Path to the patrol membership TSV file
+    :param requirements: RequirementCatalog from load_requirements, which may be shared between troops
+    :param advancement_file: Path to the cleaned advancement CSV, or the raw Scoutbook backup if raw is set
+    :param output_dir: Directory where the reports will be saved
+    :param patrol_names: List of patrol names to generate reports for (defaults to None, which means all patrols)
+    :param raw: Clean the raw Scoutbook backup while loading it
+    :param checkpoint_file: Checkpoint to resume advancement loading from and update
+    :param jobs: Number of patrol reports to write concurrently
+    :param trace_level: Level of the structured debug log
+    :param match_scouts: MATCH_SUGGEST or MATCH_APPLY to write roster matches for unmatched scouts to scout_matches.tsv,
+        and with MATCH_APPLY load their rows under confident matches
+    :return: List of the patrol report files written
+    """
+    patrol_data = load_patrol_data(patrol_file)
+    patrol_structure, completion_matrix, additional_scouts, additional_requirements, _ = load_troop_advancements(
+        advancement_file, patrol_data, requirements, raw=raw, checkpoint_file=checkpoint_file, match_scouts=match_scouts)
+    report_files = generate_patrol_report_csv(patrol_structure, requirements, output_dir, patrol_names=patrol_names,
+                                              completion_matrix=completion_matrix, jobs=jobs, trace_level=trace_level)
+    generate_additional_report(additional_scouts, additional_requirements, output_dir)
+    if match_scouts != MATCH_OFF:
+        reconcile_scouts(patrol_structure, additional_scouts, output_dir)
+    return report_files
@@ -0,0 +1,401 @@
+import os
+import re
+import csv
+from collections import Counter
+from scout_tracking.input_files import open_input
+
+# Reconciliation modes for scouts whose names are not on the roster
+MATCH_OFF = 'off'
+MATCH_SUGGEST = 'suggest'
+MATCH_APPLY = 'apply'
+MATCH_MODES = [MATCH_OFF, MATCH_SUGGEST, MATCH_APPLY]
+
+# Minimum similarity for a roster name to be suggested, and to be applied automatically
+SCOUT_MATCH_SUGGEST_SCORE = 0.5
+SCOUT_MATCH_APPLY_SCORE = 0.8
+
+# Minimum similarity for a catalog requirement to be suggested, and for an alias table row to be used
+REQUIREMENT_MATCH_SUGGEST_SCORE = 0.5
+REQUIREMENT_ALIAS_SCORE = 0.8
+
+# Name suffixes that Scoutbook and the roster do not agree on
+NAME_SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv', 'v'}
+
+# Common nicknames and the given name they are matched as
+NICKNAMES = {
+    'abe': 'abraham', 'al': 'albert', 'alex': 'alexander', 'andy': 'andrew', 'ben': 'benjamin',
+    'bill': 'william', 'billy': 'william', 'bob': 'robert', 'bobby': 'robert', 'cam': 'cameron',
+    'charlie': 'charles', 'chris': 'christopher', 'chuck': 'charles', 'dan': 'daniel', 'danny': 'daniel',
+    'dave': 'david', 'drew': 'andrew', 'ed': 'edward', 'eddie': 'edward', 'eli': 'elijah',
+    'gabe': 'gabriel', 'greg': 'gregory', 'jake': 'jacob', 'jim': 'james', 'jimmy': 'james',
+    'joe': 'joseph', 'joey': 'joseph', 'johnny': 'john', 'jon': 'jonathan', 'josh': 'joshua',
+    'ken': 'kenneth', 'kenny': 'kenneth', 'larry': 'lawrence', 'matt': 'matthew', 'max': 'maxwell',
+    'mike': 'michael', 'mikey': 'michael', 'nate': 'nathan', 'nick': 'nicholas', 'pat': 'patrick',
+    'pete': 'peter', 'rob': 'robert', 'ron': 'ronald', 'sam': 'samuel', 'steve': 'steven',
+    'ted': 'theodore', 'teddy': 'theodore', 'tim': 'timothy', 'timmy': 'timothy', 'tom': 'thomas',
+    'tommy': 'thomas', 'tony': 'anthony', 'will': 'william', 'zach': 'zachary', 'zack': 'zachary',
+}
+
+# Words that Scoutbook exports and catalogs add to requirement names inconsistently
+REQUIREMENT_NOISE_WORDS = {'requirement', 'requirements', 'req', 'reqs', 'version', 'no'}
+
+_NON_NAME_CHARACTERS = re.compile(r"[^\w\s-]")
+_NON_WORD_CHARACTERS = re.compile(r"[^\w\s]")
+_SPLIT_REQUIREMENT_NUMBER = re.compile(r"\b(\d+)\s+([a-z])\b")
+_YEAR = re.compile(r"(19|20)\d\d")
+
+def scout_name_key(name):
+    """
+    Normalize a scout name for matching.
+
+    Drops punctuation, suffixes such as "Jr." and middle initials, maps common nicknames to
+    given names and sorts the remaining words, so "Doe, Bob Q. Jr." and "Robert Doe" get the
+    same key.
+
+    :param name: Scout name as spelled in Scoutbook or the roster
+    :return: Normalized key
+    """
+    words = [NICKNAMES.get(word, word) for word in _name_words(name)]
+    return ' '.join(sorted(words))
+
+def scout_name_parts(name):
+    """
+    Split a scout name into its given name and surname.
+
+    The surname is the words before a comma ("Doe, Bob"), or else the last word ("Bob Q. Doe").
+    Punctuation, suffixes and middle initials are dropped as in scout_name_key, but nicknames
+    are kept as written.
+
+    :param name: Scout name as spelled in Scoutbook or the roster
+    :return: Tuple of (given name, surname); either may be empty
+    """
+    if ',' in name:
+        surname, given = name.split(',', 1)
+        given_words = _name_words(given)
+        return (given_words[0] if given_words else ''), ' '.join(_name_words(surname))
+    words = _name_words(name)
+    if not words:
+        return '', ''
+    return (words[0] if len(words) > 1 else ''), words[-1]
+
+def _name_words(name):
+    # Lowercase words of a name, without punctuation, suffixes or initials
+    words = _NON_NAME_CHARACTERS.sub(' ', name.lower()).split()
+    return [word for word in words if word not in NAME_SUFFIXES and len(word) > 1]
+
+def requirement_key(requirement):
+    """
+    Normalize a requirement name for matching.
+
+    Punctuation, version years and filler words such as "Requirement" are dropped, and a
+    split number like "2 b" is joined. Words containing digits are kept apart, since a
+    requirement only matches one with the same numbers.
+
+    :param requirement: Requirement name as spelled in Scoutbook or the catalog
+    :return: Tuple of the sorted numbered words and the remaining words joined by spaces
+    """
+    text = _SPLIT_REQUIREMENT_NUMBER.sub(r"\1\2", _NON_WORD_CHARACTERS.sub(' ', requirement.lower()))
+    words = [word for word in text.split() if word not in REQUIREMENT_NOISE_WORDS and not _YEAR.fullmatch(word)]
+    numbers = tuple(sorted(word for word in words if any(character.isdigit() for character in word)))
+    return numbers, ' '.join(word for word in words if not any(character.isdigit() for character in word))
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+class TrigramIndex:
+    """
+    Inverted index from character trigrams to the keys that contain them.
+
+    Similar keys are found by counting the trigrams each indexed key shares with the query,
+    which only touches keys sharing at least one trigram rather than every key.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self._trigram_sets = []
+        self._index = {}
+
+    def add(self, key):
+        """
+        Index a key.
+
+        :return: The key's ID, its position in self.keys
+        """
+        key_id = len(self.keys)
+        trigrams = _trigrams(key)
+        self.keys.append(key)
+        self._trigram_sets.append(trigrams)
+        for trigram in trigrams:
+            self._index.setdefault(trigram, []).append(key_id)
+        return key_id
+
+    def scores(self, key):
+        """
+        Dice coefficient of the trigram sets of a key and each indexed key sharing a trigram with it.
+
+        :return: Dictionary of key ID -> score between 0 and 1
+        """
+        trigrams = _trigrams(key)
+        shared = Counter()
+        for trigram in trigrams:
+            shared.update(self._index.get(trigram, ()))
+        return {key_id: 2 * count / (len(trigrams) + len(self._trigram_sets[key_id])) for key_id, count in shared.items()}
+
+def _dice(first, second):
+    # Dice coefficient of the trigram sets of two words, 0 if either is empty
+    if not first or not second:
+        return 0.0
+    first, second = _trigrams(first), _trigrams(second)
+    return 2 * len(first & second) / (len(first) + len(second))
+
+def _given_name_similarity(first, second):
+    # Given names match in full when they are the same name or nickname, else by their spelling
+    if first and NICKNAMES.get(first, first) == NICKNAMES.get(second, second):
+        return 1.0
+    return max(_dice(first, second), _dice(NICKNAMES.get(first, first), NICKNAMES.get(second, second)))
+
+def _name_similarity(parts, roster_parts):
+    """
+    Similarity of two (given name, surname) pairs, and whether their surnames agree.
+
+    Given name is compared with given name and surname with surname. A name written surname
+    first without a comma ("Doe Bob") is compared the other way round, but only when its first
+    word is the roster surname, so a given name that happens to look like a surname is not
+    swapped into its place.
+
+    :return: Tuple of (score between 0 and 1, True if the surnames are the same)
+    """
+    (given, surname), (roster_given, roster_surname) = parts, roster_parts
+    if given and given == roster_surname and surname != roster_surname:
+        return (_given_name_similarity(surname, roster_given) + 1.0) / 2, True
+    return (_given_name_similarity(given, roster_given) + _dice(surname, roster_surname)) / 2, surname == roster_surname
+
+def _ranked(scores, names, limit, min_score):
+    # (name, score) pairs for the scores at or above min_score, best first
+    ranked = sorted(((score, names[name_id]) for name_id, score in scores.items() if score >= min_score),
+                    key=lambda candidate: (-candidate[0], candidate[1]))
+    return [(name, round(score, 3)) for score, name in ranked[:limit]]
+
+def _single_best(candidates):
+    # The best candidate if it beats the runner-up, else None
+    if len(candidates) == 1 or (len(candidates) > 1 and candidates[0][1] > candidates[1][1]):
+        return candidates[0][0]
+    return None
+
+class ScoutNameMatcher:
+    """
+    Approximate matcher from unmatched scout names to roster names.
+
+    Roster names are indexed in a TrigramIndex over their normalized key, so a lookup only
+    scores the roster names that share a trigram with the query rather than comparing it with
+    every roster name. Those names are then scored word by word, given name against given name
+    and surname against surname, so a shared surname is never mistaken for a given name.
+    """
+
+    def __init__(self, roster_names):
+        """
+        :param roster_names: Iterable of roster scout names (lowercase, as in the patrol structure)
+        """
+        self.roster_names = []
+        self._parts = []
+        self._index = TrigramIndex()
+        for name in roster_names:
+            self._index.add(scout_name_key(name))
+            self.roster_names.append(name)
+            self._parts.append(scout_name_parts(name))
+
+    def _scores(self, name):
+        # Roster ID -> (score, surnames agree) for the roster names sharing a trigram with the name
+        parts = scout_name_parts(name)
+        return {roster_id: _name_similarity(parts, self._parts[roster_id])
+                for roster_id in self._index.scores(scout_name_key(name))}
+
+    def candidates(self, name, limit=3, min_score=SCOUT_MATCH_SUGGEST_SCORE):
+        """
+        Roster names similar to a name, best first.
+
+        :param name: Scout name that is not on the roster
+        :param limit: Maximum number of candidates to return
+        :param min_score: Minimum similarity, from 0 to 1, of the candidates returned
+        :return: List of (roster name, score) tuples
+        """
+        scores = {roster_id: score for roster_id, (score, _) in self._scores(name).items()}
+        return _ranked(scores, self.roster_names, limit, min_score)
+
+    def resolve(self, name, min_score=SCOUT_MATCH_APPLY_SCORE):
+        """
+        Roster name to use for an unmatched name, or None if there is no single confident match.
+
+        The match must also have the same surname, so rows are never applied to a scout from
+        another family however close the rest of the name is.
+        """
+        scores = self._scores(name)
+        best = _single_best(_ranked({roster_id: score for roster_id, (score, _) in scores.items()},
+                                    list(range(len(self.roster_names))), 2, min_score))
+        if best is None or not scores[best][1]:
+            return None
+        return self.roster_names[best]
+
+class RequirementMatcher:
+    """
+    Approximate matcher from unknown advancement names to catalog requirements.
+
+    Requirements are grouped by their numbered words ("2b", "10") and each group has its
+    own TrigramIndex over the rest of the name, so "Scout Rank Req. 2b" is only ever
+    compared with the catalog's 2b requirements, never with 2a.
+    """
+
+    def __init__(self, requirements):
+        """
+        :param requirements: RequirementCatalog, or any iterable of requirement names
+        """
+        self.requirements = list(requirements)
+        self._keys = {}
+        self._groups = {}
+        for requirement in self.requirements:
+            numbers, words = requirement_key(requirement)
+            index, requirement_names = self._groups.setdefault(numbers, (TrigramIndex(), []))
+            self._keys.setdefault((numbers, words), []).append(index.add(words))
+            requirement_names.append(requirement)
+
+    def candidates(self, advancement, limit=3, min_score=REQUIREMENT_MATCH_SUGGEST_SCORE):
+        """
+        Catalog requirements similar to an advancement name, best first.
+
+        :param advancement: Advancement name that is not in the catalog
+        :param limit: Maximum number of candidates to return
+        :param min_score: Minimum similarity, from 0 to 1, of the candidates returned
+        :return: List of (requirement, score) tuples
+        """
+        numbers, words = requirement_key(advancement)
+        group = self._groups.get(numbers)
+        if group is None:
+            return []
+        index, requirement_names = group
+        scores = index.scores(words)
+        for key_id in self._keys.get((numbers, words), ()):
+            scores[key_id] = 1.0
+        return _ranked(scores, requirement_names, limit, min_score)
+
+    def resolve(self, advancement, min_score=REQUIREMENT_ALIAS_SCORE):
+        """
+        Catalog requirement for an advancement name, or None if there is no single confident match.
+        """
+        return _single_best(self.candidates(advancement, limit=2, min_score=min_score))
+
+def suggest_requirement_matches(additional_requirements, requirements, min_score=REQUIREMENT_MATCH_SUGGEST_SCORE):
+    """
+    Find the best catalog requirement for each advancement that was not in the catalog.
+
+    :param additional_requirements: Unmatched advancement names
+    :param requirements: RequirementCatalog to match against
+    :return: List of (advancement, requirement, score) tuples, sorted by advancement
+    """
+    matcher = RequirementMatcher(requirements)
+    matches = []
+    for advancement in sorted(set(additional_requirements)):
+        candidates = matcher.candidates(advancement, limit=1, min_score=min_score)
+        if candidates:
+            matches.append((advancement, *candidates[0]))
+    return matches
+
+def write_requirement_aliases(output_dir, matches):
+    """
+    Write requirement matches as an alias table, requirement_aliases.tsv, for use on later runs.
+
+    :param output_dir: Directory where the file will be saved
+    :param matches: Tuples from suggest_requirement_matches
+    :return: Path of the file written
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    aliases_file = os.path.join(output_dir, 'requirement_aliases.tsv')
+    with open(aliases_file, 'w', newline='') as file:
+        writer = csv.writer(file, delimiter='\t')
+        writer.writerow(['Advancement', 'Requirement', 'Score'])
+        writer.writerows(matches)
+    confident = sum(score >= REQUIREMENT_ALIAS_SCORE for _, _, score in matches)
+    print(f"Requirement matches saved to: {aliases_file} ({confident} of {len(matches)} confident enough to use as aliases)")
+    return aliases_file
+
+def load_requirement_aliases(aliases_file, requirements, min_score=REQUIREMENT_ALIAS_SCORE):
+    """
+    Add the aliases in an alias table to a requirements catalog.
+
+    Rows scored below min_score are skipped; rows with no score (added by hand) are always used.
+
+    :param aliases_file: Path to a TSV file with Advancement, Requirement and optional Score columns
+    :param requirements: RequirementCatalog to add the aliases to
+    :param min_score: Minimum score of the rows to use
+    :return: Number of aliases added
+    """
+    added = 0
+    with open_input(aliases_file) as file:
+        for row in csv.DictReader(file, delimiter='\t'):
+            advancement, requirement = (row.get('Advancement') or '').strip(), (row.get('Requirement') or '').strip()
+            score = (row.get('Score') or '').strip()
+            if not advancement or not requirement or (score and float(score) < min_score):
+                continue
+            try:
+                requirements.add_alias(advancement, requirement)
+            except KeyError:
+                print(f"Warning: Alias '{advancement}' is for '{requirement}', which is not in the requirements list. Skipping it.")
+                continue
+            added += 1
+    return added
+
+def suggest_scout_matches(additional_scouts, matcher, limit=3, min_score=SCOUT_MATCH_SUGGEST_SCORE):
+    """
+    Suggest roster names for the scouts that were not found on the roster.
+
+    :param additional_scouts: Counter of unmatched scout names and their row counts
+    :param matcher: ScoutNameMatcher over the roster
+    :return: List of (unmatched name, rows, roster name, score) tuples, most rows first
+    """
+    suggestions = []
+    for name, rows in sorted(additional_scouts.items(), key=lambda item: (-item[1], item[0])):
+        for roster_name, score in matcher.candidates(name, limit=limit, min_score=min_score):
+            suggestions.append((name, rows, roster_name, score))
+    return suggestions
+
+def applied_scout_matches(patrol_structure, matcher):
+    """
+    List the unmatched names whose rows were loaded under a roster name.
+
+    :param patrol_structure: Patrol structure loaded with a ScoutNameMatcher, whose scout records
+        list the names applied to them under 'aliases'
+    :param matcher: ScoutNameMatcher over the roster, used to score the matches
+    :return: List of (unmatched name, rows, roster name, score) tuples
+    """
+    applied = []
+    for scouts in patrol_structure.values():
+        for roster_name, scout_data in scouts.items():
+            for name, rows in scout_data.get('aliases', {}).items():
+                score = dict(matcher.candidates(name, limit=None, min_score=0)).get(roster_name, 0)
+                applied.append((name, rows, roster_name, score))
+    return sorted(applied)
+
+def reconcile_scouts(patrol_structure, additional_scouts, output_dir):
+    """
+    Write the applied and suggested roster matches for scouts who were not on the roster to scout_matches.tsv.
+
+    :param patrol_structure: Dictionary of patrols and their scouts
+    :param additional_scouts: Counter of unmatched scout names and their row counts
+    :param output_dir: Directory where the file will be saved
+    :return: Path of the file written
+    """
+    matcher = ScoutNameMatcher(scout for scouts in patrol_structure.values() for scout in scouts)
+    applied = applied_scout_matches(patrol_structure, matcher)
+    suggestions = suggest_scout_matches(additional_scouts, matcher)
+
+    os.makedirs(output_dir, exist_ok=True)
+    matches_file = os.path.join(output_dir, 'scout_matches.tsv')
+    with open(matches_file, 'w', newline='') as file:
+        writer = csv.writer(file, delimiter='\t')
+        writer.writerow(['Scoutbook Name', 'Rows', 'Roster Name', 'Score', 'Applied'])
+        for name, rows, roster_name, score in applied:
+            writer.writerow([name, rows, roster_name, score, 'yes'])
+        for name, rows, roster_name, score in suggestions:
+            writer.writerow([name, rows, roster_name, score, 'no'])
+    print(f"Scout name matches saved to: {matches_file} ({len(applied)} applied, {len(suggestions)} suggested)")
+    return matches_file
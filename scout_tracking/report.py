@@ -1,14 +1,151 @@
 import os
+import io
 import csv
+import json
+import time
+import hashlib
+import numpy as np
+from concurrent.futures import Future
+from scout_tracking.completion_matrix import CompletionMatrix
+from scout_tracking.catalog import as_catalog
+from scout_tracking.trace import TraceLog, TRACE_OFF, TRACE_FULL
+from scout_tracking.utility import write_atomic
 
-def generate_patrol_report_csv(patrol_structure, requirements, output_dir, patrol_names=None):
+# Cell values for incomplete / complete requirements, indexed by the completion flag
+REPORT_MARKS = np.array(['', 'X'], dtype=object)
+
+# Manifest of the content hash of each patrol report in output_dir, keyed by file name
+REPORT_MANIFEST = '.report_manifest.json'
+
+# Suffix of patrol report file names
+REPORT_SUFFIX = '_report.csv'
+
+def render_patrol_report(scout_names, completed, alt_texts, extra_rows=()):
+    """
+    Render one patrol's CSV report.
+
+    :param scout_names: Sorted scout names, one column each
+    :param completed: Boolean array with one row per requirement and one column per scout
+    :param alt_texts: Requirement labels, one per row
+    :param extra_rows: Rows written after the requirements, each a label followed by one value per scout
+    :return: The report's contents
+    """
+    buffer = io.StringIO(newline='')
+    writer = csv.writer(buffer)
+
+    # Write header: "Requirement" column followed by scout names
+    header_row = ['Requirement'] + scout_names
+    writer.writerow(header_row)
+
+    # Write one row per requirement, with 'X' where the scout has completed the requirement and '' otherwise
+    rows = np.empty((len(alt_texts), len(scout_names) + 1), dtype=object)
+    rows[:, 0] = alt_texts
+    rows[:, 1:] = REPORT_MARKS[completed.view(np.uint8)]
+    writer.writerows(rows.tolist())
+    writer.writerows(extra_rows)
+    return buffer.getvalue()
+
+def _content_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def _file_hash(path):
+    # Hash of a report already on disk, or None if there is none
+    try:
+        with open(path, 'r', newline='') as file:
+            return _content_hash(file.read())
+    except (OSError, UnicodeDecodeError):
+        return None
+
+def read_report_manifest(output_dir):
+    """
+    Read the report manifest in output_dir.
+
+    :return: Dictionary of report file names to the content hash, size and modification time last
+        written, empty if there is no manifest
+    """
+    try:
+        with open(os.path.join(output_dir, REPORT_MANIFEST), 'r') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return manifest.get('reports', {}) if isinstance(manifest, dict) else {}
+
+def write_report_manifest(output_dir, reports):
+    # Save the manifest entry of each report, replacing the manifest atomically
+    write_atomic(os.path.join(output_dir, REPORT_MANIFEST), json.dumps({'reports': reports}, indent=2, sort_keys=True))
+
+def _manifest_entry(path, content_hash):
+    stat = os.stat(path)
+    return {'sha256': content_hash, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def _previous_hash(path, entry):
+    # Hash of the report on disk. The manifest's hash is trusted while the file's size and
+    # modification time are the ones recorded with it; otherwise the file itself is hashed.
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if entry and entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+        return entry.get('sha256')
+    return _file_hash(path)
+
+def rollup_rows(rollups, rank_labels):
+    """
+    Report rows summarising each scout's rank progress.
+
+    :param rollups: Result of RequirementHierarchy.rank_rollups for the scouts in the report
+    :param rank_labels: Display name of each rank, in the hierarchy's order
+    :return: List of rows: '<rank> % Complete' and '<rank> Remaining' for each rank, then 'Next Rank'
+    """
+    rows = []
+    for rank_id, label in enumerate(rank_labels):
+        rows.append([f"{label} % Complete"] + [f"{percent}%" for percent in rollups['percent'][rank_id].tolist()])
+        rows.append([f"{label} Remaining"] + rollups['remaining'][rank_id].tolist())
+    rows.append(['Next Rank'] + [rank_labels[rank_id] if rank_id >= 0 else '' for rank_id in rollups['next_rank'].tolist()])
+    return rows
+
+def _timed_write_patrol_report(report_filename, scout_names, completed, alt_texts, manifest_entry=None, extra_rows=()):
+    # Render a patrol report and write it only if its contents changed, also returning its
+    # manifest entry, whether it was written and how long it took
+    start = time.perf_counter()
+    text = render_patrol_report(scout_names, completed, alt_texts, extra_rows)
+    content_hash = _content_hash(text)
+    written = content_hash != _previous_hash(report_filename, manifest_entry)
+    if written:
+        write_atomic(report_filename, text)
+    return report_filename, _manifest_entry(report_filename, content_hash), written, time.perf_counter() - start
+
+def generate_patrol_report_csv(patrol_structure, requirements, output_dir, patrol_names=None, completion_matrix=None, jobs=1,
+                               trace_level=TRACE_OFF, changed_patrols=None, rollups=False, stats=None):
     """
     Generate a CSV report for specified patrols or all patrols.
 
     :param patrol_structure: Dictionary of patrols and their scouts with completed requirements
-    :param requirements: List of requirements to check for each scout
+    :param requirements: RequirementCatalog (or dictionary) of requirements to check for each scout
     :param output_dir: Directory where the CSV report(s) will be saved
     :param patrol_names: List of patrol names to generate reports for (defaults to None, which means all patrols)
+    :param completion_matrix: CompletionMatrix filled by load_advancements (defaults to None, which means
+        one is built from the patrol structure)
+    :param jobs: Number of worker processes writing reports concurrently (defaults to 1, which means
+        reports are written one at a time in this process). Output files, the debug log and console
+        messages are the same for any number of jobs.
+    :param trace_level: Level of the structured debug log written to debug_log.jsonl (defaults to TRACE_OFF,
+        which means no log). TRACE_SUMMARY writes a compact record per patrol; TRACE_FULL adds the
+        patrol structure and each patrol's advancements.
+    :param changed_patrols: Patrols whose scouts or completions may have changed since the reports were last
+        written (defaults to None, which means all of them). The reports of the other patrols are kept as
+        they are without being rendered, as long as they are still in the manifest.
+    :param rollups: Add rows after the requirements with each scout's percent complete and remaining
+        requirements for every rank, and their next rank (defaults to False)
+    :param stats: Optional dictionary to add the reports_written and reports_unchanged counts to
+    :return: List of the patrol report files in output_dir, whether rewritten or unchanged
+
+    Reports are written incrementally. The content hash of each report is kept in .report_manifest.json
+    in output_dir (with its size and modification time, so a report edited by hand is noticed), and a
+    report is only rewritten (to a temporary file, then renamed over the old one)
+    when its contents change, so a rerun on unchanged data leaves every file untouched. Reports left
+    from an earlier run for patrols that are no longer in the patrol structure are removed; those of
+    patrols that are still there but not requested this time are kept.
     """
     
     # If no patrol names are specified, generate reports for all patrols
@@ -22,81 +159,133 @@ def generate_patrol_report_csv(patrol_structure, requirements, output_dir, patro
     # Ensure patrol_names are lowercase for consistent processing
     patrol_names = [name.lower() for name in patrol_names]
 
+    # Build the completion matrix once for the requested patrols, then slice it per patrol
+    catalog = as_catalog(requirements)
+    if completion_matrix is None:
+        completion_matrix = CompletionMatrix.from_patrol_structure(patrol_structure, catalog, patrol_names)
+    requirement_rows = completion_matrix.requirement_rows(catalog.names)
+    alt_texts = catalog.alt_texts
+
+    # Rank rollups for every scout at once, sliced per patrol below
+    if rollups:
+        hierarchy = catalog.hierarchy
+        troop_rollups = hierarchy.rank_rollups(completion_matrix.completed[requirement_rows])
+        rank_labels = hierarchy.rank_labels(catalog)
+
     # Ensure the output directory exists
     if not os.path.exists(output_dir):
         print(f"Output directory '{output_dir}' does not exist. Creating it now.")
         os.makedirs(output_dir)
 
-    # Clean up any pre-existing reports in the output directory
-    for file_name in os.listdir(output_dir):
-        if file_name.endswith('_report.csv'):
-            os.remove(os.path.join(output_dir, file_name))
-
-    # Open a debug log file to save info as .tsv
-    debug_log_filename = os.path.join(output_dir, "debug_log.tsv")
-    with open(debug_log_filename, 'w', newline='') as debug_file:
-        debug_writer = csv.writer(debug_file, delimiter='\t')
-        # Write a header for the debug log
-        debug_writer.writerow(["Patrol Name", "Scouts", "Requirements", "Patrol Structure Data"])
-
-        # Debug: print patrol structure to the console
-        #print(f"Patrol structure content: {patrol_structure}")
-
-        # Loop through each specified patrol name
-        for patrol_name in patrol_names:
-            # Debugging: Check if patrol is in structure
-            #print(f"Processing patrol: {patrol_name}")
-
-            # Ensure the patrol exists in the patrol_structure (case-insensitive)
-            if patrol_name not in [name.lower() for name in patrol_structure.keys()]:
-                print(f"Patrol '{patrol_name}' not found in patrol_structure. Skipping.")
-                continue
-            # Debugging: print out scouts in the patrol
-            patrol = patrol_structure[patrol_name.lower()]
-            #print(f"Scouts in '{patrol_name}': {list(patrol.keys())}")
-
-            # Write the debug log with patrol and its scouts
-            debug_writer.writerow([patrol_name, ', '.join(patrol.keys()), ', '.join(requirements), str(patrol_structure)])
-
-            # Convert the patrol name to lowercase for consistent file naming
-            patrol_name_lower = patrol_name.lower().replace(' ', '_')
-
-            # Define the file path for the CSV report
-            report_filename = os.path.join(output_dir, f"{patrol_name_lower}_report.csv")
-
-           # Check if the patrol has any scouts and their advancements
-            if patrol:
-                # Open the file for writing the CSV data
-                with open(report_filename, 'w', newline='') as file:
-                    writer = csv.writer(file)
-
-                    # Write header: "Requirement" column followed by scout names
-                    header_row = ['Requirement'] + sorted(patrol.keys())
-                    writer.writerow(header_row)
-
-                    # Write rows for each requirement
-                    for requirement in requirements:
-                        alt_text = requirements.get(requirement.lower(), requirement)
-                        row = [alt_text]
-                        for scout_name in sorted(patrol.keys()):
-                            # Debug: Print the current requirement and scout's advancements
-                            #print(f"Checking requirement '{requirement}' for scout '{scout_name}' with advancements: {patrol[scout_name]['advancements']}")
- 
-                            # If the scout has this requirement, add 'X'; otherwise, add an empty string
-                            if requirement.lower() in [advancement.lower() for advancement in patrol[scout_name]['advancements']]:
-                                row.append('X')
-                            else:
-                                row.append('')
-                        writer.writerow(row)
-
-                        # Debugging: Print which requirement is being written
-#                        print(f"Writing requirement: {alt_text} for patrol: {patrol_name}")
-
-
-                print(f"CSV Report generated for patrol '{patrol_name}': {report_filename}")
-            else:
-                print(f"Warning: No scouts found in patrol '{patrol_name}'. Skipping report generation.")
-        print(f"Debug log saved to: {debug_log_filename}")
+    # Manifest entries of the reports written by earlier runs
+    previous_reports = read_report_manifest(output_dir)
+    reports = {}
+
+    # Reports are handed to the worker pool as they are found and collected in patrol order
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor  # Loads multiprocessing, so only imported when needed
+        executor = ProcessPoolExecutor(max_workers=jobs)
+    else:
+        executor = None
+    results = []
+    report_files = []
+    written_count = 0
+
+    # Open the structured debug log (only written when tracing is enabled)
+    try:
+        with TraceLog(output_dir, trace_level) as trace:
+            trace.record('patrol_reports', patrols=len(patrol_names), requirements=len(catalog), jobs=jobs)
+            if trace.enabled(TRACE_FULL):
+                trace.record('patrol_structure', level=TRACE_FULL, data={name: dict(patrol) for name, patrol in patrol_structure.items()})
+
+            available_patrols = {name.lower() for name in patrol_structure.keys()}
+
+            # Loop through each specified patrol name
+            for patrol_name in patrol_names:
+                # Ensure the patrol exists in the patrol_structure (case-insensitive)
+                if patrol_name not in available_patrols:
+                    results.append((patrol_name, None, None, f"Patrol '{patrol_name}' not found in patrol_structure. Skipping."))
+                    continue
+                patrol = patrol_structure[patrol_name.lower()]
+
+                # Convert the patrol name to lowercase for consistent file naming
+                patrol_name_lower = patrol_name.lower().replace(' ', '_')
+
+                # Define the file path for the CSV report
+                report_filename = os.path.join(output_dir, f"{patrol_name_lower}{REPORT_SUFFIX}")
+
+                # Check if the patrol has any scouts and their advancements
+                if not patrol:
+                    results.append((patrol_name, None, None, f"Warning: No scouts found in patrol '{patrol_name}'. Skipping report generation."))
+                    continue
+
+                # Keep the report of a patrol that has not changed, if it is still there
+                previous_entry = previous_reports.get(os.path.basename(report_filename))
+                if changed_patrols is not None and patrol_name not in changed_patrols and previous_entry and os.path.exists(report_filename):
+                    results.append((patrol_name, (report_filename, previous_entry, False, 0.0),
+                                    {'patrol': patrol_name, 'report': report_filename}, None))
+                    continue
+
+                # Slice this patrol's columns out of the matrix
+                scout_names = sorted(patrol.keys())
+                scout_columns = completion_matrix.scout_columns(scout_names)
+                completed = completion_matrix.completed[np.ix_(requirement_rows, scout_columns)]
+                trace_fields = {'patrol': patrol_name, 'scouts': len(scout_names), 'scout_ids': scout_columns.tolist(),
+                                'completions': int(completed.sum()), 'report': report_filename}
+                if trace.enabled(TRACE_FULL):
+                    trace_fields['advancements'] = {scout_name: patrol[scout_name]['advancements'] for scout_name in scout_names}
+
+                extra_rows = ()
+                if rollups:
+                    patrol_rollups = {name: values[..., scout_columns] for name, values in troop_rollups.items()}
+                    extra_rows = rollup_rows(patrol_rollups, rank_labels)
+                report_args = (report_filename, scout_names, completed, alt_texts, previous_entry, extra_rows)
+                if executor is None:
+                    result = _timed_write_patrol_report(*report_args)
+                else:
+                    result = executor.submit(_timed_write_patrol_report, *report_args)
+                results.append((patrol_name, result, trace_fields, None))
+
+            # Report progress in patrol order, waiting for each worker as needed
+            for patrol_name, result, trace_fields, message in results:
+                if result is None:
+                    trace.record('patrol_skipped', patrol=patrol_name, reason=message)
+                    print(message)
+                    continue
+                if isinstance(result, Future):
+                    result = result.result()
+                report_filename, manifest_entry, written, write_seconds = result
+                trace.record('patrol_report', **trace_fields, written=written, write_ms=round(write_seconds * 1000, 3))
+                report_files.append(report_filename)
+                reports[os.path.basename(report_filename)] = manifest_entry
+                written_count += written
+                if written:
+                    print(f"CSV Report generated for patrol '{patrol_name}': {report_filename}")
+                else:
+                    print(f"CSV Report unchanged for patrol '{patrol_name}': {report_filename}")
+
+            # Keep the reports of patrols that were not requested this time, and remove those of
+            # patrols that are no longer in the patrol structure, then save the new manifest
+            patrol_reports = {f"{name.lower().replace(' ', '_')}{REPORT_SUFFIX}" for name in patrol_structure.keys()}
+            for file_name, entry in previous_reports.items():
+                if file_name in patrol_reports and file_name not in reports:
+                    reports[file_name] = entry
+            for file_name in sorted(os.listdir(output_dir)):
+                if file_name.endswith(REPORT_SUFFIX) and file_name not in patrol_reports:
+                    os.remove(os.path.join(output_dir, file_name))
+                    trace.record('patrol_report_removed', report=os.path.join(output_dir, file_name))
+            if reports != previous_reports:
+                write_report_manifest(output_dir, reports)
+            if trace.enabled():
+                print(f"Debug log saved to: {trace.path}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if stats is not None:
+        stats['reports_written'] = stats.get('reports_written', 0) + written_count
+        stats['reports_unchanged'] = stats.get('reports_unchanged', 0) + len(report_files) - written_count
+    return report_files
 
 def generate_additional_report(additional_scouts, additional_requirements, output_dir):
     """
@@ -110,9 +299,9 @@ def generate_additional_report(additional_scouts, additional_requirements, outpu
     # Define the filename for the additional report
     additional_report_filename = os.path.join(output_dir, "additional_report.txt")
     
-    # Create sets to avoid duplicates
-    unique_scouts = set(additional_scouts)
-    unique_requirements = set(additional_requirements)
+    # Remove duplicates, sorting so the report only changes when its contents do
+    unique_scouts = sorted(set(additional_scouts))
+    unique_requirements = sorted(set(additional_requirements))
 
     # Write the additional report
     with open(additional_report_filename, 'w') as file:
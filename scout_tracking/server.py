@@ -0,0 +1,317 @@
+import io
+import csv
+import copy
+import json
+import time
+import hashlib
+import argparse
+from urllib.parse import unquote, urlsplit
+from scout_tracking.dates import NO_DATE, format_date
+
+# asyncio, NumPy and the loaders are imported where the server uses them, so --help and argument
+# errors return without loading them
+
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8080
+
+# Longest request line or header line accepted, and most header lines per request
+MAX_LINE_BYTES = 8192
+MAX_HEADERS = 100
+
+CSV_TYPE = 'text/csv; charset=utf-8'
+JSON_TYPE = 'application/json'
+
+STATUS_TEXT = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+def url_key(name):
+    # Names in URLs are matched the way report files are named: lowercase, with spaces as underscores
+    return name.lower().replace(' ', '_')
+
+class ReportIndex:
+    """
+    A loaded TroopState, indexed by the patrol and scout names used in URLs.
+
+    An index is never changed after it is built; a reload builds a new one.
+    """
+
+    def __init__(self, state):
+        """
+        :param state: TroopState that has been loaded
+        """
+        self.state = state
+        self.loaded_at = time.time()
+        matrix = state.completion_matrix
+        self.requirement_rows = matrix.requirement_rows(state.requirements.names)
+        self.patrols = {url_key(patrol_name): patrol_name for patrol_name, patrol in state.patrol_structure.items() if patrol}
+        self.scouts = {url_key(scout_name): (patrol_name, scout_name)
+                       for patrol_name, patrol in state.patrol_structure.items() for scout_name in patrol}
+
+    def patrol_table(self, patrol_name):
+        # Sorted scout names and the requirement x scout completion slice, as in the patrol report
+        import numpy as np
+
+        matrix = self.state.completion_matrix
+        scout_names = sorted(self.state.patrol_structure[patrol_name].keys())
+        completed = matrix.completed[np.ix_(self.requirement_rows, matrix.scout_columns(scout_names))]
+        return scout_names, completed
+
+    def scout_rows(self, scout_name):
+        # (label, completed, date) for each requirement in catalog order
+        matrix = self.state.completion_matrix
+        scout_id = matrix.scout_ids[scout_name]
+        completed = matrix.completed[self.requirement_rows, scout_id]
+        completed_on = matrix.completed_on[self.requirement_rows, scout_id]
+        return [(alt_text, bool(done), format_date(day) if done and day != NO_DATE else None)
+                for alt_text, done, day in zip(self.state.requirements.alt_texts, completed, completed_on)]
+
+    def render(self, path):
+        """
+        Render the response for a request path.
+
+        :return: (status, content type, body bytes)
+        """
+        parts = [unquote(part) for part in path.strip('/').split('/')]
+        if parts == ['health']:
+            return 200, JSON_TYPE, _json_body({'status': 'ok', 'loaded_at': self.loaded_at,
+                                               'patrols': len(self.patrols), 'scouts': len(self.scouts)})
+        if parts == ['patrols']:
+            return 200, JSON_TYPE, _json_body([
+                {'patrol': patrol_name, 'scouts': len(self.state.patrol_structure[patrol_name]),
+                 'csv': f"/patrols/{key}.csv", 'json': f"/patrols/{key}.json"}
+                for key, patrol_name in self.patrols.items()])
+        if len(parts) == 2 and parts[0] in ('patrols', 'scouts'):
+            name, _, extension = parts[1].rpartition('.')
+            if extension not in ('csv', 'json'):
+                name, extension = parts[1], 'json'
+            if parts[0] == 'patrols' and url_key(name) in self.patrols:
+                return self.render_patrol(self.patrols[url_key(name)], extension)
+            if parts[0] == 'scouts' and url_key(name) in self.scouts:
+                return self.render_scout(*self.scouts[url_key(name)], extension)
+        return 404, JSON_TYPE, _json_body({'error': f"Not found: {path}"})
+
+    def render_patrol(self, patrol_name, extension):
+        from scout_tracking.report import render_patrol_report
+
+        scout_names, completed = self.patrol_table(patrol_name)
+        alt_texts = self.state.requirements.alt_texts
+        if extension == 'csv':
+            return 200, CSV_TYPE, render_patrol_report(scout_names, completed, alt_texts).encode('utf-8')
+        return 200, JSON_TYPE, _json_body({
+            'patrol': patrol_name,
+            'scouts': scout_names,
+            'requirements': [{'requirement': alt_text, 'completed': row}
+                             for alt_text, row in zip(alt_texts, completed.tolist())],
+        })
+
+    def render_scout(self, patrol_name, scout_name, extension):
+        rows = self.scout_rows(scout_name)
+        if extension == 'csv':
+            buffer = io.StringIO(newline='')
+            writer = csv.writer(buffer)
+            writer.writerow(['Requirement', 'Completed', 'Date Completed'])
+            writer.writerows([alt_text, 'X' if done else '', day or ''] for alt_text, done, day in rows)
+            return 200, CSV_TYPE, buffer.getvalue().encode('utf-8')
+        return 200, JSON_TYPE, _json_body({
+            'scout': scout_name,
+            'patrol': patrol_name,
+            'requirements': [{'requirement': alt_text, 'completed': done, 'date': day} for alt_text, done, day in rows],
+        })
+
+def _json_body(data):
+    return json.dumps(data).encode('utf-8')
+
+def _report_watch_stopped(task):
+    # Done callback of the input watcher task, which only ends when it is cancelled unless something is badly wrong
+    if not task.cancelled() and task.exception() is not None:
+        error = task.exception()
+        print(f"Stopped watching the input files; reports will not be updated: {type(error).__name__}: {error}")
+
+class ReportServer:
+    """
+    asyncio HTTP/1.1 server for a troop's reports.
+
+    Requests are answered from an in-memory ReportIndex, so no file is read per request, and each
+    rendered response is cached (with an ETag for conditional requests) until an input changes.
+    Changed inputs are reloaded in a worker thread while the previous index keeps serving; the new
+    index then replaces it and the cache is cleared.
+
+    Routes (patrol and scout names are matched in any case, with spaces or underscores):
+        /patrols                   JSON list of patrols
+        /patrols/<patrol>.csv      Patrol report, the same CSV generate_patrol_report_csv writes
+        /patrols/<patrol>.json     Patrol report as JSON
+        /scouts/<scout>.csv        One scout's requirements, completion and completion date
+        /scouts/<scout>.json       The same as JSON
+        /health                    Load status
+    """
+
+    def __init__(self, state, host=SERVER_HOST, port=SERVER_PORT, interval=None, debounce=None):
+        """
+        :param state: TroopState to load and serve
+        :param host: Address to listen on
+        :param port: Port to listen on (0 picks a free port)
+        :param interval: Seconds between checks of the input files (defaults to None, which means WATCH_INTERVAL)
+        :param debounce: Seconds a changed input file must stay unchanged before it is reloaded
+            (defaults to None, which means WATCH_DEBOUNCE)
+        """
+        from scout_tracking.watch import InputWatcher, WATCH_INTERVAL, WATCH_DEBOUNCE
+
+        self.state = state
+        self.host = host
+        self.port = port
+        self.interval = WATCH_INTERVAL if interval is None else interval
+        self.watcher = InputWatcher(state.paths, debounce=WATCH_DEBOUNCE if debounce is None else debounce)
+        self.index = None
+        self.cache = {}
+        self.server = None
+        self.watch_task = None
+
+    async def start(self):
+        # Load the troop and start listening; the port actually bound is stored in self.port
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.state.reload)
+        self.index = ReportIndex(self.state)
+        self.server = await asyncio.start_server(self.handle, self.host, self.port, limit=MAX_LINE_BYTES)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.watch_task = asyncio.create_task(self.watch_inputs())
+        self.watch_task.add_done_callback(_report_watch_stopped)
+
+    async def close(self):
+        if self.watch_task is not None:
+            self.watch_task.cancel()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Serving reports on http://{self.host}:{self.port}/patrols")
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def watch_inputs(self):
+        # Poll the input files, swapping in a new index when one changes. Errors are reported and the
+        # polling goes on, since a server that stops watching would serve stale reports indefinitely.
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                changed = self.watcher.poll()
+                if changed:
+                    await self.reload(changed, loop)
+            except Exception as error:
+                print(f"Error watching the input files: {type(error).__name__}: {error}")
+
+    async def reload(self, changed, loop=None):
+        """
+        Reload the changed inputs into a copy of the state and serve from it once it is loaded.
+
+        :param changed: Set of the inputs that changed
+        """
+        import asyncio
+
+        loop = loop or asyncio.get_running_loop()
+        state = copy.copy(self.state)
+        try:
+            await loop.run_in_executor(None, state.reload, changed)
+        except Exception as error:
+            # A malformed or half-copied drop keeps the previous data being served until a good file arrives
+            print(f"Error reloading {', '.join(sorted(changed))}: {type(error).__name__}: {error}")
+            return
+        self.state = state
+        self.index = ReportIndex(state)
+        self.cache.clear()
+        print(f"Reloaded {', '.join(sorted(changed))}")
+
+    def response(self, path):
+        # Cached (status, content type, body, ETag) for a path; only successful responses are cached
+        cached = self.cache.get(path)
+        if cached is None:
+            status, content_type, body = self.index.render(path)
+            cached = (status, content_type, body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+            if status == 200:
+                self.cache[path] = cached
+        return cached
+
+    async def handle(self, reader, writer):
+        # Serve requests on one connection until the client closes it or asks to
+        import asyncio
+
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                for _ in range(MAX_HEADERS):
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                if headers.get('content-length', '').isdigit():
+                    await reader.readexactly(int(headers['content-length']))
+
+                parts = request_line.decode('latin-1').split()
+                keep_alive = len(parts) == 3 and parts[2] == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                if len(parts) != 3:
+                    await self.send(writer, 400, JSON_TYPE, _json_body({'error': 'Bad request'}), keep_alive=False)
+                    break
+                method, target, _ = parts
+                if method not in ('GET', 'HEAD'):
+                    await self.send(writer, 405, JSON_TYPE, _json_body({'error': f"Method not allowed: {method}"}),
+                                    keep_alive, extra_headers={'Allow': 'GET, HEAD'})
+                else:
+                    status, content_type, body, etag = self.response(urlsplit(target).path)
+                    if status == 200 and headers.get('if-none-match') == etag:
+                        status, body = 304, b''
+                    await self.send(writer, status, content_type, body, keep_alive, extra_headers={'ETag': etag},
+                                    head=method == 'HEAD')
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def send(self, writer, status, content_type, body, keep_alive, extra_headers=None, head=False):
+        headers = {'Content-Type': content_type, 'Content-Length': str(len(body)),
+                   'Connection': 'keep-alive' if keep_alive else 'close', **(extra_headers or {})}
+        head_lines = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}"] + [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(('\r\n'.join(head_lines) + '\r\n\r\n').encode('latin-1'))
+        if not head:
+            writer.write(body)
+        await writer.drain()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve patrol and scout reports over HTTP.")
+    parser.add_argument('patrol_tsv', help="Path to the patrol structure TSV file")
+    parser.add_argument('requirements_tsv', help="Path to the requirements TSV file")
+    parser.add_argument('advancement_csv', help="Path to the advancement CSV file")
+    parser.add_argument('--host', default=SERVER_HOST, help="Address to listen on")
+    parser.add_argument('--port', type=int, default=SERVER_PORT, help="Port to listen on")
+    parser.add_argument('--raw', action='store_true', help="Treat advancement_csv as a raw Scoutbook backup")
+    parser.add_argument('--checkpoint', default=None, help="Checkpoint file for loading only the rows appended to advancement_csv")
+    parser.add_argument('--requirement-aliases', default=None, help="Alias table mapping other spellings to catalog requirements")
+    parser.add_argument('--watch-interval', type=float, default=None, help="Seconds between checks of the input files (default: 1)")
+    parser.add_argument('--debounce', type=float, default=None, help="Seconds a changed input file must stay unchanged before it is reloaded (default: 2)")
+    args = parser.parse_args()
+
+    import asyncio
+    from scout_tracking.watch import TroopState
+
+    state = TroopState(args.patrol_tsv, args.requirements_tsv, args.advancement_csv, None, raw=args.raw,
+                       checkpoint_file=args.checkpoint, requirement_aliases=args.requirement_aliases)
+    server = ReportServer(state, host=args.host, port=args.port, interval=args.watch_interval, debounce=args.debounce)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("Stopped serving.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+import sqlite3
+import argparse
+from collections.abc import Mapping
+from scout_tracking.catalog import RequirementCatalog
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS patrols (
+    id INTEGER PRIMARY KEY,
+    troop TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE (troop, name)
+);
+CREATE TABLE IF NOT EXISTS scouts (
+    id INTEGER PRIMARY KEY,
+    patrol_id INTEGER NOT NULL REFERENCES patrols (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    UNIQUE (patrol_id, name)
+);
+CREATE TABLE IF NOT EXISTS requirements (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    alt_text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS troop_requirements (
+    troop TEXT NOT NULL,
+    requirement_id INTEGER NOT NULL REFERENCES requirements (id),
+    alt_text TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (troop, requirement_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS completions (
+    scout_id INTEGER NOT NULL REFERENCES scouts (id) ON DELETE CASCADE,
+    requirement_id INTEGER NOT NULL REFERENCES requirements (id),
+    PRIMARY KEY (scout_id, requirement_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scouts_patrol ON scouts (patrol_id);
+CREATE INDEX IF NOT EXISTS completions_requirement ON completions (requirement_id);
+"""
+
+def open_store(database):
+    """
+    Open (and create if needed) a SQLite store of patrols, scouts, requirements and completions.
+
+    :param database: Path to the SQLite database file
+    :return: sqlite3 connection
+    """
+    conn = sqlite3.connect(database)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+def save_requirements(conn, requirements, troop=''):
+    """
+    Store a troop's requirements catalog, keeping the order and alt text used for its report rows.
+
+    Requirement names are shared by every troop in the store, so completions refer to the same
+    IDs, but each troop keeps its own catalog: saving one troop's catalog leaves the others' as
+    they are. Requirements dropped from the catalog stay in the requirements table so that
+    completions recorded against them are kept.
+
+    :param conn: Connection from open_store
+    :param requirements: RequirementCatalog (requirements and their alt text) from load_requirements
+    :param troop: Name of the troop the catalog belongs to
+    """
+    rows = [(requirement.lower(), alt_text) for requirement, alt_text in requirements.items()]
+    with conn:
+        conn.executemany("INSERT INTO requirements (name, alt_text) VALUES (?, ?) "
+                         "ON CONFLICT (name) DO UPDATE SET alt_text = excluded.alt_text", rows)
+        requirement_ids = dict(conn.execute("SELECT name, id FROM requirements"))
+        conn.execute("DELETE FROM troop_requirements WHERE troop = ?", (troop,))
+        conn.executemany("INSERT INTO troop_requirements (troop, requirement_id, alt_text, position) VALUES (?, ?, ?, ?)",
+                         ((troop, requirement_ids[name], alt_text, position) for position, (name, alt_text) in enumerate(rows)))
+
+def save_patrol_structure(conn, patrol_structure, requirements, troop=''):
+    """
+    Replace a troop's patrols, scouts and completions with the contents of a patrol structure.
+
+    :param conn: Connection from open_store
+    :param patrol_structure: Dictionary of patrols and their scouts with completed requirements
+    :param requirements: RequirementCatalog (requirements and their alt text) from load_requirements
+    :param troop: Name of the troop the patrols belong to
+    """
+    save_requirements(conn, requirements, troop=troop)
+    with conn:
+        conn.execute("DELETE FROM patrols WHERE troop = ?", (troop,))
+        conn.executemany("INSERT INTO patrols (troop, name) VALUES (?, ?)",
+                         ((troop, patrol_name) for patrol_name in patrol_structure))
+        patrol_ids = dict(conn.execute("SELECT name, id FROM patrols WHERE troop = ?", (troop,)))
+        conn.executemany("INSERT INTO scouts (patrol_id, name) VALUES (?, ?)",
+                         ((patrol_ids[patrol_name], scout_name)
+                          for patrol_name, scouts in patrol_structure.items() for scout_name in scouts))
+
+        # Map names to IDs once, then bulk insert the completions as plain ID pairs
+        scout_ids = {(patrol_name, scout_name): scout_id for patrol_name, scout_name, scout_id in conn.execute(
+            "SELECT patrols.name, scouts.name, scouts.id FROM scouts "
+            "JOIN patrols ON patrols.id = scouts.patrol_id WHERE patrols.troop = ?", (troop,))}
+        requirement_ids = dict(conn.execute("SELECT name, id FROM requirements"))
+        conn.executemany(
+            "INSERT OR IGNORE INTO completions (scout_id, requirement_id) VALUES (?, ?)",
+            ((scout_ids[patrol_name, scout_name], requirement_ids[advancement.lower()])
+             for patrol_name, scouts in patrol_structure.items()
+             for scout_name, scout_data in scouts.items()
+             for advancement in scout_data['advancements']
+             if advancement.lower() in requirement_ids))
+
+def load_requirements_from_store(conn, troop=''):
+    """
+    Read a troop's requirements catalog back in report order.
+
+    :param conn: Connection from open_store
+    :param troop: Name of the troop whose catalog to read
+    :return: RequirementCatalog of requirements and their alt text, like load_requirements
+    """
+    return RequirementCatalog(conn.execute(
+        "SELECT requirements.name, troop_requirements.alt_text FROM troop_requirements "
+        "JOIN requirements ON requirements.id = troop_requirements.requirement_id "
+        "WHERE troop_requirements.troop = ? ORDER BY troop_requirements.position", (troop,)))
+
+class SQLitePatrolStructure(Mapping):
+    """
+    Read-only patrol structure backed by a SQLite store.
+
+    Behaves like the patrol -> scout -> {'advancements': [...]} dictionary from
+    initialize_patrol_structure, but each patrol is fetched with indexed queries
+    only when it is accessed, so reporting one patrol does not load the whole troop.
+    Fetched patrols are kept for the life of the object.
+    """
+
+    def __init__(self, conn, troop=''):
+        self.conn = conn
+        self.troop = troop
+        self._patrols = {}
+
+    def __iter__(self):
+        for (patrol_name,) in self.conn.execute("SELECT name FROM patrols WHERE troop = ? ORDER BY id", (self.troop,)):
+            yield patrol_name
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM patrols WHERE troop = ?", (self.troop,)).fetchone()[0]
+
+    def __contains__(self, patrol_name):
+        if patrol_name in self._patrols:
+            return True
+        return self.conn.execute("SELECT 1 FROM patrols WHERE troop = ? AND name = ?", (self.troop, patrol_name)).fetchone() is not None
+
+    def __getitem__(self, patrol_name):
+        if patrol_name in self._patrols:
+            return self._patrols[patrol_name]
+
+        row = self.conn.execute("SELECT id FROM patrols WHERE troop = ? AND name = ?", (self.troop, patrol_name)).fetchone()
+        if row is None:
+            raise KeyError(patrol_name)
+        patrol = {}
+        for (scout_name,) in self.conn.execute("SELECT name FROM scouts WHERE patrol_id = ? ORDER BY id", row):
+            patrol[scout_name] = {'advancements': []}
+        for scout_name, requirement in self.conn.execute(
+                "SELECT scouts.name, requirements.name FROM scouts "
+                "JOIN completions ON completions.scout_id = scouts.id "
+                "JOIN requirements ON requirements.id = completions.requirement_id "
+                "WHERE scouts.patrol_id = ?", row):
+            patrol[scout_name]['advancements'].append(requirement)
+
+        self._patrols[patrol_name] = patrol
+        return patrol
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate patrol reports from a SQLite store.")
+    parser.add_argument('database', help="Path to the SQLite database written by main.py --sqlite")
+    parser.add_argument('output_dir', help="Directory to save the generated reports")
+    parser.add_argument('patrol_names', nargs='*', help="Specific patrol names to generate reports for (default: all patrols)")
+    parser.add_argument('--troop', default='', help="Troop whose patrols to report on")
+    args = parser.parse_args()
+
+    # Imported once the arguments are parsed, so --help returns without loading NumPy
+    from scout_tracking.report import generate_patrol_report_csv
+
+    conn = open_store(args.database)
+    patrol_structure = SQLitePatrolStructure(conn, troop=args.troop)
+    requirements = load_requirements_from_store(conn, troop=args.troop)
+    generate_patrol_report_csv(patrol_structure, requirements, args.output_dir, patrol_names=args.patrol_names or None)
+
+if __name__ == '__main__':
+    main()
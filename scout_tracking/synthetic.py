@@ -0,0 +1,154 @@
+import os
+import csv
+import random
+import argparse
+from datetime import date, timedelta
+
+# Scouts BSA ranks and the requirement numbers generated for each, with their lettered sub-requirements
+SYNTHETIC_RANKS = {
+    'Scout': {'1': 'abcdef', '2': 'abcd', '3': 'ab', '4': 'ab', '5': '', '6': '', '7': ''},
+    'Tenderfoot': {'1': 'abc', '2': 'abc', '3': 'abcd', '4': 'abcd', '5': 'abc', '6': 'abc', '7': 'ab', '8': '', '9': '', '10': 'ab', '11': ''},
+    'Second Class': {'1': 'abc', '2': 'abcdefg', '3': 'abcd', '4': '', '5': 'abcd', '6': 'abcde', '7': 'abc', '8': 'abcde', '9': 'ab', '10': '', '11': ''},
+    'First Class': {'1': 'ab', '2': 'abcde', '3': 'abcd', '4': 'ab', '5': 'abcd', '6': 'abcde', '7': 'abcdef', '8': 'ab', '9': 'abcd', '10': '', '11': '', '12': '', '13': ''},
+    'Star': {'1': '', '2': '', '3': '', '4': '', '5': '', '6': '', '7': '', '8': ''},
+    'Life': {'1': '', '2': '', '3': '', '4': '', '5': '', '6': '', '7': '', '8': ''},
+    'Eagle': {'1': '', '2': '', '3': '', '4': '', '5': '', '6': '', '7': '', '8': ''},
+}
+
+# Share of backup rows that are Cub Scout, merit badge or award records which clean_csv filters out
+SYNTHETIC_FILTERED_SHARE = 0.2
+SYNTHETIC_FILTERED_TYPES = [
+    ('Webelos Adventure', 'Camper'), ('Merit Badge', 'Camping'), ('Merit Badge', 'First Aid'),
+    ('Award', 'Religious Emblem'), ('Rank', 'Bobcat'), ('Arrow of Light Adventure', 'Outdoor Adventurer'),
+]
+
+FIRST_NAMES = [
+    'Aaron', 'Adam', 'Aiden', 'Alex', 'Andrew', 'Ben', 'Brandon', 'Caleb', 'Carter', 'Charlie',
+    'Chris', 'Cole', 'Connor', 'Daniel', 'David', 'Dylan', 'Eli', 'Ethan', 'Evan', 'Finn',
+    'Gabe', 'Gavin', 'Grace', 'Henry', 'Hunter', 'Ian', 'Isaac', 'Ivan', 'Jack', 'Jacob',
+    'James', 'Jane', 'Jason', 'John', 'Jonah', 'Julia', 'Kai', 'Kyle', 'Leo', 'Liam',
+    'Logan', 'Lucas', 'Luke', 'Malcolm', 'Mason', 'Max', 'Maya', 'Micah', 'Nate', 'Noah',
+    'Olivia', 'Owen', 'Parker', 'Quinn', 'Riley', 'Ryan', 'Sam', 'Sean', 'Sophia', 'Tyler',
+]
+LAST_NAMES = [
+    'Adams', 'Alexander', 'Allen', 'Baker', 'Blair', 'Bonlender', 'Brown', 'Campbell', 'Carter', 'Clark',
+    'Collins', 'Davis', 'Edwards', 'Evans', 'Francis', 'Garcia', 'Green', 'Hall', 'Harris', 'Hennessey',
+    'Hill', 'Jackson', 'Johnson', 'Jones', 'King', 'Lee', 'Lewis', 'Martin', 'Miller', 'Mitchell',
+    'Moore', 'Nelson', 'Parker', 'Perez', 'Phillips', 'Roberts', 'Robinson', 'Scott', 'Smith', 'Taylor',
+    'Thomas', 'Thompson', 'Turner', 'Walker', 'Wesner', 'White', 'Williams', 'Wilson', 'Wright', 'Young',
+]
+PATROL_NAMES = ['Eagles', 'Hawks', 'Lions', 'Tigers', 'Wolves', 'Bears', 'Foxes', 'Owls', 'Sharks', 'Cobras']
+
+SCOUTBOOK_COLUMNS = [
+    "BSA Member ID", "First Name", "Middle Name", "Last Name", "Advancement Type", "Advancement", "Version",
+    "Date Completed", "Approved", "Awarded", "MarkedCompletedBy", "MarkedCompletedDate", "CounselorApprovedBy",
+    "CounselorApprovedDate", "LeaderApprovedBy", "LeaderApprovedDate", "AwardedBy", "AwardedDate",
+]
+
+def synthetic_requirements():
+    """
+    Requirements for every synthetic rank, as (Advancement Type, Advancement) pairs in catalog order.
+
+    Each rank contributes its rank award ('Rank', '<rank>') followed by its requirements.
+    """
+    requirements = []
+    for rank, numbers in SYNTHETIC_RANKS.items():
+        requirements.append(('Rank', rank))
+        for number, letters in numbers.items():
+            for letter in letters or ['']:
+                requirements.append((f"{rank} Rank Requirement", f"{number}{letter}"))
+    return requirements
+
+def synthetic_scouts(count):
+    # Unique (first, last) name pairs; a number is added to the last name once the pairs run out
+    pairs = [(first, last) for last in LAST_NAMES for first in FIRST_NAMES]
+    scouts = []
+    for index in range(count):
+        first, last = pairs[index % len(pairs)]
+        repeat = index // len(pairs)
+        scouts.append((first, f"{last}{repeat + 1}" if repeat else last))
+    return scouts
+
+def generate_dataset(output_dir, scouts=50, rows=10000, patrol_size=8, unknown_scout_share=0.02, seed=0):
+    """
+    Write a synthetic patrol roster, requirements catalog and Scoutbook backup.
+
+    Backup rows are written one at a time, so large datasets do not need to fit in memory.
+
+    :param output_dir: Directory to write patrols.tsv, requirements.tsv and advancement_backup.csv to
+    :param scouts: Number of scouts on the roster
+    :param rows: Number of rows in the Scoutbook backup
+    :param patrol_size: Number of scouts per patrol
+    :param unknown_scout_share: Share of backup rows for scouts who are not on the roster
+    :param seed: Random seed, so the same arguments always give the same files
+    :return: Dictionary with the paths of the 'patrols', 'requirements' and 'advancement_backup' files
+    """
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {
+        'patrols': os.path.join(output_dir, 'patrols.tsv'),
+        'requirements': os.path.join(output_dir, 'requirements.tsv'),
+        'advancement_backup': os.path.join(output_dir, 'advancement_backup.csv'),
+    }
+
+    roster = synthetic_scouts(scouts)
+    unknown_scouts = synthetic_scouts(scouts + max(1, scouts // 10))[scouts:]
+    with open(paths['patrols'], 'w', newline='') as file:
+        writer = csv.writer(file, delimiter='\t')
+        writer.writerow(['Scout Name', 'Patrol'])
+        for index, (first, last) in enumerate(roster):
+            patrol_number = index // patrol_size
+            patrol = PATROL_NAMES[patrol_number % len(PATROL_NAMES)]
+            if patrol_number >= len(PATROL_NAMES):
+                patrol = f"{patrol} {patrol_number // len(PATROL_NAMES) + 1}"
+            writer.writerow([f"{first} {last}", patrol])
+
+    requirements = synthetic_requirements()
+    with open(paths['requirements'], 'w', newline='') as file:
+        writer = csv.writer(file, delimiter='\t')
+        writer.writerow(['Requirement', 'Alt Text'])
+        for advancement_type, advancement in requirements:
+            if advancement_type == 'Rank':
+                writer.writerow([f"rank {advancement.lower()}", f"{advancement} Rank"])
+            else:
+                rank = advancement_type[:-len(' Rank Requirement')]
+                writer.writerow([f"{advancement_type.lower()} {advancement}", f"{rank} {advancement}"])
+
+    first_day = date(2015, 1, 1)
+    day_span = (date(2024, 12, 31) - first_day).days
+    with open(paths['advancement_backup'], 'w', newline='') as file:
+        writer = csv.writer(file, quoting=csv.QUOTE_NONNUMERIC)
+        writer.writerow(SCOUTBOOK_COLUMNS)
+        for _ in range(rows):
+            if rng.random() < unknown_scout_share:
+                member = len(roster) + rng.randrange(len(unknown_scouts))
+                first, last = unknown_scouts[member - len(roster)]
+            else:
+                member = rng.randrange(len(roster))
+                first, last = roster[member]
+            if rng.random() < SYNTHETIC_FILTERED_SHARE:
+                advancement_type, advancement = rng.choice(SYNTHETIC_FILTERED_TYPES)
+            else:
+                advancement_type, advancement = rng.choice(requirements)
+            completed = first_day + timedelta(days=rng.randrange(day_span))
+            completed_text = f"{completed.month}/{completed.day}/{completed.year}"
+            writer.writerow([12600000 + member, first, '', last, advancement_type, advancement, 2022,
+                             completed_text, 1, '', 'ASM', completed_text, '', '', 'SM', completed_text, '', ''])
+
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Scoutbook backup, patrol roster and requirements catalog.")
+    parser.add_argument('output_dir', help="Directory to write the generated files to")
+    parser.add_argument('--scouts', type=int, default=50, help="Number of scouts on the roster")
+    parser.add_argument('--rows', type=int, default=10000, help="Number of rows in the Scoutbook backup")
+    parser.add_argument('--patrol-size', type=int, default=8, help="Number of scouts per patrol")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    paths = generate_dataset(args.output_dir, scouts=args.scouts, rows=args.rows, patrol_size=args.patrol_size, seed=args.seed)
+    for name, path in paths.items():
+        print(f"{name}: {path}")
+
+if __name__ == '__main__':
+    main()
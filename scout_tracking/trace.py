@@ -0,0 +1,52 @@
+import os
+import json
+
+# Trace levels: nothing, one compact record per step, or compact records plus full data dumps
+TRACE_OFF = 0
+TRACE_SUMMARY = 1
+TRACE_FULL = 2
+TRACE_LEVELS = {'off': TRACE_OFF, 'summary': TRACE_SUMMARY, 'full': TRACE_FULL}
+
+class TraceLog:
+    """
+    Structured debug log written as JSON lines, one record per event.
+
+    Nothing is opened or written when the level is TRACE_OFF, so callers can record
+    unconditionally and guard only the work of building expensive records.
+    """
+
+    def __init__(self, output_dir, level=TRACE_OFF, filename='debug_log.jsonl'):
+        """
+        :param output_dir: Directory to write the log to
+        :param level: One of TRACE_OFF, TRACE_SUMMARY or TRACE_FULL
+        :param filename: Name of the log file in output_dir
+        """
+        self.level = level
+        self.path = os.path.join(output_dir, filename)
+        self.file = open(self.path, 'w') if level > TRACE_OFF else None
+
+    def enabled(self, level=TRACE_SUMMARY):
+        return self.level >= level
+
+    def record(self, event, level=TRACE_SUMMARY, **fields):
+        """
+        Write one record if the log is at least at the given level.
+
+        :param event: Name of the event, stored in the record's "event" field
+        :param level: Minimum trace level for the record to be written
+        """
+        if self.file is None or self.level < level:
+            return
+        self.file.write(json.dumps({'event': event, **fields}, default=str))
+        self.file.write('\n')
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
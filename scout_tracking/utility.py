@@ -1,10 +1,41 @@
-def get_scout_patrol(scout, patrol_structure):
-    # Search for the scout across all patrols and return the patrol name if found
+import os
+
+def get_scout_patrol(scout, patrol_structure, roster_index=None):
+    """
+    Find the patrol a scout belongs to.
+
+    :param scout: Lowercase scout name
+    :param patrol_structure: Dictionary of patrols and their scouts
+    :param roster_index: Index from build_roster_index (defaults to None, which means the patrols
+        are searched one by one; pass one in when looking up many scouts)
+    :return: The patrol name, or None if the scout is not in any patrol
+    """
+    if roster_index is not None:
+        entry = roster_index.get(scout)
+        return entry[0] if entry is not None else None
+    # Search for the scout across all patrols and return the first patrol they are found in
     for patrol, scouts in patrol_structure.items():
         if scout in scouts:
             return patrol
     return None  # Scout not found in any patrol
 
+def write_atomic(path, data):
+    """
+    Write a file by writing a temporary file next to it and renaming it over the old one, so that
+    readers such as a sync client, a metrics collector or a later run never see a partial file.
+
+    :param path: Path of the file to write
+    :param data: Contents, as text (written unchanged, with no newline translation) or bytes
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    if isinstance(data, bytes):
+        with open(temp_path, 'wb') as file:
+            file.write(data)
+    else:
+        with open(temp_path, 'w', newline='') as file:
+            file.write(data)
+    os.replace(temp_path, path)
+
 def report_extra_advancements(extra_advancements):
     if extra_advancements:
         print("\nExtra advancements detected:")
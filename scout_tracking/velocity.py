@@ -0,0 +1,159 @@
+import os
+import csv
+import numpy as np
+from datetime import date
+from scout_tracking.dates import NO_DATE, EPOCH_ORDINAL, format_date
+from scout_tracking.hierarchy import RANK_PREFIX
+from scout_tracking.catalog import as_catalog
+
+# Number of months covered by the monthly velocity reports
+VELOCITY_MONTHS = 12
+
+# Trailing window whose completion rate is used to project rank completion
+VELOCITY_WINDOW_DAYS = 180
+
+def requirement_ranks(requirements):
+    """
+    Group requirements by the rank they belong to, using the catalog's hierarchy index.
+
+    :param requirements: RequirementCatalog (or dictionary, or list of lowercase requirement names)
+    :return: List of rank names in catalog order, an array with the rank index of each requirement
+        (-1 for requirements that are not part of a rank) and an array with the row of each rank's
+        own award requirement (-1 if the catalog does not list it)
+    """
+    hierarchy = as_catalog(requirements).hierarchy
+    return hierarchy.ranks, hierarchy.rank_ids, hierarchy.award_rows
+
+def compute_velocity(completion_matrix, requirements, as_of, months=VELOCITY_MONTHS, window_days=VELOCITY_WINDOW_DAYS):
+    """
+    Compute advancement velocity for every scout in a completion matrix at once.
+
+    Each statistic is a group-by over the matrix's arrays (bincounts and matrix products),
+    so the cost does not depend on a Python loop per scout.
+
+    :param completion_matrix: CompletionMatrix with completion dates
+    :param requirements: RequirementCatalog the matrix was built with, whose hierarchy index gives the ranks
+    :param as_of: datetime.date the statistics are computed for; later completions are ignored
+    :param months: Number of months, ending with the month of as_of, to count completions for
+    :param window_days: Trailing window whose completion rate is used for the projection
+    :return: Dictionary of per-scout arrays, indexed by scout ID: 'monthly' (scouts x months counts),
+        'last_completed' (day ordinals, NO_DATE if none), 'days_since' (-1 if none), 'recent',
+        'current_rank' (-1 if every rank is complete), 'remaining' and 'projected' (day ordinals,
+        NO_DATE when there is no recent completion to project from), plus 'month_labels' and 'ranks'
+    """
+    as_of_ordinal = as_of.toordinal()
+    snapshot = completion_matrix.as_of(as_of_ordinal)
+    completed_on = snapshot.completed_on
+    scout_count = len(snapshot.scouts)
+
+    # Completions per scout per month, as one bincount over (scout, month) pairs
+    last_month = np.datetime64(as_of, 'M')
+    first_month = last_month - (months - 1)
+    requirement_ids, scout_ids = np.nonzero(completed_on)
+    days = (completed_on[requirement_ids, scout_ids].astype(np.int64) - EPOCH_ORDINAL).astype('datetime64[D]')
+    month_offsets = (days.astype('datetime64[M]') - first_month).astype(np.int64)
+    in_range = (month_offsets >= 0) & (month_offsets < months)
+    monthly = np.bincount(scout_ids[in_range] * months + month_offsets[in_range],
+                          minlength=scout_count * months).reshape(scout_count, months)
+
+    # Most recent completion and completions in the trailing window
+    last_completed = completed_on.max(axis=0, initial=NO_DATE)
+    days_since = np.where(last_completed != NO_DATE, as_of_ordinal - last_completed, -1)
+    recent = (completed_on > as_of_ordinal - window_days).sum(axis=0)
+
+    # The rank a scout is working on is the first one not yet complete, with the requirements left in it
+    catalog = as_catalog(requirements)
+    hierarchy = catalog.hierarchy
+    rollups = hierarchy.rank_rollups(snapshot.completed[snapshot.requirement_rows(catalog.names)])
+    current_rank = rollups['next_rank']
+    working = np.nonzero(current_rank >= 0)[0]
+    remaining = np.zeros(scout_count, dtype=np.int32)
+    remaining[working] = rollups['remaining'][current_rank[working], working]
+
+    # Project the completion date at the trailing window's rate
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_needed = np.ceil(remaining * window_days / recent)
+    projected = np.where((current_rank >= 0) & (recent > 0), as_of_ordinal + np.nan_to_num(days_needed), NO_DATE).astype(np.int64)
+
+    return {
+        'month_labels': [str(first_month + offset) for offset in range(months)],
+        'ranks': hierarchy.ranks,
+        'monthly': monthly,
+        'last_completed': last_completed,
+        'days_since': days_since,
+        'recent': recent,
+        'current_rank': current_rank,
+        'remaining': remaining,
+        'projected': projected,
+    }
+
+def generate_velocity_reports(patrol_structure, requirements, completion_matrix, output_dir, as_of=None,
+                              months=VELOCITY_MONTHS, window_days=VELOCITY_WINDOW_DAYS):
+    """
+    Write monthly velocity and progress reports for the whole troop.
+
+    velocity_by_scout.csv and velocity_by_patrol.csv count the requirements completed in each
+    month. scout_progress.csv gives each scout's last completion, the days since, the rank they
+    are working on, the requirements left in it and the projected date it will be complete.
+
+    :param patrol_structure: Dictionary of patrols and their scouts
+    :param requirements: RequirementCatalog (requirements and their alt text) from load_requirements
+    :param completion_matrix: CompletionMatrix with completion dates, from load_troop_advancements
+    :param output_dir: Directory where the reports will be saved
+    :param as_of: datetime.date to report as of (defaults to None, which means today)
+    :param months: Number of months to report on, ending with the month of as_of
+    :param window_days: Trailing window whose completion rate is used for the projection
+    :return: List of the report files written
+    """
+    if as_of is None:
+        as_of = date.today()
+    velocity = compute_velocity(completion_matrix, requirements, as_of, months=months, window_days=window_days)
+    rank_labels = [requirements.get(RANK_PREFIX + rank, rank.title()) for rank in velocity['ranks']]
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Scout IDs grouped by patrol, in patrol order and sorted by name within each patrol
+    patrol_scout_ids = [(patrol_name, completion_matrix.scout_columns(sorted(scouts)))
+                        for patrol_name, scouts in patrol_structure.items()]
+
+    by_scout_file = os.path.join(output_dir, 'velocity_by_scout.csv')
+    with open(by_scout_file, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Patrol', 'Scout'] + velocity['month_labels'] + ['Total'])
+        for patrol_name, scout_ids in patrol_scout_ids:
+            for scout_id in scout_ids:
+                counts = velocity['monthly'][scout_id].tolist()
+                writer.writerow([patrol_name, completion_matrix.scouts[scout_id]] + counts + [sum(counts)])
+
+    by_patrol_file = os.path.join(output_dir, 'velocity_by_patrol.csv')
+    with open(by_patrol_file, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Patrol', 'Scouts'] + velocity['month_labels'] + ['Total'])
+        for patrol_name, scout_ids in patrol_scout_ids:
+            counts = velocity['monthly'][scout_ids].sum(axis=0).tolist()
+            writer.writerow([patrol_name, len(scout_ids)] + counts + [sum(counts)])
+
+    progress_file = os.path.join(output_dir, 'scout_progress.csv')
+    with open(progress_file, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Patrol', 'Scout', 'Last Completion', 'Days Since Last Completion',
+                         f'Completed Last {window_days} Days', 'Working On', 'Remaining', 'Projected Completion'])
+        for patrol_name, scout_ids in patrol_scout_ids:
+            for scout_id in scout_ids:
+                current_rank = velocity['current_rank'][scout_id]
+                writer.writerow([
+                    patrol_name,
+                    completion_matrix.scouts[scout_id],
+                    _format_ordinal(velocity['last_completed'][scout_id]),
+                    velocity['days_since'][scout_id] if velocity['days_since'][scout_id] >= 0 else '',
+                    velocity['recent'][scout_id],
+                    rank_labels[current_rank] if current_rank >= 0 else '',
+                    velocity['remaining'][scout_id] if current_rank >= 0 else '',
+                    _format_ordinal(velocity['projected'][scout_id]),
+                ])
+
+    print(f"Velocity reports saved to: {output_dir}")
+    return [by_scout_file, by_patrol_file, progress_file]
+
+def _format_ordinal(ordinal):
+    # m/d/YYYY date for a day ordinal, or blank for NO_DATE
+    return format_date(ordinal) if ordinal != NO_DATE else ''
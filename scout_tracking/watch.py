@@ -0,0 +1,226 @@
+import os
+import time
+import hashlib
+import numpy as np
+from scout_tracking.load_patrol_data import load_patrol_data
+from scout_tracking.load_requirements import load_requirements
+from scout_tracking.pipeline import load_troop_advancements
+from scout_tracking.report import generate_patrol_report_csv, generate_additional_report
+from scout_tracking.reconcile import load_requirement_aliases, reconcile_scouts, MATCH_OFF
+from scout_tracking.trace import TRACE_OFF
+
+# Seconds between checks of the input files
+WATCH_INTERVAL = 1.0
+
+# Seconds an input file must go unchanged before it is reloaded, so a file still being copied is not read
+WATCH_DEBOUNCE = 2.0
+
+# Names of the inputs a TroopState watches
+PATROL_INPUT = 'patrol'
+REQUIREMENTS_INPUT = 'requirements'
+ALIASES_INPUT = 'aliases'
+ADVANCEMENT_INPUT = 'advancement'
+
+def _file_signature(path):
+    # Size and modification time of a file, or None if it does not exist
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+class InputWatcher:
+    """
+    Polls a set of files for changes, debouncing partial writes.
+
+    A change is reported once the file's size and modification time have stayed the same for the
+    debounce period, so an export still being copied into a shared folder is not read half-written.
+    """
+
+    def __init__(self, paths, debounce=WATCH_DEBOUNCE, clock=time.monotonic):
+        """
+        :param paths: Dictionary of input names to file paths
+        :param debounce: Seconds a changed file must stay unchanged before it is reported
+        :param clock: Function returning the current time in seconds
+        """
+        self.paths = dict(paths)
+        self.debounce = debounce
+        self.clock = clock
+        self.signatures = {name: _file_signature(path) for name, path in self.paths.items()}
+        self.pending = {}
+
+    def poll(self):
+        """
+        Check the files once.
+
+        :return: Set of the names of inputs that changed and have since settled
+        """
+        now = self.clock()
+        settled = set()
+        for name, path in self.paths.items():
+            signature = _file_signature(path)
+            if signature == self.signatures[name]:
+                self.pending.pop(name, None)
+                continue
+            # A new or still-changing signature restarts the debounce period
+            if name not in self.pending or self.pending[name][0] != signature:
+                self.pending[name] = (signature, now)
+            elif now - self.pending[name][1] >= self.debounce and signature is not None:
+                self.signatures[name] = signature
+                del self.pending[name]
+                settled.add(name)
+        return settled
+
+class TroopState:
+    """
+    A troop's loaded roster, requirements and completions, kept in memory between updates.
+
+    refresh reloads only the inputs that changed and regenerates only the patrol reports whose
+    scouts, requirement labels or completions differ from the last reports written. Reloading the
+    roster or the requirements also reloads the advancement file, since the completion matrix is
+    indexed by both.
+    """
+
+    def __init__(self, patrol_file, requirements_file, advancement_file, output_dir, patrol_names=None, raw=False,
+                 checkpoint_file=None, requirement_aliases=None, jobs=1, trace_level=TRACE_OFF, match_scouts=MATCH_OFF,
+                 rollups=False):
+        """
+        :param patrol_file: Path to the patrol membership TSV file
+        :param requirements_file: Path to the requirements TSV file
+        :param advancement_file: Path to the cleaned advancement CSV, or the raw Scoutbook backup if raw is set
+        :param output_dir: Directory where refresh saves the reports
+        :param patrol_names: List of patrol names to generate reports for (defaults to None, which means all patrols)
+        :param raw: Clean the raw Scoutbook backup while loading it
+        :param checkpoint_file: Checkpoint to resume advancement loading from, so only appended rows are read
+        :param requirement_aliases: Alias table mapping other spellings to catalog requirements
+        :param jobs: Number of patrol reports to write concurrently
+        :param trace_level: Level of the structured debug log
+        :param match_scouts: Scout matching mode, as for run_troop
+        :param rollups: Add the rank rollup rows to the patrol reports
+        """
+        self.paths = {PATROL_INPUT: patrol_file, REQUIREMENTS_INPUT: requirements_file, ADVANCEMENT_INPUT: advancement_file}
+        if requirement_aliases:
+            self.paths[ALIASES_INPUT] = requirement_aliases
+        self.output_dir = output_dir
+        self.patrol_names = patrol_names
+        self.raw = raw
+        self.checkpoint_file = checkpoint_file
+        self.jobs = jobs
+        self.trace_level = trace_level
+        self.match_scouts = match_scouts
+        self.rollups = rollups
+
+        self.patrol_data = None
+        self.requirements = None
+        self.patrol_structure = None
+        self.completion_matrix = None
+        self.additional_scouts = None
+        self.additional_requirements = None
+        self.fingerprints = {}
+
+    def load_roster(self):
+        self.patrol_data = load_patrol_data(self.paths[PATROL_INPUT])
+
+    def load_requirements(self):
+        self.requirements = load_requirements(self.paths[REQUIREMENTS_INPUT])
+        if ALIASES_INPUT in self.paths:
+            load_requirement_aliases(self.paths[ALIASES_INPUT], self.requirements)
+
+    def load_advancements(self):
+        self.patrol_structure, self.completion_matrix, self.additional_scouts, self.additional_requirements, _ = load_troop_advancements(
+            self.paths[ADVANCEMENT_INPUT], self.patrol_data, self.requirements, raw=self.raw,
+            checkpoint_file=self.checkpoint_file, match_scouts=self.match_scouts)
+
+    def patrol_fingerprints(self):
+        """
+        Hash of what each patrol's report is built from: its scouts, the requirement labels and its completions.
+
+        :return: Dictionary of patrol names to hashes
+        """
+        labels = hashlib.sha256('\0'.join(self.requirements.alt_texts).encode('utf-8')).digest()
+        requirement_rows = self.completion_matrix.requirement_rows(self.requirements.names)
+        fingerprints = {}
+        for patrol_name, patrol in self.patrol_structure.items():
+            scout_names = sorted(patrol.keys())
+            completed = self.completion_matrix.completed[np.ix_(requirement_rows, self.completion_matrix.scout_columns(scout_names))]
+            digest = hashlib.sha256(labels)
+            digest.update('\0'.join(scout_names).encode('utf-8'))
+            digest.update(np.ascontiguousarray(completed).tobytes())
+            fingerprints[patrol_name] = digest.hexdigest()
+        return fingerprints
+
+    def reload(self, changed=None):
+        """
+        Reload the changed inputs, without writing any reports.
+
+        Each input is loaded into a new object that replaces the old one, so a shallow copy of the
+        state taken beforehand still holds the previous data.
+
+        :param changed: Set of the inputs that changed (defaults to None, which means load everything)
+        """
+        if changed is None:
+            changed = set(self.paths)
+        if PATROL_INPUT in changed:
+            self.load_roster()
+        if REQUIREMENTS_INPUT in changed or ALIASES_INPUT in changed:
+            self.load_requirements()
+        self.load_advancements()
+
+    def refresh(self, changed=None):
+        """
+        Reload the changed inputs and regenerate the reports they affect.
+
+        :param changed: Set of the inputs that changed (defaults to None, which means load everything)
+        :return: List of the patrols whose reports were regenerated
+        """
+        previous_additional = (self.additional_scouts, self.additional_requirements)
+        self.reload(changed)
+
+        fingerprints = self.patrol_fingerprints()
+        changed_patrols = {name for name, fingerprint in fingerprints.items() if self.fingerprints.get(name) != fingerprint}
+        self.fingerprints = fingerprints
+        patrol_names = self.patrol_names or list(self.patrol_structure.keys())
+        generate_patrol_report_csv(self.patrol_structure, self.requirements, self.output_dir, patrol_names=patrol_names,
+                                   completion_matrix=self.completion_matrix, jobs=self.jobs, trace_level=self.trace_level,
+                                   changed_patrols=changed_patrols, rollups=self.rollups)
+        if (self.additional_scouts, self.additional_requirements) != previous_additional:
+            generate_additional_report(self.additional_scouts, self.additional_requirements, self.output_dir)
+            if self.match_scouts != MATCH_OFF:
+                reconcile_scouts(self.patrol_structure, self.additional_scouts, self.output_dir)
+        return sorted(changed_patrols & {name.lower() for name in patrol_names})
+
+def watch(state, interval=WATCH_INTERVAL, debounce=WATCH_DEBOUNCE, max_updates=None):
+    """
+    Load a troop, write its reports, then keep them up to date as its input files change.
+
+    Runs until interrupted (or until max_updates updates have been made, for testing).
+
+    :param state: TroopState to load and keep up to date
+    :param interval: Seconds between checks of the input files
+    :param debounce: Seconds a changed file must stay unchanged before it is reloaded
+    :param max_updates: Number of updates after which to stop (defaults to None, which means never stop)
+    """
+    watcher = InputWatcher(state.paths, debounce=debounce)
+    state.refresh()
+    print(f"Watching {', '.join(sorted(state.paths.values()))} for changes. Press Ctrl+C to stop.")
+    updates = 0
+    try:
+        while max_updates is None or updates < max_updates:
+            time.sleep(interval)
+            changed = watcher.poll()
+            if not changed:
+                continue
+            start = time.perf_counter()
+            try:
+                patrols = state.refresh(changed)
+            except Exception as error:
+                # A malformed or half-copied drop (which can fail in the csv module, a decompressor or a
+                # loader) should not stop the watch; the next good file is picked up as usual
+                print(f"Error reloading {', '.join(sorted(changed))}: {type(error).__name__}: {error}")
+                continue
+            finally:
+                updates += 1
+            print(f"Updated {len(patrols)} patrol report(s) after changes to {', '.join(sorted(changed))} "
+                  f"in {time.perf_counter() - start:.3f}s")
+    except KeyboardInterrupt:
+        print("Stopped watching.")
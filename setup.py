@@ -6,8 +6,17 @@ setup(
     packages=find_packages(),
     install_requires=[
         # List of dependencies (e.g., pytest, pandas, etc.)
-        "pytest>=6.0"
+        "pytest>=6.0",
+        "numpy"
     ],
+    extras_require={
+        # The clean command reads backups with pandas when it is installed, and the standard library csv module otherwise
+        "pandas": ["pandas"],
+        # Inputs compressed with zstd can be read once zstandard is installed; gzip, bz2 and xz need nothing extra
+        "zstd": ["zstandard"],
+    },
+    entry_points={
+        "console_scripts": ["scout-tracking=scout_tracking.cli:main"],
+    },
     test_suite="tests",  # Points to the tests directory
 )
-
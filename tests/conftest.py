@@ -0,0 +1,16 @@
+import pytest
+
+@pytest.fixture
+def troop_files(tmp_path):
+    patrol_file = tmp_path / 'patrols.tsv'
+    patrol_file.write_text("Scout Name\tPatrol\n"
+                           "Max Francis\tPaw\n"
+                           "Ivan Alexander\tPurple People\n")
+    requirements_file = tmp_path / 'requirements.tsv'
+    requirements_file.write_text("Requirement\tAlt Text\n"
+                                 "rank scout\tScout Rank\n"
+                                 "scout rank requirement 1a\tScout 1a\n")
+    advancement_file = tmp_path / 'advancement.csv'
+    advancement_file.write_text("Name,Advancement Info,Date Completed\n"
+                                "Max Francis,rank scout,11/15/2018\n")
+    return patrol_file, requirements_file, advancement_file, tmp_path / 'reports'
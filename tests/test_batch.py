@@ -0,0 +1,36 @@
+import pytest
+import os
+import shutil
+from scout_tracking.batch import load_manifest, run_batch
+from scout_tracking.load_requirements import load_requirements
+
+TEST_DIR = os.path.dirname(__file__)
+
+@pytest.fixture
+def manifest_file(tmp_path):
+    shutil.copy(os.path.join(TEST_DIR, 'test_patrol_data.tsv'), tmp_path / 'patrols.tsv')
+    shutil.copy(os.path.join(TEST_DIR, 'test_advancement.csv'), tmp_path / 'advancement.csv')
+    manifest = tmp_path / 'manifest.tsv'
+    manifest.write_text("Troop\tPatrol File\tAdvancement File\tOutput Dir\n"
+                        "100\tpatrols.tsv\tadvancement.csv\tout/100\n"
+                        "200\tpatrols.tsv\tmissing.csv\tout/200\n")
+    return manifest
+
+def test_load_manifest(manifest_file, tmp_path):
+    troops = load_manifest(str(manifest_file))
+    assert [troop['troop'] for troop in troops] == ['100', '200']
+    assert troops[0]['patrol_file'] == str(tmp_path / 'patrols.tsv')
+    assert troops[0]['requirements_file'] is None
+
+def test_run_batch(manifest_file, tmp_path):
+    troops = load_manifest(str(manifest_file))
+    requirements = load_requirements(os.path.join(TEST_DIR, 'test_requirements.tsv'))
+
+    results = run_batch(troops, requirements, jobs=2)
+
+    # One troop failing does not stop the others
+    assert results[0] == ('100', True, '3 patrol reports written')
+    assert results[1][0] == '200' and not results[1][1]
+    assert 'missing.csv' in results[1][2]
+    assert (tmp_path / 'out' / '100' / 'paw_report.csv').exists()
+    assert (tmp_path / 'out' / '100' / 'run_log.txt').exists()
@@ -0,0 +1,55 @@
+import pytest
+import os
+from scout_tracking import cache as cache_module
+from scout_tracking.cache import ParseCache
+from scout_tracking.load_patrol_data import load_patrol_data
+
+@pytest.fixture
+def patrol_file(tmp_path):
+    path = tmp_path / 'patrols.tsv'
+    path.write_text("Scout Name\tPatrol\nMax Francis\tPaw\n")
+    return str(path)
+
+@pytest.fixture
+def counting_loader():
+    calls = []
+    def loader(filename):
+        calls.append(filename)
+        return load_patrol_data(filename)
+    loader.calls = calls
+    return loader
+
+def test_cache_hit_and_miss(tmp_path, patrol_file, counting_loader):
+    cache = ParseCache(str(tmp_path / 'cache'))
+
+    assert cache.load(counting_loader, patrol_file) == {'max francis': 'paw'}
+    assert cache.load(counting_loader, patrol_file) == {'max francis': 'paw'}
+    assert len(counting_loader.calls) == 1
+
+    # Changing the file contents invalidates the entry
+    with open(patrol_file, 'a') as file:
+        file.write("Parker Hennessey\tRRD\n")
+    assert cache.load(counting_loader, patrol_file) == {'max francis': 'paw', 'parker hennessey': 'rrd'}
+    assert len(counting_loader.calls) == 2
+
+def test_cache_version_invalidates_entries(tmp_path, patrol_file, counting_loader, monkeypatch):
+    cache = ParseCache(str(tmp_path / 'cache'))
+    cache.load(counting_loader, patrol_file)
+
+    # Entries written before the cached types changed are not reused
+    monkeypatch.setattr(cache_module, 'CACHE_VERSION', cache_module.CACHE_VERSION + 1)
+    cache.load(counting_loader, patrol_file)
+    assert len(counting_loader.calls) == 2
+
+def test_cache_evicts_least_recently_used(tmp_path, patrol_file, counting_loader):
+    cache_dir = tmp_path / 'cache'
+    cache = ParseCache(str(cache_dir), max_entries=1)
+
+    cache.load(counting_loader, patrol_file)
+    other_file = tmp_path / 'other.tsv'
+    other_file.write_text("Scout Name\tPatrol\nIvan Alexander\tPurple People\n")
+    cache.load(counting_loader, str(other_file))
+
+    assert len(os.listdir(cache_dir)) == 1
+    cache.load(counting_loader, patrol_file)
+    assert len(counting_loader.calls) == 3
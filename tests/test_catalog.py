@@ -0,0 +1,35 @@
+import pickle
+from scout_tracking.catalog import RequirementCatalog, as_catalog, UNKNOWN_REQUIREMENT
+
+def test_catalog_behaves_like_requirements_dict():
+    catalog = RequirementCatalog([('Rank Scout', 'Scout Rank'), ('scout rank requirement 1a', 'Scout 1a')])
+
+    assert list(catalog) == ['rank scout', 'scout rank requirement 1a']
+    assert catalog['rank scout'] == 'Scout Rank'
+    assert catalog.get('unknown') is None
+    assert 'scout rank requirement 1a' in catalog
+    assert catalog == {'rank scout': 'Scout Rank', 'scout rank requirement 1a': 'Scout 1a'}
+
+def test_catalog_ids():
+    catalog = RequirementCatalog([('rank scout', 'Scout Rank'), ('scout rank requirement 1a', 'Scout 1a')])
+
+    assert catalog.id_of('Scout Rank Requirement 1a') == 1
+    assert catalog.id_of('scout rank requirement 1a') == 1
+    assert catalog.id_of('Mystery Requirement') == UNKNOWN_REQUIREMENT
+
+    # Replacing alt text keeps the ID; new requirements get the next ID, even for spellings looked up before
+    assert catalog.add('Rank Scout', 'Scout') == 0
+    assert catalog['rank scout'] == 'Scout'
+    assert catalog.add('mystery requirement', 'Mystery') == 2
+    assert catalog.id_of('Mystery Requirement') == 2
+
+def test_catalog_pickles():
+    catalog = RequirementCatalog([('rank scout', 'Scout Rank')])
+    catalog.id_of('Rank Scout')
+    assert pickle.loads(pickle.dumps(catalog)) == catalog
+
+def test_as_catalog():
+    catalog = RequirementCatalog([('rank scout', 'Scout Rank')])
+    assert as_catalog(catalog) is catalog
+    assert as_catalog({'rank scout': 'Scout Rank'}).alt_texts == ['Scout Rank']
+    assert as_catalog(['Rank Scout']).names == ['rank scout']
@@ -0,0 +1,101 @@
+import pytest
+from datetime import date
+from scout_tracking.checkpoint import load_advancements_checkpointed
+from scout_tracking.completion_matrix import CompletionMatrix
+
+@pytest.fixture
+def requirements():
+    return {'rank scout': 'Scout Rank', 'scout rank requirement 1a': 'Scout 1a'}
+
+def fresh_structure():
+    return {
+        'paw': {'max francis': {'advancements': []}},
+        'purple people': {'ivan alexander': {'advancements': []}}
+    }
+
+@pytest.fixture
+def advancement_file(tmp_path):
+    path = tmp_path / 'advancement.csv'
+    path.write_text("Name,Advancement Info,Date Completed\n"
+                    "Max Francis,rank scout,11/15/2018\n"
+                    "Unknown Scout,rank scout,11/16/2018\n")
+    return path
+
+def test_resume_reads_only_appended_rows(tmp_path, advancement_file, requirements, capsys):
+    checkpoint_file = str(tmp_path / 'advancement.checkpoint')
+    load_advancements_checkpointed(str(advancement_file), checkpoint_file, fresh_structure(), requirements)
+    assert "No usable checkpoint" in capsys.readouterr().out
+
+    with open(advancement_file, 'a') as file:
+        file.write("Ivan Alexander,scout rank requirement 1a,4/30/2019\n")
+        file.write("Unknown Scout,Mystery Requirement,4/30/2019\n")
+
+    structure, additional_scouts, additional_requirements = load_advancements_checkpointed(
+        str(advancement_file), checkpoint_file, fresh_structure(), requirements)
+    assert "No usable checkpoint" not in capsys.readouterr().out
+
+    # State from the first run is restored and the appended rows are applied on top
+    assert structure['paw']['max francis']['advancements'] == ['rank scout']
+    assert structure['purple people']['ivan alexander']['advancements'] == ['scout rank requirement 1a']
+    assert additional_scouts == {'unknown scout': 2}
+    assert additional_requirements == []
+
+def test_changed_prefix_rebuilds(tmp_path, advancement_file, requirements, capsys):
+    checkpoint_file = str(tmp_path / 'advancement.checkpoint')
+    load_advancements_checkpointed(str(advancement_file), checkpoint_file, fresh_structure(), requirements)
+    capsys.readouterr()
+
+    advancement_file.write_text("Name,Advancement Info,Date Completed\n"
+                                "Ivan Alexander,rank scout,11/15/2018\n"
+                                "Max Francis,scout rank requirement 1a,11/16/2018\n")
+    structure, additional_scouts, _ = load_advancements_checkpointed(
+        str(advancement_file), checkpoint_file, fresh_structure(), requirements)
+
+    assert "No usable checkpoint" in capsys.readouterr().out
+    assert structure['paw']['max francis']['advancements'] == ['scout rank requirement 1a']
+    assert structure['purple people']['ivan alexander']['advancements'] == ['rank scout']
+    assert additional_scouts == {}
+
+def test_resume_restores_completion_dates(tmp_path, advancement_file, requirements, capsys):
+    checkpoint_file = str(tmp_path / 'advancement.checkpoint')
+    load_advancements_checkpointed(str(advancement_file), checkpoint_file, fresh_structure(), requirements,
+                                   completion_matrix=CompletionMatrix(['max francis', 'ivan alexander'], requirements))
+    capsys.readouterr()
+
+    matrix = CompletionMatrix(['max francis', 'ivan alexander'], requirements)
+    load_advancements_checkpointed(str(advancement_file), checkpoint_file, fresh_structure(), requirements, completion_matrix=matrix)
+
+    assert "No usable checkpoint" not in capsys.readouterr().out
+    assert matrix.completed_on[0, 0] == date(2018, 11, 15).toordinal()
+
+def test_changed_row_before_offset_rebuilds(tmp_path, requirements, capsys):
+    # A row changed in the middle of the file is noticed even though the start and end of the prefix are the same
+    path = tmp_path / 'advancement.csv'
+    rows = [f"Unknown Scout {number},rank scout,11/16/2018\n" for number in range(500)]
+    path.write_text("Name,Advancement Info,Date Completed\n" + ''.join(rows[:250]) +
+                    "Max Francis,scout rank requirement 1b,11/15/2018\n" + ''.join(rows[250:]))
+    checkpoint_file = str(tmp_path / 'advancement.checkpoint')
+    load_advancements_checkpointed(str(path), checkpoint_file, fresh_structure(), requirements)
+    capsys.readouterr()
+
+    path.write_text(path.read_text().replace("requirement 1b", "requirement 1a") + "Ivan Alexander,rank scout,4/30/2019\n")
+    structure, _, additional_requirements = load_advancements_checkpointed(str(path), checkpoint_file, fresh_structure(), requirements)
+    assert "No usable checkpoint" in capsys.readouterr().out
+    assert structure['paw']['max francis']['advancements'] == ['scout rank requirement 1a']
+    assert additional_requirements == []
+    assert structure['purple people']['ivan alexander']['advancements'] == ['rank scout']
+
+def test_unfinished_last_line_is_read_again(tmp_path, advancement_file, requirements, capsys):
+    checkpoint_file = str(tmp_path / 'advancement.checkpoint')
+    with open(advancement_file, 'a') as file:
+        file.write("Ivan Alexander,scout rank requirement 1")
+    structure, _, _ = load_advancements_checkpointed(str(advancement_file), checkpoint_file, fresh_structure(), requirements)
+    assert structure['purple people']['ivan alexander']['advancements'] == []
+    capsys.readouterr()
+
+    # The rest of the line arrives and the whole row is loaded
+    with open(advancement_file, 'a') as file:
+        file.write("a,4/30/2019\nIvan Alexander,rank scout,5/1/2019\n")
+    structure, _, _ = load_advancements_checkpointed(str(advancement_file), checkpoint_file, fresh_structure(), requirements)
+    assert "No usable checkpoint" not in capsys.readouterr().out
+    assert structure['purple people']['ivan alexander']['advancements'] == ['scout rank requirement 1a', 'rank scout']
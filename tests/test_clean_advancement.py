@@ -0,0 +1,124 @@
+import pytest
+import os
+import csv
+from scout_tracking.clean_advancement import clean_csv, read_raw_advancement_chunks, normalize_date, ENGINE_CSV, ENGINE_PANDAS
+
+@pytest.fixture
+def raw_advancement_file():
+    return os.path.join(os.path.dirname(__file__), 'test_raw_advancement.csv')
+
+def test_clean_csv(raw_advancement_file, tmp_path):
+    output_file = tmp_path / 'advancement.csv'
+    stats = clean_csv(raw_advancement_file, str(output_file))
+
+    with open(output_file, 'r') as file:
+        rows = list(csv.reader(file))
+
+    assert stats == {'raw_rows_read': 8, 'rows_filtered': 3, 'rows_missing_date': 1, 'rows_written': 4}
+
+    assert rows == [
+        ['Name', 'Advancement Info', 'Date Completed'],
+        ['Dylan Adams', 'Tenderfoot Rank Requirement 1a', '1/2/2024'],
+        ['Ivan Alexander', 'Scout Rank Requirement 1a', '7/19/2024'],
+        ['Ivan Alexander', 'Rank Scout', '8/27/2024'],
+        ['Max Francis', 'Scout Rank Requirement 2a', '10/3/2023'],
+    ]
+
+def test_read_raw_advancement_chunks_matches_clean_csv(raw_advancement_file, tmp_path):
+    output_file = tmp_path / 'advancement.csv'
+    clean_csv(raw_advancement_file, str(output_file))
+    with open(output_file, 'r') as file:
+        cleaned_rows = list(csv.reader(file))[1:]
+
+    streamed_rows = [row for chunk in read_raw_advancement_chunks(raw_advancement_file, chunk_size=2) for row in chunk]
+
+    # The streaming cleaner keeps file order, but applies the same filters and formatting
+    assert sorted(streamed_rows) == sorted(cleaned_rows)
+
+def test_normalize_date():
+    assert normalize_date('07/09/2024') == '7/9/2024'
+    assert normalize_date('2024-07-09') == '7/9/2024'
+    assert normalize_date('') is None
+    assert normalize_date('not a date') is None
+
+def test_clean_csv_chunked_matches_in_memory(raw_advancement_file, tmp_path, monkeypatch):
+    in_memory_file = tmp_path / 'in_memory.csv'
+    chunked_file = tmp_path / 'chunked.csv'
+    clean_csv(raw_advancement_file, str(in_memory_file))
+
+    # Force an intermediate merge pass as well as the final one
+    monkeypatch.setattr('scout_tracking.clean_advancement.MERGE_FAN_IN', 2)
+    clean_csv(raw_advancement_file, str(chunked_file), chunksize=2)
+
+    assert chunked_file.read_text() == in_memory_file.read_text()
+
+def test_clean_csv_sorts_by_date_not_text(tmp_path):
+    input_file = tmp_path / 'backup.csv'
+    input_file.write_text('"First Name","Last Name","Advancement Type","Advancement","Date Completed"\n'
+                          '"Max","Francis","Rank","Scout","10/3/2023"\n'
+                          '"Max","Francis","Scout Rank Requirement","1a","9/30/2023"\n')
+    output_file = tmp_path / 'advancement.csv'
+    clean_csv(str(input_file), str(output_file))
+    chunked_file = tmp_path / 'chunked.csv'
+    clean_csv(str(input_file), str(chunked_file), chunksize=1)
+
+    with open(output_file, 'r') as file:
+        rows = list(csv.reader(file))
+    assert [row[2] for row in rows[1:]] == ['9/30/2023', '10/3/2023']
+    assert chunked_file.read_text() == output_file.read_text()
+
+# Test that the csv module engine writes the same file as pandas, in memory and in chunks
+@pytest.mark.parametrize('chunksize', [None, 2])
+def test_csv_engine_matches_pandas(raw_advancement_file, tmp_path, chunksize):
+    pytest.importorskip('pandas')
+    pandas_file = tmp_path / 'pandas.csv'
+    csv_file = tmp_path / 'csv.csv'
+    pandas_stats = clean_csv(raw_advancement_file, str(pandas_file), engine=ENGINE_PANDAS)
+    csv_stats = clean_csv(raw_advancement_file, str(csv_file), chunksize=chunksize, engine=ENGINE_CSV)
+
+    assert csv_stats == pandas_stats
+    assert csv_file.read_bytes() == pandas_file.read_bytes()
+
+def test_csv_engine_reports_missing_columns(tmp_path):
+    input_file = tmp_path / 'backup.csv'
+    input_file.write_text('"First Name","Last Name","Advancement"\n')
+    with pytest.raises(ValueError, match='Advancement Type, Date Completed'):
+        clean_csv(str(input_file), str(tmp_path / 'advancement.csv'), engine=ENGINE_CSV)
+
+# Test that unusual dates are kept alike by the pandas engine, the csv engine and --raw
+def test_unusual_dates_agree_across_paths(tmp_path):
+    pytest.importorskip('pandas')
+    dates = ['07/09/2024', '7/9/24', '2024-07-09', '2024-07-09 13:45:00', ' 7/9/2024 ', 'July 9, 2024', '2024/07/09',
+             '9 Jul 2024', 'Tue, Jul 9, 2024', 'not a date']
+    input_file = tmp_path / 'backup.csv'
+    with open(input_file, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['First Name', 'Last Name', 'Advancement Type', 'Advancement', 'Date Completed'])
+        for number, date_text in enumerate(dates):
+            writer.writerow(['Max', 'Francis', 'Scout Rank Requirement', f'{number}a', date_text])
+
+    pandas_file = tmp_path / 'pandas.csv'
+    csv_file = tmp_path / 'csv.csv'
+    pandas_stats = clean_csv(str(input_file), str(pandas_file), engine=ENGINE_PANDAS)
+    clean_csv(str(input_file), str(csv_file), engine=ENGINE_CSV)
+    with open(pandas_file, 'r') as file:
+        pandas_rows = list(csv.reader(file))[1:]
+    raw_rows = [row for chunk in read_raw_advancement_chunks(str(input_file)) for row in chunk]
+
+    # Only the row that is not a date at all is dropped
+    assert pandas_stats['rows_missing_date'] == 1
+    assert [row[2] for row in pandas_rows] == ['7/9/2024'] * 9
+    assert csv_file.read_bytes() == pandas_file.read_bytes()
+    assert sorted(raw_rows) == sorted(pandas_rows)
+
+def test_clean_csv_keeps_month_name_dates(tmp_path):
+    input_file = tmp_path / 'backup.csv'
+    input_file.write_text('"First Name","Last Name","Advancement Type","Advancement","Date Completed"\n'
+                          '"Max","Francis","Rank","Scout","July 9, 2024"\n'
+                          '"Max","Francis","Rank","Tenderfoot","August 1, 2024"\n')
+    output_file = tmp_path / 'advancement.csv'
+    stats = clean_csv(str(input_file), str(output_file))
+
+    assert stats['rows_missing_date'] == 0
+    with open(output_file, 'r') as file:
+        assert [row[2] for row in csv.reader(file)] == ['Date Completed', '7/9/2024', '8/1/2024']
@@ -0,0 +1,48 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+from scout_tracking import cli
+
+RAW_ADVANCEMENT_FILE = os.path.join(os.path.dirname(__file__), 'test_raw_advancement.csv')
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_cli_runs_subcommand(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['scout-tracking'])
+    output_file = tmp_path / 'advancement.csv'
+    cli.main(['clean', RAW_ADVANCEMENT_FILE, str(output_file), '--engine', 'csv'])
+    assert output_file.read_text().splitlines()[1] == 'Dylan Adams,Tenderfoot Rank Requirement 1a,1/2/2024'
+
+def test_cli_rejects_unknown_command(capsys):
+    with pytest.raises(SystemExit):
+        cli.main(['unknown'])
+    assert 'invalid choice' in capsys.readouterr().err
+
+# Test that the csv engine cleans a file without loading pandas or NumPy
+def test_clean_csv_engine_avoids_heavy_imports(tmp_path):
+    script = ("import sys, json\n"
+              "from scout_tracking.cli import main\n"
+              f"main(['clean', {RAW_ADVANCEMENT_FILE!r}, {str(tmp_path / 'advancement.csv')!r}, '--engine', 'csv'])\n"
+              "print(json.dumps([name for name in ('pandas', 'numpy') if name in sys.modules]))\n")
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True, cwd=REPO_DIR)
+    assert json.loads(result.stdout.splitlines()[-1]) == []
+
+# Test that the report command's help is shown without loading the modules only a run or its options need
+# Test that each command's --help returns without loading the modules only a run needs
+@pytest.mark.parametrize('command, heavy_modules', [
+    ('report', ('numpy', 'sqlite3', 'concurrent.futures', 'asyncio')),
+    ('batch', ('numpy', 'sqlite3', 'concurrent.futures', 'asyncio')),
+    ('store', ('numpy', 'concurrent.futures', 'asyncio')),
+    ('serve', ('numpy', 'sqlite3', 'concurrent.futures', 'asyncio')),
+])
+def test_help_avoids_heavy_imports(command, heavy_modules):
+    script = ("import sys, json\n"
+              "from scout_tracking.cli import main\n"
+              "try:\n"
+              f"    main([{command!r}, '--help'])\n"
+              "except SystemExit:\n"
+              "    pass\n"
+              f"print(json.dumps([name for name in {heavy_modules!r} if name in sys.modules]))\n")
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True, cwd=REPO_DIR)
+    assert json.loads(result.stdout.splitlines()[-1]) == []
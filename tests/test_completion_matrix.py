@@ -0,0 +1,63 @@
+import pytest
+from datetime import date
+from scout_tracking.completion_matrix import CompletionMatrix
+
+@pytest.fixture
+def patrol_structure():
+    return {
+        'paw': {
+            'max francis': {'advancements': ['Rank Scout']},
+            'truman bonlender': {'advancements': ['Scout Rank Requirement 1a']}
+        },
+        'purple people': {
+            'ivan alexander': {'advancements': ['Rank Scout', 'Scout Rank Requirement 1a']}
+        }
+    }
+
+@pytest.fixture
+def requirements():
+    return {'rank scout': 'Scout Rank', 'scout rank requirement 1a': 'Scout 1a'}
+
+def test_from_patrol_structure(patrol_structure, requirements):
+    matrix = CompletionMatrix.from_patrol_structure(patrol_structure, requirements)
+
+    assert matrix.completed.shape == (2, 3)
+    rows = matrix.requirement_rows(['rank scout', 'scout rank requirement 1a'])
+    columns = matrix.scout_columns(['ivan alexander', 'max francis', 'truman bonlender'])
+    assert matrix.completed[rows][:, columns].tolist() == [[True, True, False], [True, False, True]]
+
+def test_from_patrol_structure_selected_patrols(patrol_structure, requirements):
+    matrix = CompletionMatrix.from_patrol_structure(patrol_structure, requirements, patrol_names=['paw'])
+    assert matrix.scouts == ['max francis', 'truman bonlender']
+
+def test_mark_ignores_unknown_entries(requirements):
+    matrix = CompletionMatrix(['max francis'], requirements)
+    matrix.mark('max francis', 'rank scout')
+    matrix.mark('unknown scout', 'rank scout')
+    matrix.mark('max francis', 'unknown requirement')
+    assert matrix.completed.sum() == 1
+
+def test_mark_keeps_earliest_date(requirements):
+    matrix = CompletionMatrix(['max francis'], requirements)
+    matrix.mark('max francis', 'rank scout', date(2020, 5, 1).toordinal())
+    matrix.mark('max francis', 'rank scout', date(2019, 5, 1).toordinal())
+    matrix.mark('max francis', 'rank scout')
+    assert matrix.completed_on[0, 0] == date(2019, 5, 1).toordinal()
+
+def test_between(requirements):
+    matrix = CompletionMatrix(['max francis', 'ivan alexander'], requirements)
+    matrix.mark('max francis', 'rank scout', date(2019, 5, 1).toordinal())
+    matrix.mark('max francis', 'scout rank requirement 1a', date(2021, 5, 1).toordinal())
+    matrix.mark('ivan alexander', 'rank scout')
+
+    # Undated completions cannot be placed in time, so only the full matrix has them
+    assert matrix.as_of('1/1/2020').completed.tolist() == [[True, False], [False, False]]
+    assert matrix.as_of(date(2022, 1, 1)).completed.tolist() == [[True, False], [True, False]]
+    assert matrix.between(start='2020-01-01').completed.tolist() == [[False, False], [True, False]]
+    assert matrix.completed.sum() == 3
+
+    # The snapshot shares the scout and requirement IDs
+    assert matrix.as_of('1/1/2020').scout_columns(['ivan alexander']).tolist() == [1]
+
+    with pytest.raises(ValueError):
+        matrix.as_of('not a date')
@@ -0,0 +1,27 @@
+import pytest
+from datetime import date
+from scout_tracking.dates import NO_DATE, parse_date, date_ordinal, date_ordinals, format_date
+
+def test_parse_date():
+    assert parse_date('7/9/2024') == date(2024, 7, 9)
+    assert parse_date('2024-07-09') == date(2024, 7, 9)
+    assert parse_date(' 07/09/24 ') == date(2024, 7, 9)
+    assert parse_date('') is None
+    assert parse_date('not a date') is None
+
+def test_parse_date_accepts_other_forms():
+    assert parse_date('July 9, 2024') == date(2024, 7, 9)
+    assert parse_date('9-Jul-24') == date(2024, 7, 9)
+    assert parse_date('2024/07/09') == date(2024, 7, 9)
+    # Stray text is not read as a date, even where a free-form parser would find one
+    assert parse_date('1a') is None
+
+def test_date_ordinals():
+    ordinals = date_ordinals(['7/9/2024', '', '2024-07-09', '10/1/2023'])
+
+    assert ordinals.dtype == 'int32'
+    assert ordinals.tolist() == [date(2024, 7, 9).toordinal(), NO_DATE, date(2024, 7, 9).toordinal(), date(2023, 10, 1).toordinal()]
+    assert date_ordinals([]).tolist() == []
+
+def test_format_date_round_trip():
+    assert format_date(date_ordinal('07/09/2024')) == '7/9/2024'
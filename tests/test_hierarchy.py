@@ -0,0 +1,49 @@
+import numpy as np
+from scout_tracking.hierarchy import RequirementHierarchy, requirement_path
+from scout_tracking.catalog import RequirementCatalog
+
+REQUIREMENTS = [
+    ('rank scout', 'Scout Rank'),
+    ('scout rank requirement 1a', 'Scout 1a'),
+    ('scout rank requirement 1b', 'Scout 1b'),
+    ('scout rank requirement 2', 'Scout 2'),
+    ('rank tenderfoot', 'Tenderfoot Rank'),
+    ('tenderfoot rank requirement 1a', 'Tenderfoot 1a'),
+    ('camping merit badge', 'Camping MB'),
+]
+
+def test_requirement_path():
+    assert requirement_path('scout rank requirement 2b') == ('scout', '2', 'b')
+    assert requirement_path('second class rank requirement 10') == ('second class', '10', '')
+    assert requirement_path('rank first class') == ('first class',)
+    assert requirement_path('camping merit badge') is None
+
+def test_hierarchy_index():
+    catalog = RequirementCatalog(REQUIREMENTS)
+    hierarchy = catalog.hierarchy
+    assert hierarchy.ranks == ['scout', 'tenderfoot']
+    assert hierarchy.rank_ids.tolist() == [0, 0, 0, 0, 1, 1, -1]
+    assert hierarchy.award_rows.tolist() == [0, 4]
+    assert hierarchy.rank_sizes.tolist() == [4, 2]
+    assert hierarchy.rank_labels(catalog) == ['Scout Rank', 'Tenderfoot Rank']
+
+    # The index is built once and rebuilt only when a requirement is added
+    assert catalog.hierarchy is hierarchy
+    catalog.add('rank scout', 'Scout')
+    assert catalog.hierarchy is hierarchy
+    catalog.add('tenderfoot rank requirement 1b', 'Tenderfoot 1b')
+    assert catalog.hierarchy.rank_ids.tolist() == [0, 0, 0, 0, 1, 1, -1, 1]
+
+def test_rank_rollups():
+    hierarchy = RequirementHierarchy([name for name, _ in REQUIREMENTS])
+    # Scouts: none done, two Scout requirements, the Scout award (and nothing else), every row
+    completed = np.zeros((len(REQUIREMENTS), 4), dtype=bool)
+    completed[[1, 3], 1] = True
+    completed[0, 2] = True
+    completed[:, 3] = True
+
+    rollups = hierarchy.rank_rollups(completed)
+    assert rollups['done'].tolist() == [[0, 2, 4, 4], [0, 0, 0, 2]]
+    assert rollups['remaining'].tolist() == [[4, 2, 0, 0], [2, 2, 2, 0]]
+    assert rollups['percent'].tolist() == [[0, 50, 100, 100], [0, 0, 0, 100]]
+    assert rollups['next_rank'].tolist() == [0, 0, 1, -1]
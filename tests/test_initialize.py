@@ -1,7 +1,8 @@
 import pytest
 import os
 from scout_tracking.load_patrol_data import load_patrol_data
-from scout_tracking.initialize import initialize_patrol_structure
+from scout_tracking.initialize import initialize_patrol_structure, build_roster_index
+from scout_tracking.utility import get_scout_patrol
 
 # Fixture to load the patrol data from the test file
 @pytest.fixture
@@ -30,3 +31,29 @@ def test_initialize_patrol_structure(patrol_data):
     # Test if the advancements list is initialized as empty for each scout
     assert patrol_structure['purple people']['ivan alexander'] == {'advancements': []}  # Updated check
 
+
+def test_build_roster_index(patrol_data):
+    patrol_structure = initialize_patrol_structure(patrol_data)
+    roster_index = build_roster_index(patrol_structure)
+
+    # Each scout maps to their patrol and the record held in the patrol structure
+    patrol_name, record = roster_index['max francis']
+    assert patrol_name == 'paw'
+    assert record is patrol_structure['paw']['max francis']
+    assert 'nonexistent scout' not in roster_index
+
+    # Patrol lookups use the index when one is passed in, and search the patrols otherwise
+    assert get_scout_patrol('max francis', patrol_structure, roster_index) == 'paw'
+    assert get_scout_patrol('max francis', patrol_structure) == 'paw'
+    assert get_scout_patrol('nonexistent scout', patrol_structure, roster_index) is None
+    assert get_scout_patrol('nonexistent scout', patrol_structure) is None
+
+def test_build_roster_index_duplicate_scout():
+    patrol_structure = {
+        'paw': {'max francis': {'advancements': []}},
+        'rrd': {'max francis': {'advancements': []}}
+    }
+    with pytest.raises(ValueError, match="max francis"):
+        build_roster_index(patrol_structure)
+    # Without an index, a lookup still finds the first patrol the scout is in
+    assert get_scout_patrol('max francis', patrol_structure) == 'paw'
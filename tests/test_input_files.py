@@ -0,0 +1,96 @@
+import os
+import bz2
+import gzip
+import lzma
+import pytest
+from scout_tracking.input_files import open_input, input_compression, detect_encoding, zstandard_available, COMPRESSION_GZIP, COMPRESSION_BZ2, COMPRESSION_XZ
+from scout_tracking.load_requirements import load_requirements
+from scout_tracking.load_patrol_data import load_patrol_data
+from scout_tracking.clean_advancement import clean_csv, ENGINE_CSV
+from scout_tracking.checkpoint import load_advancements_checkpointed
+
+TEST_DIR = os.path.dirname(__file__)
+ADVANCEMENTS = "Name,Advancement Info,Date Completed\nMax Francis,rank scout,11/15/2018\n"
+
+@pytest.mark.parametrize('compress, compression', [(gzip.compress, COMPRESSION_GZIP), (bz2.compress, COMPRESSION_BZ2),
+                                                   (lzma.compress, COMPRESSION_XZ)])
+def test_compressed_input_found_by_magic_bytes(tmp_path, compress, compression):
+    # The file name does not say it is compressed, so the leading bytes have to
+    path = tmp_path / 'advancement.csv'
+    path.write_bytes(compress(ADVANCEMENTS.encode('utf-8')))
+    assert input_compression(str(path)) == compression
+    with open_input(str(path)) as file:
+        assert file.read() == ADVANCEMENTS
+
+def test_encoding_detection(tmp_path):
+    assert detect_encoding(b'\xef\xbb\xbfNam') == 'utf-8-sig'
+    assert detect_encoding(b'\xff\xfeN\x00') == 'utf-16'
+    assert detect_encoding(b'N\x00a\x00') == 'utf-16-le'
+    assert detect_encoding(b'Name') == 'utf-8'
+
+    # An Excel export with a byte order mark loads without it ending up in the header
+    path = tmp_path / 'requirements.tsv'
+    path.write_text("Requirement\tAlt Text\nrank scout\tScout Rank\n", encoding='utf-8-sig')
+    assert load_requirements(str(path)) == {'rank scout': 'Scout Rank'}
+    path.write_text("Requirement\tAlt Text\nrank scout\tScout Rank\n", encoding='utf-16')
+    assert load_requirements(str(path)) == {'rank scout': 'Scout Rank'}
+
+def test_windows_1252_input(tmp_path):
+    assert detect_encoding('Jos\xe9 Ruiz'.encode('cp1252')) == 'cp1252'
+    # A sample cut part way through a UTF-8 character is still UTF-8
+    assert detect_encoding('Jos\xe9'.encode('utf-8')[:-1]) == 'utf-8'
+
+    # An Excel export saved as Windows-1252 loads, whether or not its first bytes give that away
+    path = tmp_path / 'patrols.tsv'
+    path.write_bytes('Scout Name\tPatrol\nJos\xe9 Ruiz\tPaw\n'.encode('cp1252'))
+    assert load_patrol_data(str(path)) == {'jos\xe9 ruiz': 'paw'}
+    path.write_bytes(('Scout Name\tPatrol\n' + 'Max Francis\tPaw\n' * 10000 + 'Jos\xe9 Ruiz\tPaw\n').encode('cp1252'))
+    assert load_patrol_data(str(path))['jos\xe9 ruiz'] == 'paw'
+
+def test_loaders_read_compressed_files(tmp_path):
+    patrol_file = tmp_path / 'patrols.tsv.gz'
+    patrol_file.write_bytes(gzip.compress(b"Scout Name\tPatrol\nMax Francis\tPaw\n"))
+    assert load_patrol_data(str(patrol_file)) == {'max francis': 'paw'}
+
+    raw_file = tmp_path / 'backup.csv.xz'
+    with open(os.path.join(TEST_DIR, 'test_raw_advancement.csv'), 'rb') as file:
+        raw_file.write_bytes(lzma.compress(file.read()))
+    clean_csv(str(raw_file), str(tmp_path / 'compressed.csv'), engine=ENGINE_CSV)
+    clean_csv(os.path.join(TEST_DIR, 'test_raw_advancement.csv'), str(tmp_path / 'plain.csv'), engine=ENGINE_CSV)
+    assert (tmp_path / 'compressed.csv').read_bytes() == (tmp_path / 'plain.csv').read_bytes()
+
+def test_checkpoint_resumes_appended_gzip_member(tmp_path, capsys):
+    requirements = {'rank scout': 'Scout Rank', 'scout rank requirement 1a': 'Scout 1a'}
+    def structure():
+        return {'paw': {'max francis': {'advancements': []}, 'ivan alexander': {'advancements': []}}}
+    advancement_file = tmp_path / 'advancement.csv.gz'
+    advancement_file.write_bytes(gzip.compress(ADVANCEMENTS.encode('utf-8')))
+    checkpoint_file = str(tmp_path / 'advancement.checkpoint')
+    load_advancements_checkpointed(str(advancement_file), checkpoint_file, structure(), requirements)
+    assert "No usable checkpoint" in capsys.readouterr().out
+
+    # Appending a gzip member adds rows to the decompressed file
+    with open(advancement_file, 'ab') as file:
+        file.write(gzip.compress(b"Ivan Alexander,scout rank requirement 1a,4/30/2019\n"))
+    loaded, _, _ = load_advancements_checkpointed(str(advancement_file), checkpoint_file, structure(), requirements)
+    assert "No usable checkpoint" not in capsys.readouterr().out
+    assert loaded['paw']['max francis']['advancements'] == ['rank scout']
+    assert loaded['paw']['ivan alexander']['advancements'] == ['scout rank requirement 1a']
+
+@pytest.mark.skipif(not zstandard_available(), reason='zstandard is not installed')
+def test_multi_frame_zstd(tmp_path):
+    import zstandard
+    # Concatenated frames, as written by pzstd or by appending archives, are all read
+    compressor = zstandard.ZstdCompressor()
+    path = tmp_path / 'advancement.csv.zst'
+    path.write_bytes(compressor.compress(ADVANCEMENTS.encode('utf-8')) +
+                     compressor.compress(b"Ivan Alexander,rank scout,4/30/2019\n"))
+    with open_input(str(path)) as file:
+        assert file.read() == ADVANCEMENTS + "Ivan Alexander,rank scout,4/30/2019\n"
+
+@pytest.mark.skipif(zstandard_available(), reason='zstandard is installed')
+def test_zstd_needs_zstandard(tmp_path):
+    path = tmp_path / 'advancement.csv.zst'
+    path.write_bytes(b'\x28\xb5\x2f\xfd' + bytes(8))
+    with pytest.raises(ValueError, match='zstandard'):
+        open_input(str(path))
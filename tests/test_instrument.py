@@ -0,0 +1,26 @@
+import pytest
+import os
+from scout_tracking.instrument import Instrumentation
+
+def test_stage_records(tmp_path):
+    instrumentation = Instrumentation(track_memory=True, profile_dir=str(tmp_path / 'profile'))
+
+    with instrumentation.stage('outer') as stage:
+        stage['rows'] = 1000
+        data = [str(i) for i in range(1000)]
+        with instrumentation.stage('inner'):
+            pass
+    instrumentation.close()
+
+    inner, outer = instrumentation.stages
+    assert outer['name'] == 'outer' and outer['rows'] == 1000
+    assert outer['seconds'] >= inner['seconds']
+    assert outer['peak_bytes'] > 0
+
+    # Nested stages are timed but not profiled or memory tracked separately
+    assert inner['peak_bytes'] is None
+    assert os.listdir(tmp_path / 'profile') == ['outer.pstats']
+
+    lines = instrumentation.summary_lines()
+    assert len(lines) == 3
+    assert lines[2].startswith('outer')
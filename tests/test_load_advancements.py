@@ -57,3 +57,30 @@ def test_load_advancements(patrol_structure, requirements_data, advancement_file
     assert 'scout rank requirement 3a' in additional_requirements
     assert len(additional_requirements) == 1  # Ensure only unique requirements are added
 
+
+def test_load_advancements_counts_unmatched_scouts(patrol_structure, requirements_data, advancement_file):
+    with open(advancement_file, 'a') as f:
+        f.write("Unknown Scout,scout rank requirement 2a,5/23/2021\n")
+
+    # Use a tiny chunk size so the rows are folded across several chunks
+    _, additional_scouts, _ = load_advancements(advancement_file, patrol_structure, [req['requirement'] for req in requirements_data], chunk_size=1)
+
+    # Unmatched scouts are counted once per name rather than listed once per row
+    assert additional_scouts == {'unknown scout': 2}
+
+# Test that a requirement recorded on many rows is listed once, with or without a completion matrix
+@pytest.mark.parametrize('with_matrix', [False, True])
+def test_repeated_rows_listed_once(patrol_structure, requirements_data, advancement_file, with_matrix):
+    from scout_tracking.completion_matrix import CompletionMatrix
+    from scout_tracking.catalog import as_catalog
+
+    with open(advancement_file, 'a') as f:
+        f.write("Ivan Alexander,rank scout,11/16/2018\n" * 5)
+    requirements = [req['requirement'] for req in requirements_data]
+    completion_matrix = CompletionMatrix.from_patrol_structure(patrol_structure, as_catalog(requirements)) if with_matrix else None
+
+    # Load twice, across several chunks, as a resumed or reloaded run does
+    for _ in range(2):
+        updated_structure, _, _ = load_advancements(advancement_file, patrol_structure, requirements,
+                                                    completion_matrix=completion_matrix, chunk_size=2)
+    assert updated_structure['purple people']['ivan alexander']['advancements'] == ['rank scout']
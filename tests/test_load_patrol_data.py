@@ -10,3 +10,10 @@ def test_load_patrol_data(patrol_data_file):
     patrol_data = load_patrol_data(patrol_data_file)
     assert patrol_data['ivan alexander'] == 'purple people'
     assert patrol_data['max francis'] == 'paw'
+
+def test_load_patrol_data_duplicate_scout(tmp_path, capsys):
+    patrol_file = tmp_path / 'patrols.tsv'
+    patrol_file.write_text("Scout Name\tPatrol\nMax Francis\tPaw\nMax Francis\tRRD\n")
+    patrol_data = load_patrol_data(str(patrol_file))
+    assert patrol_data['max francis'] == 'rrd'
+    assert "Warning: Scout 'max francis'" in capsys.readouterr().out
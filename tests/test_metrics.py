@@ -0,0 +1,25 @@
+import pytest
+import json
+import time
+from scout_tracking.metrics import write_run_metrics
+
+def test_write_run_metrics(tmp_path):
+    stages = [{'name': 'load_advancements', 'seconds': 0.5, 'rows': 1000, 'peak_bytes': None}]
+    json_path, prom_path = write_run_metrics(str(tmp_path), 'main', time.time(),
+                                             inputs={'advancement': 2048},
+                                             counts={'rows_read': 1000, 'additional_scouts': 3},
+                                             stages=stages, outputs={'reports_written': 4})
+
+    with open(json_path, 'r') as file:
+        metrics = json.load(file)
+    assert metrics['job'] == 'main'
+    assert metrics['counts'] == {'rows_read': 1000, 'additional_scouts': 3}
+    assert metrics['stages'][0]['rows'] == 1000
+
+    with open(prom_path, 'r') as file:
+        prom = file.read()
+    assert '# TYPE scout_tracking_rows gauge' in prom
+    assert 'scout_tracking_rows{job="main",kind="additional_scouts"} 3' in prom
+    assert 'scout_tracking_stage_seconds{job="main",stage="load_advancements"} 0.5' in prom
+    assert 'scout_tracking_input_bytes{job="main",input="advancement"} 2048' in prom
+    assert 'scout_tracking_outputs{job="main",kind="reports_written"} 4' in prom
@@ -0,0 +1,103 @@
+import pytest
+import csv
+from collections import Counter
+from scout_tracking.reconcile import ScoutNameMatcher, scout_name_key, scout_name_parts, suggest_scout_matches, reconcile_scouts
+from scout_tracking.reconcile import RequirementMatcher, requirement_key, suggest_requirement_matches
+from scout_tracking.reconcile import write_requirement_aliases, load_requirement_aliases
+from scout_tracking.catalog import RequirementCatalog, UNKNOWN_REQUIREMENT
+from scout_tracking.load_advancements import fold_advancement_chunks
+
+@pytest.fixture
+def roster():
+    return ['ivan alexander', 'zachary wesner', 'max francis', 'truman bonlender', 'john doe', 'jon doe']
+
+def test_scout_name_key():
+    assert scout_name_key('Doe, Bob Q. Jr.') == scout_name_key('Robert Doe')
+    assert scout_name_key('Alexander Ivan') == scout_name_key('ivan alexander')
+    assert scout_name_key('Zach Wesner') == 'wesner zachary'
+
+def test_scout_name_parts():
+    assert scout_name_parts('Doe, Bob Q. Jr.') == ('bob', 'doe')
+    assert scout_name_parts('Ivan A. Alexander') == ('ivan', 'alexander')
+    assert scout_name_parts('Alexander') == ('', 'alexander')
+
+def test_candidates(roster):
+    matcher = ScoutNameMatcher(roster)
+
+    assert matcher.candidates('alexander, ivan') == [('ivan alexander', 1.0)]
+    assert matcher.candidates('trumen bonlender')[0][0] == 'truman bonlender'
+    assert matcher.candidates('somebody else') == []
+
+def test_resolve_needs_a_single_confident_match(roster):
+    matcher = ScoutNameMatcher(roster)
+
+    assert matcher.resolve('zach wesner') == 'zachary wesner'
+    assert matcher.resolve('max francis jr') == 'max francis'
+    # 'Jon' is a nickname for 'Jonathan'; 'Johnathon Doe' is not close enough to either Doe to be applied
+    assert matcher.resolve('jonathan doe') == 'jon doe'
+    assert matcher.resolve('johnathon doe') is None
+
+def test_resolve_needs_the_same_surname():
+    matcher = ScoutNameMatcher(['alex adams', 'adam adams', 'ivan alexander'])
+
+    # 'Alex' is a nickname for 'Alexander', but Alexander is this scout's surname, not a given name
+    assert matcher.resolve('adam alexander') is None
+    assert 'alex adams' not in dict(matcher.candidates('adam alexander'))
+    # Written surname first, the name is still matched word for word
+    assert matcher.resolve('alexander ivan') == 'ivan alexander'
+    assert matcher.resolve('adams, alexander') == 'alex adams'
+
+def test_suggest_scout_matches(roster):
+    matcher = ScoutNameMatcher(roster)
+    suggestions = suggest_scout_matches(Counter({'zach wesner': 2, 'trumen bonlender': 5}), matcher, limit=1)
+    assert [(name, rows, roster_name) for name, rows, roster_name, _ in suggestions] == [
+        ('trumen bonlender', 5, 'truman bonlender'),
+        ('zach wesner', 2, 'zachary wesner'),
+    ]
+
+def test_fold_applies_matches_and_reports_them(roster, tmp_path):
+    patrol_structure = {'paw': {name: {'advancements': []} for name in roster}}
+    chunks = [[['Zach Wesner', 'rank scout', '1/2/2021'], ['Zach Wesner', 'rank scout', '1/3/2021'],
+               ['Somebody Else', 'rank scout', '1/2/2021']]]
+    stats = {}
+    structure, additional_scouts, _ = fold_advancement_chunks(chunks, patrol_structure, {'rank scout': 'Scout Rank'},
+                                                              stats=stats, scout_matcher=ScoutNameMatcher(roster))
+
+    assert structure['paw']['zachary wesner'] == {'advancements': ['rank scout'], 'aliases': {'zach wesner': 2}}
+    assert additional_scouts == {'somebody else': 1}
+    assert stats['rows_reconciled_scout'] == 2
+
+    reconcile_scouts(structure, additional_scouts, str(tmp_path))
+    with open(tmp_path / 'scout_matches.tsv', 'r') as file:
+        rows = list(csv.reader(file, delimiter='\t'))
+    assert rows[0] == ['Scoutbook Name', 'Rows', 'Roster Name', 'Score', 'Applied']
+    assert rows[1] == ['zach wesner', '2', 'zachary wesner', '1.0', 'yes']
+
+def test_requirement_key():
+    assert requirement_key('Scout Rank Req. #2 B') == (('2b',), 'scout rank')
+    assert requirement_key('Scout Rank Requirement 2b (2016 version)') == requirement_key('scout rank requirement 2b')
+
+def test_requirement_matcher_keeps_numbers_apart():
+    matcher = RequirementMatcher(['scout rank requirement 2a', 'scout rank requirement 2b', 'tenderfoot rank requirement 2b'])
+
+    assert matcher.candidates('Scout Rank Req. 2B') == [('scout rank requirement 2b', 1.0)]
+    assert matcher.resolve('Tenderfot Rank Requirement 2b') == 'tenderfoot rank requirement 2b'
+    assert matcher.candidates('Scout Rank Requirement 2c') == []
+
+def test_requirement_alias_table_round_trip(tmp_path):
+    catalog = RequirementCatalog([('scout rank requirement 1b', 'Scout 1b'), ('scout rank requirement 4b', 'Scout 4b')])
+    matches = suggest_requirement_matches(['Scout Rank Req. 1B', 'Scoot Rank Requirement 4b', 'Camping'], catalog)
+    assert matches == [('Scoot Rank Requirement 4b', 'scout rank requirement 4b', 0.727),
+                       ('Scout Rank Req. 1B', 'scout rank requirement 1b', 1.0)]
+
+    aliases_file = write_requirement_aliases(str(tmp_path), matches)
+    with open(aliases_file, 'a') as file:
+        file.write("Scout Spirit\tscout rank requirement 1b\t\n")  # Added by hand, so it has no score
+        file.write("Camping\tcamping merit badge\t\n")
+
+    # Only the confident match and the hand-added alias are used
+    assert load_requirement_aliases(aliases_file, catalog) == 2
+    assert catalog.id_of('scout rank req. 1b') == 0
+    assert catalog.id_of('Scout Spirit') == 0
+    assert catalog.id_of('Scoot Rank Requirement 4b') == UNKNOWN_REQUIREMENT
+    assert list(catalog) == ['scout rank requirement 1b', 'scout rank requirement 4b']
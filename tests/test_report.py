@@ -2,8 +2,10 @@ import pytest
 import os
 import csv
 import shutil
+import json
 from scout_tracking.report import generate_patrol_report_csv
 from scout_tracking.load_requirements import load_requirements
+from scout_tracking.trace import TRACE_SUMMARY, TRACE_FULL
 
 # Define a pytest fixture to set up the test data
 @pytest.fixture
@@ -82,6 +84,10 @@ def test_generate_reports_for_all_patrols(setup_data):
 # Test the generation of reports for a specific patrol ('purple people' only)
 def test_generate_reports_for_specific_patrol(setup_data):
     patrol_structure, requirements, output_dir = setup_data
+    # Start from an empty directory, as reports left by earlier runs for patrols still in the structure are kept
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+
     # Generate reports for the 'purple people' patrol only
     generate_patrol_report_csv(patrol_structure, requirements, output_dir, patrol_names=['purple people'])
 
@@ -137,3 +143,118 @@ def test_create_output_directory(setup_data):
     if os.path.exists(output_dir):
         shutil.rmtree(output_dir)
 
+
+# Test that writing reports in parallel gives the same files as writing them one at a time
+def test_generate_reports_in_parallel(setup_data, tmp_path):
+    patrol_structure, requirements, _ = setup_data
+    serial_dir = tmp_path / 'serial'
+    parallel_dir = tmp_path / 'parallel'
+
+    generate_patrol_report_csv(patrol_structure, requirements, str(serial_dir), trace_level=TRACE_SUMMARY)
+    generate_patrol_report_csv(patrol_structure, requirements, str(parallel_dir), jobs=2, trace_level=TRACE_SUMMARY)
+
+    for report in ['paw_report.csv', 'purple_people_report.csv']:
+        assert (parallel_dir / report).read_text() == (serial_dir / report).read_text()
+
+    # Debug log records come out in patrol order either way
+    def patrol_records(output_dir):
+        with open(output_dir / 'debug_log.jsonl', 'r') as file:
+            return [json.loads(line)['patrol'] for line in file if json.loads(line)['event'] == 'patrol_report']
+    assert patrol_records(parallel_dir) == patrol_records(serial_dir) == ['paw', 'purple people']
+
+# Test that the debug log is only written when tracing is enabled
+def test_debug_log_levels(setup_data, tmp_path):
+    patrol_structure, requirements, _ = setup_data
+
+    generate_patrol_report_csv(patrol_structure, requirements, str(tmp_path / 'off'))
+    assert not (tmp_path / 'off' / 'debug_log.jsonl').exists()
+
+    generate_patrol_report_csv(patrol_structure, requirements, str(tmp_path / 'summary'), trace_level=TRACE_SUMMARY)
+    with open(tmp_path / 'summary' / 'debug_log.jsonl', 'r') as file:
+        records = [json.loads(line) for line in file]
+    paw_record = next(record for record in records if record.get('patrol') == 'paw')
+    assert paw_record['scouts'] == 2
+    assert paw_record['completions'] == 2
+    assert 'advancements' not in paw_record
+    assert not any(record['event'] == 'patrol_structure' for record in records)
+
+    generate_patrol_report_csv(patrol_structure, requirements, str(tmp_path / 'full'), trace_level=TRACE_FULL)
+    with open(tmp_path / 'full' / 'debug_log.jsonl', 'r') as file:
+        records = [json.loads(line) for line in file]
+    assert any(record['event'] == 'patrol_structure' for record in records)
+
+# Test that rerunning on unchanged data leaves reports untouched and rewrites only changed ones
+def test_reports_written_incrementally(setup_data, tmp_path):
+    patrol_structure, requirements, _ = setup_data
+    output_dir = str(tmp_path)
+    generate_patrol_report_csv(patrol_structure, requirements, output_dir)
+    paw_report = tmp_path / 'paw_report.csv'
+    purple_report = tmp_path / 'purple_people_report.csv'
+    os.utime(paw_report, ns=(0, 0))
+    os.utime(purple_report, ns=(0, 0))
+
+    stats = {}
+    report_files = generate_patrol_report_csv(patrol_structure, requirements, output_dir, stats=stats)
+    assert sorted(report_files) == sorted([str(paw_report), str(purple_report)])
+    assert stats == {'reports_written': 0, 'reports_unchanged': 2}
+    assert paw_report.stat().st_mtime_ns == 0
+    assert purple_report.stat().st_mtime_ns == 0
+
+    patrol_structure['paw']['max francis']['advancements'].append('Scout Rank Requirement 2a')
+    stats = {}
+    generate_patrol_report_csv(patrol_structure, requirements, output_dir, stats=stats)
+    assert stats == {'reports_written': 1, 'reports_unchanged': 1}
+    assert paw_report.stat().st_mtime_ns != 0
+    assert purple_report.stat().st_mtime_ns == 0
+    with open(tmp_path / '.report_manifest.json', 'r') as file:
+        assert sorted(json.load(file)['reports']) == ['paw_report.csv', 'purple_people_report.csv']
+
+# Test that a report edited by hand is rewritten even though the manifest is unchanged
+def test_edited_report_is_rewritten(setup_data, tmp_path):
+    patrol_structure, requirements, _ = setup_data
+    generate_patrol_report_csv(patrol_structure, requirements, str(tmp_path))
+    expected = (tmp_path / 'paw_report.csv').read_text()
+    (tmp_path / 'paw_report.csv').write_text('edited\n')
+
+    generate_patrol_report_csv(patrol_structure, requirements, str(tmp_path))
+    assert (tmp_path / 'paw_report.csv').read_text() == expected
+
+# Test that only reports for patrols that no longer exist are removed
+def test_stale_reports_removed(setup_data, tmp_path):
+    patrol_structure, requirements, _ = setup_data
+    (tmp_path / 'notes.csv').write_text('kept\n')
+    generate_patrol_report_csv(patrol_structure, requirements, str(tmp_path))
+
+    del patrol_structure['paw']
+    generate_patrol_report_csv(patrol_structure, requirements, str(tmp_path))
+    assert not (tmp_path / 'paw_report.csv').exists()
+    assert (tmp_path / 'purple_people_report.csv').exists()
+    assert (tmp_path / 'notes.csv').exists()
+    with open(tmp_path / '.report_manifest.json', 'r') as file:
+        assert list(json.load(file)['reports']) == ['purple_people_report.csv']
+
+# Test that a run for some patrols keeps the reports of the others
+def test_patrol_subset_keeps_other_reports(setup_data, tmp_path):
+    patrol_structure, requirements, _ = setup_data
+    generate_patrol_report_csv(patrol_structure, requirements, str(tmp_path))
+    purple_people_report = (tmp_path / 'purple_people_report.csv').read_bytes()
+
+    generate_patrol_report_csv(patrol_structure, requirements, str(tmp_path), patrol_names=['paw'])
+    assert (tmp_path / 'paw_report.csv').exists()
+    assert (tmp_path / 'purple_people_report.csv').read_bytes() == purple_people_report
+    with open(tmp_path / '.report_manifest.json', 'r') as file:
+        assert sorted(json.load(file)['reports']) == ['paw_report.csv', 'purple_people_report.csv']
+
+# Test the rank rollup rows added after the requirements
+def test_rollup_rows(setup_data, tmp_path):
+    patrol_structure, requirements, _ = setup_data
+    generate_patrol_report_csv(patrol_structure, requirements, str(tmp_path), rollups=True)
+
+    with open(tmp_path / 'paw_report.csv', 'r') as file:
+        rows = list(csv.reader(file))
+    assert len(rows) == 1 + len(requirements) + 3
+    assert rows[-3:] == [
+        ['Scout Rank % Complete', '100%', '11%'],
+        ['Scout Rank Remaining', '0', '8'],
+        ['Next Rank', '', 'Scout Rank'],
+    ]
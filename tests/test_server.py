@@ -0,0 +1,78 @@
+import json
+import gzip
+import asyncio
+from scout_tracking.watch import TroopState, ADVANCEMENT_INPUT
+from scout_tracking.server import ReportServer
+from scout_tracking.report import generate_patrol_report_csv
+
+async def fetch(port, path, headers=''):
+    # One GET request on its own connection, returning the status, headers and body
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n{headers}\r\n".encode('latin-1'))
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    response_headers = dict(line.split(': ', 1) for line in lines[1:])
+    return int(lines[0].split()[1]), response_headers, body
+
+def test_server_serves_reports(troop_files):
+    patrol_file, requirements_file, advancement_file, output_dir = troop_files
+    state = TroopState(str(patrol_file), str(requirements_file), str(advancement_file), None)
+    server = ReportServer(state, port=0, interval=3600)
+
+    async def scenario():
+        await server.start()
+        try:
+            status, headers, body = await fetch(server.port, '/patrols')
+            assert status == 200
+            assert [patrol['patrol'] for patrol in json.loads(body)] == ['paw', 'purple people']
+
+            # The CSV is the same as the report file
+            status, headers, body = await fetch(server.port, '/patrols/Purple%20People.csv')
+            assert status == 200
+            generate_patrol_report_csv(state.patrol_structure, state.requirements, str(output_dir))
+            assert body == (output_dir / 'purple_people_report.csv').read_bytes()
+
+            # Many concurrent requests are answered from the cache, and an ETag match gets 304
+            responses = await asyncio.gather(*[fetch(server.port, '/patrols/paw.json') for _ in range(50)])
+            assert {response[2] for response in responses} == {responses[0][2]}
+            assert json.loads(responses[0][2])['requirements'][0] == {'requirement': 'Scout Rank', 'completed': [True]}
+            status, _, body = await fetch(server.port, '/patrols/paw.json', f"If-None-Match: {responses[0][1]['ETag']}\r\n")
+            assert status == 304 and body == b''
+
+            status, _, body = await fetch(server.port, '/scouts/max_francis.json')
+            assert json.loads(body)['requirements'][0] == {'requirement': 'Scout Rank', 'completed': True, 'date': '11/15/2018'}
+            assert (await fetch(server.port, '/patrols/lions.csv'))[0] == 404
+
+            # A changed input is reloaded and the cached responses are dropped
+            with open(advancement_file, 'a') as file:
+                file.write("Ivan Alexander,scout rank requirement 1a,4/30/2019\n")
+            await server.reload({ADVANCEMENT_INPUT})
+            status, _, body = await fetch(server.port, '/scouts/ivan_alexander.csv')
+            assert body.decode('utf-8').splitlines()[2] == 'Scout 1a,X,4/30/2019'
+        finally:
+            await server.close()
+
+    asyncio.run(scenario())
+
+def test_server_keeps_serving_after_bad_input(troop_files, capsys):
+    patrol_file, requirements_file, advancement_file, _ = troop_files
+    state = TroopState(str(patrol_file), str(requirements_file), str(advancement_file), None)
+    server = ReportServer(state, port=0, interval=3600)
+
+    async def scenario():
+        await server.start()
+        try:
+            before = await fetch(server.port, '/patrols/paw.csv')
+            # A half-copied gzip export fails to load, and the previous reports are still served
+            advancement_file.write_bytes(gzip.compress(advancement_file.read_bytes())[:-10])
+            await server.reload({ADVANCEMENT_INPUT})
+            assert "Error reloading advancement: EOFError" in capsys.readouterr().out
+            assert await fetch(server.port, '/patrols/paw.csv') == before
+            assert not server.watch_task.done()
+        finally:
+            await server.close()
+
+    asyncio.run(scenario())
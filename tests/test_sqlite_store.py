@@ -0,0 +1,65 @@
+import pytest
+import os
+import csv
+from scout_tracking.sqlite_store import open_store, save_patrol_structure, load_requirements_from_store, SQLitePatrolStructure
+from scout_tracking.report import generate_patrol_report_csv
+
+@pytest.fixture
+def patrol_structure():
+    return {
+        'paw': {
+            'max francis': {'advancements': ['rank scout']},
+            'truman bonlender': {'advancements': ['scout rank requirement 1a']}
+        },
+        'purple people': {
+            'ivan alexander': {'advancements': ['rank scout', 'scout rank requirement 1a']}
+        }
+    }
+
+@pytest.fixture
+def requirements():
+    return {'rank scout': 'Scout Rank', 'scout rank requirement 1a': 'Scout 1a'}
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = open_store(str(tmp_path / 'scouts.db'))
+    yield conn
+    conn.close()
+
+def test_round_trip(conn, patrol_structure, requirements):
+    save_patrol_structure(conn, patrol_structure, requirements, troop='100')
+
+    stored = SQLitePatrolStructure(conn, troop='100')
+    assert list(stored) == ['paw', 'purple people']
+    assert 'paw' in stored and 'lions' not in stored
+    assert stored['paw']['max francis'] == {'advancements': ['rank scout']}
+    assert sorted(stored['purple people']['ivan alexander']['advancements']) == ['rank scout', 'scout rank requirement 1a']
+    assert load_requirements_from_store(conn, troop='100') == requirements
+
+    # Other troops are kept separate
+    assert len(SQLitePatrolStructure(conn, troop='200')) == 0
+
+def test_save_replaces_troop(conn, patrol_structure, requirements):
+    save_patrol_structure(conn, patrol_structure, requirements, troop='100')
+    save_patrol_structure(conn, {'paw': {'max francis': {'advancements': []}}}, requirements, troop='100')
+
+    stored = SQLitePatrolStructure(conn, troop='100')
+    assert dict(stored) == {'paw': {'max francis': {'advancements': []}}}
+
+def test_troops_keep_their_own_catalogs(conn, patrol_structure, requirements):
+    other_requirements = {'scout rank requirement 1a': 'Oath and Law', 'camping merit badge': 'Camping', 'rank scout': 'Scout'}
+    save_patrol_structure(conn, patrol_structure, requirements, troop='100')
+    save_patrol_structure(conn, patrol_structure, other_requirements, troop='200')
+
+    # Saving one troop's catalog leaves the order and alt text of the other's as they were
+    assert list(load_requirements_from_store(conn, troop='100').items()) == list(requirements.items())
+    assert list(load_requirements_from_store(conn, troop='200').items()) == list(other_requirements.items())
+
+def test_report_from_store(conn, patrol_structure, requirements, tmp_path):
+    save_patrol_structure(conn, patrol_structure, requirements)
+    output_dir = str(tmp_path / 'reports')
+    generate_patrol_report_csv(SQLitePatrolStructure(conn), load_requirements_from_store(conn), output_dir, patrol_names=['paw'])
+
+    with open(os.path.join(output_dir, 'paw_report.csv'), 'r') as file:
+        rows = list(csv.reader(file))
+    assert rows == [['Requirement', 'max francis', 'truman bonlender'], ['Scout Rank', 'X', ''], ['Scout 1a', '', 'X']]
@@ -0,0 +1,75 @@
+import pytest
+import csv
+from datetime import date
+from scout_tracking.completion_matrix import CompletionMatrix
+from scout_tracking.velocity import requirement_ranks, compute_velocity, generate_velocity_reports
+
+@pytest.fixture
+def requirements():
+    return {
+        'rank scout': 'Scout Rank',
+        'scout rank requirement 1a': 'Scout 1a',
+        'scout rank requirement 1b': 'Scout 1b',
+        'tenderfoot rank requirement 1a': 'Tenderfoot 1a',
+        'rank tenderfoot': 'Tenderfoot Rank',
+        'camping merit badge': 'Camping',
+    }
+
+@pytest.fixture
+def patrol_structure():
+    return {
+        'paw': {'max francis': {'advancements': []}, 'truman bonlender': {'advancements': []}},
+        'purple people': {'ivan alexander': {'advancements': []}},
+    }
+
+@pytest.fixture
+def completion_matrix(patrol_structure, requirements):
+    matrix = CompletionMatrix(['max francis', 'truman bonlender', 'ivan alexander'], requirements)
+    matrix.mark('max francis', 'scout rank requirement 1a', date(2024, 5, 10).toordinal())
+    matrix.mark('max francis', 'scout rank requirement 1b', date(2024, 6, 20).toordinal())
+    matrix.mark('ivan alexander', 'rank scout', date(2023, 1, 5).toordinal())
+    matrix.mark('ivan alexander', 'tenderfoot rank requirement 1a', date(2024, 6, 1).toordinal())
+    return matrix
+
+def test_requirement_ranks(requirements):
+    ranks, requirement_rank_ids, award_rows = requirement_ranks(requirements)
+
+    assert ranks == ['scout', 'tenderfoot']
+    assert requirement_rank_ids.tolist() == [0, 0, 0, 1, 1, -1]
+    assert award_rows.tolist() == [0, 4]
+
+def test_compute_velocity(requirements, completion_matrix):
+    velocity = compute_velocity(completion_matrix, requirements, date(2024, 6, 30), months=3, window_days=60)
+
+    assert velocity['month_labels'] == ['2024-04', '2024-05', '2024-06']
+    assert velocity['monthly'].tolist() == [[0, 1, 1], [0, 0, 0], [0, 0, 1]]
+    assert velocity['days_since'].tolist() == [10, -1, 29]
+    assert velocity['recent'].tolist() == [2, 0, 1]
+
+    # Max has two Scout requirements done with the rank award left; Ivan earned Scout and is on Tenderfoot
+    assert velocity['current_rank'].tolist() == [0, 0, 1]
+    assert velocity['remaining'].tolist() == [1, 3, 1]
+    assert velocity['projected'].tolist() == [date(2024, 7, 30).toordinal(), 0, date(2024, 8, 29).toordinal()]
+
+def test_compute_velocity_ignores_later_completions(requirements, completion_matrix):
+    velocity = compute_velocity(completion_matrix, requirements, date(2024, 5, 31), months=1)
+    assert velocity['monthly'].tolist() == [[1], [0], [0]]
+    assert velocity['remaining'].tolist() == [2, 3, 2]
+
+def test_generate_velocity_reports(patrol_structure, requirements, completion_matrix, tmp_path):
+    report_files = generate_velocity_reports(patrol_structure, requirements, completion_matrix, str(tmp_path),
+                                             as_of=date(2024, 6, 30), months=2, window_days=60)
+    assert [path.split('/')[-1] for path in report_files] == ['velocity_by_scout.csv', 'velocity_by_patrol.csv', 'scout_progress.csv']
+
+    with open(tmp_path / 'velocity_by_patrol.csv', 'r') as file:
+        assert list(csv.reader(file)) == [
+            ['Patrol', 'Scouts', '2024-05', '2024-06', 'Total'],
+            ['paw', '2', '1', '1', '2'],
+            ['purple people', '1', '0', '1', '1'],
+        ]
+
+    with open(tmp_path / 'scout_progress.csv', 'r') as file:
+        rows = list(csv.reader(file))
+    assert rows[1] == ['paw', 'max francis', '6/20/2024', '10', '2', 'Scout Rank', '1', '7/30/2024']
+    assert rows[2] == ['paw', 'truman bonlender', '', '', '0', 'Scout Rank', '3', '']
+    assert rows[3] == ['purple people', 'ivan alexander', '6/1/2024', '29', '1', 'Tenderfoot Rank', '1', '8/29/2024']
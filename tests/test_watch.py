@@ -0,0 +1,61 @@
+import os
+import gzip
+from scout_tracking.watch import TroopState, InputWatcher, watch, ADVANCEMENT_INPUT, PATROL_INPUT
+
+def test_refresh_regenerates_only_affected_patrols(troop_files):
+    patrol_file, requirements_file, advancement_file, output_dir = troop_files
+    state = TroopState(str(patrol_file), str(requirements_file), str(advancement_file), str(output_dir))
+    assert state.refresh() == ['paw', 'purple people']
+    paw_report = output_dir / 'paw_report.csv'
+    purple_report = output_dir / 'purple_people_report.csv'
+    os.utime(paw_report, ns=(0, 0))
+    os.utime(purple_report, ns=(0, 0))
+
+    with open(advancement_file, 'a') as file:
+        file.write("Ivan Alexander,scout rank requirement 1a,4/30/2019\n")
+    assert state.refresh({ADVANCEMENT_INPUT}) == ['purple people']
+    assert paw_report.stat().st_mtime_ns == 0
+    assert purple_report.read_text().splitlines()[2] == 'Scout 1a,X'
+
+    # A patrol that leaves the roster loses its report, and the other reports are kept as they are
+    os.utime(purple_report, ns=(0, 0))
+    patrol_file.write_text("Scout Name\tPatrol\nIvan Alexander\tPurple People\n")
+    assert state.refresh({PATROL_INPUT}) == []
+    assert not paw_report.exists()
+    assert purple_report.stat().st_mtime_ns == 0
+
+def test_input_watcher_debounces(tmp_path):
+    path = tmp_path / 'advancement.csv'
+    path.write_text("Name,Advancement Info,Date Completed\n")
+    now = [0.0]
+    watcher = InputWatcher({'advancement': str(path)}, debounce=2.0, clock=lambda: now[0])
+    assert watcher.poll() == set()
+
+    # A file still being written is not reported until it has settled
+    path.write_text("Name,Advancement Info,Date Completed\nMax Francis,rank scout,11/15/2018\n")
+    assert watcher.poll() == set()
+    now[0] = 1.0
+    path.write_text("Name,Advancement Info,Date Completed\nMax Francis,rank scout,11/15/2018\nIvan")
+    assert watcher.poll() == set()
+    now[0] = 2.5
+    assert watcher.poll() == set()
+    now[0] = 3.5
+    assert watcher.poll() == {'advancement'}
+    assert watcher.poll() == set()
+
+def test_watch_survives_bad_input(troop_files, monkeypatch, capsys):
+    patrol_file, requirements_file, advancement_file, output_dir = troop_files
+    state = TroopState(str(patrol_file), str(requirements_file), str(advancement_file), str(output_dir))
+    contents = advancement_file.read_bytes()
+
+    # The first change is a half-copied gzip file, the second the finished copy
+    drops = [gzip.compress(contents)[:-10], gzip.compress(contents)]
+    def poll(watcher):
+        advancement_file.write_bytes(drops.pop(0))
+        return {ADVANCEMENT_INPUT}
+    monkeypatch.setattr(InputWatcher, 'poll', poll)
+    watch(state, interval=0, max_updates=2)
+
+    output = capsys.readouterr().out
+    assert "Error reloading advancement: EOFError" in output
+    assert "Updated 0 patrol report(s) after changes to advancement" in output